@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 
 from gamepals.sources.controller import ControllerInput
 from gamepals.utils.configuration_handler import ConfigurationHandler
+from gamepals.utils.logging import TickTrace
 
 from .actions import ActionInput, ActionInputWithConfidence, GameAction
 from .actor_id import ActorID
@@ -35,8 +36,18 @@ class Actor(ABC):
         """Adds a new subscriber to the list"""
         self.subscribers.append(subscriber)
 
-    def notify_input(self, action_input: ActionInput, confidence: float) -> None:
-        """Notifies all the subscribers with an ActionInputWithConfidence object"""
+    def notify_input(
+        self,
+        action_input: ActionInput,
+        confidence: float,
+        read_at: float | None = None,
+        trace: TickTrace | None = None,
+    ) -> None:
+        """
+        Notifies all the subscribers with an ActionInputWithConfidence object.
+        read_at is the time the controller input it comes from was read, if any (see InputData), and trace the
+        trace of the Game State it was computed from, if any (see Tracer).
+        """
         if not self._filter_input(action_input):
             logger.debug(
                 f"Input {action_input.action} with value {action_input.val} filtered by {self.id}"
@@ -48,6 +59,8 @@ class Actor(ABC):
             ActionInputWithConfidence(
                 action_input.action, float(action_input.val), float(confidence)
             ),
+            read_at,
+            trace,
         )
         for subscriber in self.subscribers:
             subscriber.on_input_update(data)
@@ -2,6 +2,7 @@ import logging
 
 from gamepals.sources import PhysicalControllerListener
 from gamepals.sources.controller import ControllerInput, ControllerObserver, InputData
+from gamepals.utils.logging import InputLatencyTracker, LatencyStage
 
 from .actions import ActionConversionManager, ActionInput, GameAction
 from .actor import Actor
@@ -30,7 +31,11 @@ class HumanActor(Actor, ControllerObserver):
 
         self.conversion_manager: ActionConversionManager = conversion_manager
 
+        self.controller.set_conditioning(
+            self.config_handler.get_input_conditioning(self.controller.get_index())
+        )
         self.controller.subscribe(self)
+        self.latency_tracker = InputLatencyTracker()
 
         logger.info(f"HumanActor with idx = {self.get_index()} has id = {self.id}")
 
@@ -69,15 +74,19 @@ class HumanActor(Actor, ControllerObserver):
         """Receives an Input from the Controller and notifies it with the associated confidence level"""
 
         update_data = data.c_input if data else None
+        read_at = data.read_at if data else None
 
         # Before sending, it converts the user input into the game inputs
         action_inputs = self.conversion_manager.input_to_actions(
             self.get_index(), update_data
         )
 
+        if action_inputs:
+            self.latency_tracker.record(LatencyStage.CONVERTED, read_at)
+
         for action_input in action_inputs:
             confidence = self.confidence_levels[action_input.action]
-            self.notify_input(action_input, confidence)
+            self.notify_input(action_input, confidence, read_at)
 
     def on_arbitrated_inputs(self, input_data: ControllerInput) -> None:
         # Ignore Arbitrated Inputs at the moment
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
+from gamepals.utils.logging import TickTrace
+
 from .actions import ActionInputWithConfidence
 from .actor_id import ActorID
 
@@ -14,6 +16,8 @@ class ActorData:
 
     actor_id: ActorID
     data: ActionInputWithConfidence
+    read_at: float | None = None  # When the controller input it comes from was read (see InputData)
+    trace: TickTrace | None = None  # The trace of the Game State it was computed from, if it's traced (see Tracer)
 
 
 @dataclass
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 from gamepals.sources.controller import ControllerInput
 from gamepals.sources.game import GameState, GameStateListener, GameStateObserver
+from gamepals.utils.logging import TickTrace, Tracer, TraceStage
 
 from .actions import ActionInput, ActionInputWithConfidence, GameAction
 from .actor import Actor
@@ -13,12 +14,17 @@ class SWAgentActor(Actor, GameStateObserver, ABC):
 
     The inputs it produces are generated based on the current Game State, whose updates it receives.
     In particular, the Agent produces Actions, which will eventually be converted to Game Inputs after the arbitration.
+
+    When the Tracer is enabled, every Game State is traced until its actions reach the Virtual Controller: trace is
+    the trace of the state being computed, which implementations can mark with their own stages (e.g. inference).
     """
 
     def __init__(self, game_state: GameStateListener, **kwargs) -> None:
         super().__init__()
         self.game_state = game_state
         self.game_state.subscribe(self)
+        self.tracer = Tracer()
+        self.trace: TickTrace | None = None
 
     @classmethod
     def get_name(cls) -> str:
@@ -31,10 +37,17 @@ class SWAgentActor(Actor, GameStateObserver, ABC):
 
     def on_game_state_update(self, game_state: GameState) -> None:
         """Receives Game State Updates and produces Inputs to notify to its subscribers."""
+        trace = self.tracer.start(self.get_name(), game_state.received_at, game_state.decoded_at)
+        self.trace = trace
+
         actions = self.compute_actions(game_state)
+        if trace is not None:
+            trace.mark(TraceStage.ACTIONS)
+            self.trace = None
+
         for action in actions:
             action_input = ActionInput(action.action, action.val)
-            self.notify_input(action_input, action.confidence)
+            self.notify_input(action_input, action.confidence, trace=trace)
 
     @abstractmethod
     def compute_actions(self, game_state: GameState) -> list[ActionInputWithConfidence]:
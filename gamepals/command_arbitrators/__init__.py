@@ -2,11 +2,17 @@ from . import policies
 from .command_arbitrator import CommandArbitrator
 from .game_actions_map import GameActionsMap
 from .policies import PolicyManager, PolicyRole
+from .replay_engine import ReplayEngine, ReplayStats
+from .session_recorder import SessionReader, SessionRecorder
 
 __all__ = [
     "CommandArbitrator",
     "PolicyManager",
     "PolicyRole",
     "policies",
-    "GameActionsMap"
+    "GameActionsMap",
+    "SessionRecorder",
+    "SessionReader",
+    "ReplayEngine",
+    "ReplayStats",
 ]
@@ -0,0 +1,101 @@
+import queue
+import time
+from collections import deque
+from typing import Any
+
+from gamepals.agents.observer import ActorData, MessageData
+from gamepals.utils.logging import Loggable
+
+
+class ArbitrationQueue(Loggable):
+    """
+    ArbitrationQueue collects the updates sent by the Actors to the CommandArbitrator, in the order they are sent.
+
+    Any number of threads can put updates in it, while a single consumer drains them. The queue is bounded: when it
+    is full, producers wait for the consumer instead of dropping updates.
+    """
+
+    DEFAULT_MAX_SIZE = 1024
+    LATENCY_WINDOW = 1000  # number of updates the latency metrics are computed on
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self.__queue: queue.Queue[tuple[float, ActorData | MessageData] | None] = (
+            queue.Queue(max_size)
+        )
+
+        self.updates = 0
+        self.blocked_puts = 0
+        self.batches = 0
+        self.coalesced = 0
+        self.suppressed_notifications = 0
+        self.max_depth = 0
+        self.latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.__closed = False
+
+    def put(self, update: ActorData | MessageData) -> None:
+        """Enqueues an update, waiting for a free slot if the queue is full"""
+        item = (time.perf_counter(), update)
+        try:
+            self.__queue.put_nowait(item)
+        except queue.Full:
+            self.blocked_puts += 1
+            self.__queue.put(item)
+        self.max_depth = max(self.max_depth, self.__queue.qsize())
+
+    def drain(
+        self, block: bool = True, timeout: float | None = None
+    ) -> list[tuple[float, ActorData | MessageData]] | None:
+        """
+        Waits for an update (if block is True), then returns it along with all the other updates already queued,
+        each with the time it was enqueued at. Returns an empty list if there are no updates, and None once the
+        queue is closed.
+        """
+        if self.__closed:
+            return None
+
+        try:
+            item = self.__queue.get(block, timeout)
+        except queue.Empty:
+            return list()
+
+        updates = list()
+        while item is not None:
+            updates.append(item)
+            if len(updates) >= self.max_size:
+                break
+            try:
+                item = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+        else:
+            self.__closed = True
+            if len(updates) == 0:
+                return None
+
+        self.batches += 1
+        self.updates += len(updates)
+        return updates
+
+    def close(self) -> None:
+        """Makes the consumer stop, after the updates already queued"""
+        self.__queue.put(None)
+
+    def get_json(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "depth": self.__queue.qsize(),
+            "max_depth": self.max_depth,
+            "updates": self.updates,
+            "blocked_puts": self.blocked_puts,
+            "batches": self.batches,
+            "coalesced": self.coalesced,
+            "suppressed_notifications": self.suppressed_notifications,
+        }
+
+        if len(self.latencies) > 0:
+            latencies = sorted(self.latencies)
+            data["latency_p50_ms"] = latencies[len(latencies) // 2] * 1e3
+            data["latency_p99_ms"] = latencies[int(len(latencies) * 0.99)] * 1e3
+            data["latency_max_ms"] = latencies[-1] * 1e3
+
+        return data
@@ -1,17 +1,33 @@
 import logging
+import threading as th
+import time
 from dataclasses import asdict
-from typing import Any, Type
+from typing import TYPE_CHECKING, Any, Type
 
 from gamepals.agents import Actor, ActorID
 from gamepals.agents.actions import ActionConversionManager, ActionInput, GameAction
 from gamepals.agents.observer import ActorData, ActorObserver, MessageData
 from gamepals.sources import VirtualControllerProvider
-from gamepals.sources.controller import ControllerInput
+from gamepals.sources.controller import ControllerInput, InputType
 from gamepals.utils.configuration_handler import ConfigurationHandler
-from gamepals.utils.logging import Loggable
+from gamepals.utils.logging import (
+    InputLatencyTracker,
+    LatencyStage,
+    Loggable,
+    Telemetry,
+    TelemetryChannel,
+    TelemetryColumn,
+    TickTrace,
+    TraceStage,
+)
 
+from .arbitration_queue import ArbitrationQueue
 from .game_actions_map import GameActionsMap
 from .policies import InputEntry, Policy, PolicyManager
+from .policies.policy_manager import CompiledPolicy
+
+if TYPE_CHECKING:
+    from .policies.frame_merger import FrameMerger
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +39,33 @@ class CommandArbitrator(ActorObserver, Loggable):
     It arbitrates between inputs from different Actors and sends the final command to a Virtual Controller.
 
     The Arbitrator can communicate to its Actors the computed inputs via their get_arbitrator_updates method.
+
+    Inputs and messages are received from the Actors' threads and enqueued. A single arbitration thread processes
+    them in order: all the inputs found in the queue are applied, then each updated Game Action is merged and
+    executed once, in a single Virtual Controller frame. Only the arbitration thread touches the action maps
+    and the Virtual Controller.
+
+    By default the queue is processed as soon as inputs arrive (event-driven). With a tick rate, it's processed at
+    fixed intervals instead, so that each Game Action is merged at most once per tick however many inputs it
+    received: this trades up to a tick of latency for less work under bursts of inputs (e.g. stick jitter).
+
+    Every stored input is published to the Logger as it's applied (see Loggable), so the action maps are never read
+    by the logging thread.
     """
 
+    PUBLISHES_CHANGES = True
+
     def __init__(
         self,
         policies: dict[GameAction, Type[Policy]],
         conversion_manager: ActionConversionManager,
+        tick_rate: float | None = None,
     ) -> None:
+        """
+        Args:
+            tick_rate (float | None, optional): The frequency (in Hz) at which inputs are arbitrated. If None,
+                inputs are arbitrated as soon as they are received.
+        """
         self.config_handler = ConfigurationHandler()
         self.virtual_controller = VirtualControllerProvider()
         self.actors: dict[ActorID, Actor] = dict()
@@ -39,43 +75,207 @@ class CommandArbitrator(ActorObserver, Loggable):
         policy_types = policies.copy()
         self.policy_manager = PolicyManager(policy_types)
 
+        self.tick_rate = tick_rate
+        self.queue = ArbitrationQueue()
+        self.arbitration_thread: th.Thread | None = None
+
+        # Dispatch tables built by compile()
+        self.__compiled_policies: dict[GameAction, CompiledPolicy] = dict()
+        self.__controlled_actions: dict[ActorID, frozenset[GameAction]] = dict()
+
+        self.latency_tracker = InputLatencyTracker()
+        self.__telemetry: TelemetryChannel | None = None
+        self.__input_type_codes = {input_type: i for i, input_type in enumerate(InputType)}
+
+    def enable_telemetry(self, telemetry: Telemetry) -> None:
+        """Records every executed command, and whether it changed the Virtual Controller, to the Telemetry"""
+        self.__telemetry = telemetry.channel(
+            "arbitrated_commands",
+            [
+                TelemetryColumn("time", "d"),
+                TelemetryColumn("input_type", "H", [input_type.value for input_type in InputType]),
+                TelemetryColumn("value", "d"),
+                TelemetryColumn("changed", "B"),
+            ],
+        )
+
     def add_actor(self, actor: Actor) -> None:
         """Adds an Actor to the Architecture"""
         self.actors[actor.get_id()] = actor
         self.action_maps[actor.get_id()] = GameActionsMap()
         self.policy_manager.register_actor(actor)
         actor.subscribe(self)  # Subscribe the Arbitrator to all the Actors
+        self.publish_change((actor.get_id(),), self.__actor_json(actor.get_id()))
+
+        # The dispatch tables are outdated until the next compile()
+        self.__compiled_policies = dict()
+        self.__controlled_actions = dict()
+
+    def compile(self) -> None:
+        """
+        Freezes the Actors and the Policies into per-action dispatch tables, so that inputs are merged without
+        looking up the policies and the actors' records on every input. Called by start().
+        """
+        self.__controlled_actions = {
+            actor_id: frozenset(actor.get_controlled_actions())
+            for actor_id, actor in self.actors.items()
+        }
+        self.__compiled_policies = self.policy_manager.compile(
+            lambda actor_id, action: self.action_maps[actor_id].record(action)
+        )
+        # Compiling adds an empty record for the actions that had no input yet
+        for actor_id in self.actors:
+            self.publish_change((actor_id,), self.__actor_json(actor_id))
 
     def start(self) -> None:
         """Starts the Actors and the Arbitration Process"""
 
+        self.compile()
         self.virtual_controller.start()
 
+        self.arbitration_thread = th.Thread(
+            target=self.__arbitration_loop, daemon=True
+        )
+        self.arbitration_thread.start()
+
         for _, actor in self.actors.items():
             actor.start()
 
+    def stop(self) -> None:
+        """Stops the Arbitration Process, after the updates already received"""
+        if self.arbitration_thread is None:
+            return
+
+        self.queue.close()
+        self.arbitration_thread.join()
+        self.arbitration_thread = None
+
     def on_input_update(self, actor_data: ActorData) -> None:
         """Receives Input and Confidence Level from one of its Actors"""
+        self.queue.put(actor_data)
+
+    def on_message_update(self, message_data: MessageData) -> None:
+        """Receives a Message from one of its Actors"""
+        self.queue.put(message_data)
+
+    def __arbitration_loop(self) -> None:
+        period = 1 / self.tick_rate if self.tick_rate else None
+        next_tick = time.perf_counter()
+
+        while True:
+            if period is None:
+                updates = self.queue.drain()
+            else:
+                next_tick += period
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick -= delay  # Late: the next tick is a period from now
+                updates = self.queue.drain(block=False)
+
+            if updates is None:
+                break
+            if len(updates) == 0:
+                continue
+
+            try:
+                self._arbitrate([update for _, update in updates])
+            except Exception:
+                logger.exception("Error while arbitrating %d updates", len(updates))
+
+            now = time.perf_counter()
+            self.queue.latencies.extend(now - enqueued_at for enqueued_at, _ in updates)
+
+    def _arbitrate(
+        self,
+        updates: list[ActorData | MessageData],
+        timestamps: list[float] | None = None,
+    ) -> None:
+        """
+        Processes the updates in order, merging each Game Action once for all its consecutive inputs.
+        The inputs are stored with the given timestamps (e.g. the recorded ones, when replaying) or the current time.
+        """
+        # Ordered set of the actions to merge, with the oldest of their inputs that is measured (see _execute_actions)
+        dirty_actions: dict[GameAction, ActorData | None] = dict()
+        applied = 0
+
+        for i, update in enumerate(updates):
+            if isinstance(update, ActorData):
+                if self._apply_input(update, timestamps[i] if timestamps else None):
+                    if dirty_actions.get(update.data.action, None) is None:
+                        measured = update.read_at is not None or update.trace is not None
+                        dirty_actions[update.data.action] = update if measured else None
+                    applied += 1
+            else:
+                # Inputs received before the message are executed before it
+                self.queue.coalesced += applied - len(dirty_actions)
+                self._execute_actions(dirty_actions)
+                dirty_actions.clear()
+                applied = 0
+                self._handle_message(update)
+
+        self.queue.coalesced += applied - len(dirty_actions)
+        self._execute_actions(dirty_actions)
+
+    def _apply_input(self, actor_data: ActorData, timestamp: float | None = None) -> bool:
+        """Stores the input of an Actor. Returns False if the Actor can't execute the action"""
         executed_action = actor_data.data.action
         actor = self.actors[actor_data.actor_id]
 
+        controlled_actions = self.__controlled_actions.get(actor_data.actor_id, None)
+        if controlled_actions is None:
+            controlled_actions = frozenset(actor.get_controlled_actions())
+
         # Check if actor is capable of doing the action
-        if executed_action not in actor.get_controlled_actions():
+        if executed_action not in controlled_actions:
             logger.warning(
                 "Actor %s is not registered to execute action %s",
                 actor.__class__.__name__,
                 executed_action,
             )
+            return False
+
+        self.latency_tracker.record(LatencyStage.DEQUEUED, actor_data.read_at)
+        if actor_data.trace is not None:
+            actor_data.trace.mark(TraceStage.QUEUE)
+        action_map = self.action_maps[actor_data.actor_id]
+        action_map.set(actor_data.data, timestamp)
+        if self._log_channel is not None:
+            record = action_map.actions_map[executed_action]
+            self.publish_change(
+                (actor_data.actor_id, "actions", executed_action),
+                dict(val=record.val, confidence=record.confidence, timestamp=record.timestamp),
+            )
+        return True
+
+    def _execute_actions(self, actions: dict[GameAction, ActorData | None]) -> None:
+        """
+        Merges and executes the given actions, once each, sending the resulting inputs all together.
+        Each action comes with the input whose latency is measured, if any: one read from a controller (see InputData)
+        or a traced one (see Tracer).
+        """
+        if len(actions) == 0:
             return
 
-        self.action_maps[actor_data.actor_id].set(actor_data.data)
-        merge_result = self._merge_by_action(executed_action)
+        self.virtual_controller.begin_frame()
+        try:
+            for action, measured in actions.items():
+                merged_inputs = self._merge_by_action(action)
 
-        for merged_input in merge_result:
-            self.execute_command(merged_input)
+                read_at = trace = None
+                if measured is not None:
+                    read_at, trace = measured.read_at, measured.trace
+                    self.latency_tracker.record(LatencyStage.MERGED, read_at)
+                    if trace is not None:
+                        trace.mark(TraceStage.MERGE)
 
-    def on_message_update(self, message_data: MessageData) -> None:
-        """Receives a Message from one of its Actors"""
+                for merged_input in merged_inputs:
+                    self.execute_command(merged_input, read_at, trace)
+        finally:
+            self.virtual_controller.commit_frame()
+
+    def _handle_message(self, message_data: MessageData) -> None:
         logger.info("Received Message: %s", message_data)
         if "RESET" in message_data.message:
             self.virtual_controller.reset_controls()
@@ -86,6 +286,17 @@ class CommandArbitrator(ActorObserver, Loggable):
         It then returns the resulting ControllerInput
         """
 
+        compiled = self.__compiled_policies.get(action, None)
+        if compiled is not None:
+            value = compiled.merge()
+        else:
+            value = self._merge_entries(action)
+
+        action_input = ActionInput(action=action, val=value)
+        return self.conversion_manager.action_to_inputs(action_input)
+
+    def _merge_entries(self, action: GameAction) -> float:
+        """Merges the Input Entries for the given action, looking up its Policy and Actors"""
         policy_info = self.policy_manager.get_policy(action)
         policy = policy_info.policy_type
 
@@ -94,17 +305,26 @@ class CommandArbitrator(ActorObserver, Loggable):
             for actor_id, actor_role in policy_info.actors.items()
         ]
 
-        value = policy.merge_input_entries(input_entries)
-        action_input = ActionInput(action=action, val=value)
-        c_inputs = self.conversion_manager.action_to_inputs(action_input)
-
-        return c_inputs
+        return policy.merge_input_entries(input_entries)
 
-    def execute_command(self, c_input: ControllerInput) -> None:
-        """Executes a command on the Virtual Controller"""
+    def execute_command(
+        self,
+        c_input: ControllerInput,
+        read_at: float | None = None,
+        trace: TickTrace | None = None,
+    ) -> None:
+        """Executes a command on the Virtual Controller. The Actors are only notified if it changed its state"""
         logger.debug("Executing %s", c_input)
-        self.virtual_controller.execute(c_input)
-        self.notify_arbitrated_input(c_input)
+        changed = self.virtual_controller.execute(c_input, read_at, trace)
+        if self.__telemetry is not None:
+            self.__telemetry.append(
+                time.time(), self.__input_type_codes[c_input.type], c_input.val, changed
+            )
+
+        if changed:
+            self.notify_arbitrated_input(c_input)
+        else:
+            self.queue.suppressed_notifications += 1
 
     def notify_arbitrated_input(self, input_data: ControllerInput) -> None:
         """Notifies all Actors of the Arbitrated Input"""
@@ -114,18 +334,24 @@ class CommandArbitrator(ActorObserver, Loggable):
     def get_virtual_controller(self) -> VirtualControllerProvider:
         return self.virtual_controller
 
-    def get_json(self) -> list[Any]:
-        data = list()
-        for actor_id, action_map in self.action_maps.items():
-            actions_dict = {
+    def get_frame_merger(self) -> "FrameMerger":
+        """Returns a FrameMerger of the compiled dispatch tables, to merge all the actions at once. It requires numpy"""
+        from .policies.frame_merger import FrameMerger
+
+        if len(self.__compiled_policies) == 0:
+            self.compile()
+        return FrameMerger(self.__compiled_policies)
+
+    def get_json(self) -> dict[str, Any]:
+        return {actor_id: self.__actor_json(actor_id) for actor_id in self.action_maps}
+
+    def __actor_json(self, actor_id: ActorID) -> dict[str, Any]:
+        actor = self.actors[actor_id]
+        return dict(
+            actor_name=actor.__class__.__name__,
+            actor_id=actor_id,
+            actions={
                 game_action: asdict(action_input_record)
-                for game_action, action_input_record in action_map.actions_map.items()
-            }
-            data.append(
-                dict(
-                    actor_name=self.actors[actor_id].__class__.__name__,
-                    actor_id=self.actors[actor_id].get_id(),
-                    actions=actions_dict,
-                )
-            )
-        return data
+                for game_action, action_input_record in self.action_maps[actor_id].actions_map.items()
+            },
+        )
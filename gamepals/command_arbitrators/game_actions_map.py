@@ -8,6 +8,8 @@ from .policies import ActionInputRecord
 class GameActionsMap:
     """
     GameActionsMap is a class that stores for each Game Action a corresponding ActionInputRecord
+
+    Records are updated in place, so references to them (see record) always see the latest input.
     """
 
     def __init__(self) -> None:
@@ -26,16 +28,27 @@ class GameActionsMap:
         if timestamp is None:
             timestamp = time.time()
 
-        self.actions_map[action.action] = ActionInputRecord(
-            val=action.val, confidence=action.confidence, timestamp=timestamp
-        )
+        record = self.actions_map.get(action.action)
+        if record is None:
+            self.actions_map[action.action] = ActionInputRecord(
+                val=action.val, confidence=action.confidence, timestamp=timestamp
+            )
+        else:
+            record.val = action.val
+            record.confidence = action.confidence
+            record.timestamp = timestamp
 
     def get(self, action: GameAction) -> tuple[ActionInput, ActionInputRecord]:
         """Returns the ControllerInput and the ActionInputRecord associated with the input."""
+        record = self.record(action)
+        return ActionInput(action=action, val=record.val), record
+
+    def record(self, action: GameAction) -> ActionInputRecord:
+        """Returns the ActionInputRecord associated with the input, creating an empty one if there is none."""
         record = self.actions_map.get(action)
 
         if record is None:
             self.set(ActionInputWithConfidence(action, val=0, confidence=0))
             record = self.actions_map[action]
 
-        return ActionInput(action=action, val=record.val), record
+        return record
@@ -0,0 +1,90 @@
+import numpy as np
+import numpy.typing as npt
+
+from gamepals.agents.actions import GameAction
+
+from .policy import Policy
+from .policy_manager import CompiledPolicy
+
+
+class FrameMerger:
+    """
+    FrameMerger merges the inputs of all the actions at once, for one frame or for many frames (e.g. an offline
+    replay), with the vectorized kernels of their Policies (see Policy.merge_arrays). It requires numpy, and isn't used by the
+    CommandArbitrator, which merges the actions one by one as their inputs arrive.
+
+    A frame holds the values, confidence levels and timestamps of the inputs in three arrays of shape
+    (actions, max actors): a row for each action, with its actors in the slots of its CompiledPolicy.
+    The slots after the last actor of an action are ignored. Frames can be stacked along leading axes.
+    The actions without actors are left out, as they are never merged.
+    """
+
+    def __init__(self, compiled_policies: dict[GameAction, CompiledPolicy]) -> None:
+        self.compiled_policies = {
+            action: compiled
+            for action, compiled in compiled_policies.items()
+            if len(compiled.entries) > 0
+        }
+        self.actions = list(self.compiled_policies.keys())
+        self.max_actors = max(
+            (len(compiled.entries) for compiled in self.compiled_policies.values()),
+            default=0,
+        )
+
+        # The actions with the same Policy and number of actors are merged together
+        groups: dict[tuple[type[Policy], int], list[int]] = dict()
+        for i, compiled in enumerate(self.compiled_policies.values()):
+            groups.setdefault((compiled.policy_type, len(compiled.entries)), []).append(i)
+
+        compiled_list = list(self.compiled_policies.values())
+        self.__groups = [
+            (
+                policy_type,
+                n_actors,
+                np.array(rows, np.intp),
+                np.array([compiled_list[row].roles for row in rows], np.str_),
+            )
+            for (policy_type, n_actors), rows in groups.items()
+        ]
+
+    def read_frame(
+        self,
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Returns the frame of the inputs currently stored in the records of the CompiledPolicies"""
+        shape = (len(self.actions), self.max_actors)
+        values, confidences, timestamps = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        for row, compiled in enumerate(self.compiled_policies.values()):
+            for slot, record in enumerate(compiled.records):
+                values[row, slot] = record.val
+                confidences[row, slot] = record.confidence
+                timestamps[row, slot] = record.timestamp
+        return values, confidences, timestamps
+
+    def merge(
+        self,
+        values: npt.NDArray[np.float64],
+        confidences: npt.NDArray[np.float64],
+        timestamps: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        """
+        Merges the frames. The result has a value for each action (in the order of actions), along the last axis.
+        It is the same, bit for bit, as the CompiledPolicies would merge the inputs.
+        """
+        values = np.asarray(values, np.float64)
+        confidences = np.asarray(confidences, np.float64)
+        timestamps = np.asarray(timestamps, np.float64)
+
+        merged = np.empty(values.shape[:-1])
+        for policy_type, n_actors, rows, roles in self.__groups:
+            merged[..., rows] = policy_type.merge_arrays(
+                values[..., rows, :n_actors],
+                confidences[..., rows, :n_actors],
+                roles,
+                timestamps[..., rows, :n_actors],
+            )
+        return merged
+
+    def merge_frame(self) -> dict[GameAction, float]:
+        """Merges the inputs currently stored in the records of the CompiledPolicies"""
+        merged = self.merge(*self.read_frame())
+        return dict(zip(self.actions, merged.tolist()))
@@ -0,0 +1,269 @@
+from typing import Callable
+
+import numpy as np
+import numpy.typing as npt
+
+from gamepals.agents import ActorID
+
+from .input_entry import ActionInputRecord, InputEntry
+from .policy import Policy
+from .policy_binary_and import PolicyBinaryAND
+from .policy_binary_democracy import PolicyBinaryDemocracy
+from .policy_binary_or import PolicyBinaryOR
+from .policy_binary_supv_by_pilot import PolicyBinarySupervisionByPilot
+from .policy_continuous_or import PolicyContinuousOR
+from .policy_continuous_slope import PolicyContinuousSlope
+from .policy_continuous_sum import PolicyContinuousSum
+from .policy_continuous_supv_by_pilot import PolicyContinuousSupervisionByPilot
+from .policy_exclusivity import PolicyExclusivity
+from .policy_role import PolicyRole
+
+# The vectorized kernels of the policies (see Policy.merge_arrays). Each one merges many lists of entries at once,
+# and returns the same values as the merge_input_entries of its policy, bit for bit.
+# The entries are along the last axis of the arrays, which broadcast together: values, confidences, roles, timestamps.
+Kernel = Callable[
+    [
+        npt.NDArray[np.float64],
+        npt.NDArray[np.float64],
+        npt.NDArray[np.str_],
+        npt.NDArray[np.float64],
+    ],
+    npt.NDArray[np.float64],
+]
+
+
+def merge_arrays(
+    policy: type[Policy],
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Merges the lists of entries with the kernel of the policy, or one by one if it has none"""
+    kernel = KERNELS.get(policy, None)
+    if kernel is not None:
+        return kernel(values, confidences, roles, timestamps)
+
+    values, confidences, roles, timestamps = np.broadcast_arrays(
+        values, confidences, roles, timestamps
+    )
+    merged = np.empty(values.shape[:-1])
+    for index in np.ndindex(merged.shape):
+        merged[index] = policy.merge_input_entries(
+            [
+                InputEntry(ActorID(str(i)), PolicyRole(role), ActionInputRecord(val, confidence, timestamp))
+                for i, (val, confidence, role, timestamp) in enumerate(
+                    zip(
+                        values[index].tolist(),
+                        confidences[index].tolist(),
+                        roles[index].tolist(),
+                        timestamps[index].tolist(),
+                    )
+                )
+            ]
+        )
+    return merged
+
+
+# Helpers of the kernels
+
+
+def sum_in_order(terms: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Adds up the terms one after the other, like the built-in sum (np.sum may add them in a different order)"""
+    total = np.zeros(terms.shape[:-1])
+    for i in range(terms.shape[-1]):
+        total = total + terms[..., i]
+    return total
+
+
+def first_index(
+    mask: npt.NDArray[np.bool_],
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.intp]]:
+    """Returns whether the mask has a True value, and the index of the first one (0 if there is none)"""
+    if mask.shape[-1] == 0:
+        return np.zeros(mask.shape[:-1], bool), np.zeros(mask.shape[:-1], np.intp)
+    return np.asarray(mask.any(axis=-1)), np.argmax(mask, axis=-1)
+
+
+def take(array: npt.NDArray[np.float64], index: npt.NDArray[np.intp]) -> npt.NDArray[np.float64]:
+    """Returns the element at index of each list of entries (0.0 if there are no entries)"""
+    array = np.broadcast_to(array, index.shape + array.shape[-1:])
+    if array.shape[-1] == 0:
+        return np.zeros(index.shape)
+    return np.take_along_axis(array, index[..., None], axis=-1)[..., 0]
+
+
+# Kernels
+
+
+def merge_binary_and(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    return np.all(values != 0, axis=-1).astype(np.float64)
+
+
+def merge_binary_or(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    return np.any(values != 0, axis=-1).astype(np.float64)
+
+
+def merge_binary_democracy(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    one_voters = values != 0
+    n_one_voters = one_voters.sum(axis=-1)
+    n_zero_voters = one_voters.shape[-1] - n_one_voters
+
+    with np.errstate(divide="ignore", invalid="ignore"):  # for the rows without voters of a kind
+        one_score = sum_in_order(np.where(one_voters, confidences, 0.0)) / n_one_voters
+        zero_score = sum_in_order(np.where(one_voters, 0.0, confidences)) / n_zero_voters
+
+    return np.select(
+        [n_one_voters == 0, n_zero_voters == 0, zero_score > one_score],
+        [0.0, 1.0, 0.0],
+        1.0,
+    )
+
+
+def merge_binary_supervision_by_pilot(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    pilot_one = np.any((roles == PolicyRole.PILOT) & (values != 0), axis=-1)
+    return np.where(
+        pilot_one,
+        1.0,
+        merge_binary_democracy(values, confidences, roles, timestamps),
+    )
+
+
+def merge_continuous_or(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # The first of the latest entries, as the sort is stable
+    latest = np.argmax(timestamps, axis=-1)
+    return take(values, latest)
+
+
+def merge_continuous_slope(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Remove 0 values from Copilot
+    pilots = roles == PolicyRole.PILOT
+    copilots = roles == PolicyRole.COPILOT
+    kept = ~(copilots & (values == 0))
+    n_kept = kept.sum(axis=-1)
+
+    _, first = first_index(kept)
+    _, second = first_index(kept & (np.cumsum(kept, axis=-1) == 2))
+    found_pilot, pilot = first_index(kept & pilots)
+    found_copilot, copilot = first_index(kept & copilots)
+    by_role = found_pilot & found_copilot
+    pilot = np.where(by_role, pilot, first)
+    copilot = np.where(by_role, copilot, second)
+
+    # The thetas are computed on Python floats: np.power can use a different pow implementation (e.g. SVML).
+    # They are only needed where there are two entries to blend
+    pilot_confidence = np.where(n_kept > 1, take(confidences, pilot), 0.0)
+    theta_1 = np.array(
+        [PolicyContinuousSlope._get_theta_1(c, p=3) for c in pilot_confidence.ravel().tolist()]
+    ).reshape(pilot_confidence.shape)
+    theta_2 = np.array(
+        [PolicyContinuousSlope._get_theta_2(c, p=3) for c in pilot_confidence.ravel().tolist()]
+    ).reshape(pilot_confidence.shape)
+
+    copilot_confidence = take(confidences, copilot)
+    with np.errstate(divide="ignore", invalid="ignore"):  # for the rows where alpha is not on the slope
+        slope = 1 / (theta_2 - theta_1) * (copilot_confidence - theta_1)
+    alpha = np.select(
+        [
+            copilot_confidence < theta_1,
+            copilot_confidence > theta_2,
+            theta_1 == theta_2,
+        ],
+        [0.0, 1.0, np.where(copilot_confidence > theta_1, 1.0, 0.0)],
+        slope,
+    )
+
+    # Linear Blending
+    with np.errstate(invalid="ignore"):  # for the rows that are not blended
+        blended = take(values, pilot) * (1 - alpha) + take(values, copilot) * alpha
+    return np.select([n_kept == 0, n_kept == 1], [0.0, take(values, first)], blended)
+
+
+def merge_continuous_sum(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Same as not math.isclose(value, 0.0, abs_tol=1e-1), NaN included
+    counted = ~(np.abs(values) <= 1e-1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):  # for the entries and rows that are not counted
+        values_sum = sum_in_order(np.where(counted, values * confidences, 0.0))
+        weights_sum = sum_in_order(np.where(counted, confidences, 0.0))
+        merged = values_sum / weights_sum
+
+    return np.where((weights_sum > 0) & (merged != 0), merged, 0.0)
+
+
+def merge_continuous_supervision_by_pilot(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Same as not math.isclose(value, 0.0, abs_tol=1e-2), NaN included
+    supervising = (roles == PolicyRole.PILOT) & ~(np.abs(values) <= 1e-2)
+    found, pilot = first_index(supervising)
+
+    return np.where(
+        found,
+        take(values, pilot),
+        merge_continuous_sum(values, confidences, roles, timestamps),
+    )
+
+
+def merge_exclusivity(
+    values: npt.NDArray[np.float64],
+    confidences: npt.NDArray[np.float64],
+    roles: npt.NDArray[np.str_],
+    timestamps: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[:-1])
+    first = values[..., 0]
+    return np.where(first != 0, first, 0.0)
+
+
+# The kernel of each policy. Subclasses of a policy don't inherit its kernel, as they may merge differently
+KERNELS: dict[type[Policy], Kernel] = {
+    PolicyBinaryAND: merge_binary_and,
+    PolicyBinaryOR: merge_binary_or,
+    PolicyBinaryDemocracy: merge_binary_democracy,
+    PolicyBinarySupervisionByPilot: merge_binary_supervision_by_pilot,
+    PolicyContinuousOR: merge_continuous_or,
+    PolicyContinuousSlope: merge_continuous_slope,
+    PolicyContinuousSum: merge_continuous_sum,
+    PolicyContinuousSupervisionByPilot: merge_continuous_supervision_by_pilot,
+    PolicyExclusivity: merge_exclusivity,
+}
@@ -1,7 +1,14 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
 from .input_entry import InputEntry
 
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
 
 class Policy(ABC):
     """Policy is the abstract superclass for all policies, binary or continuous."""
@@ -24,6 +31,32 @@ class Policy(ABC):
     def merge_input_entries(entries: list[InputEntry]) -> float:
         pass
 
+    @classmethod
+    def merge_arrays(
+        cls,
+        values: npt.NDArray[np.float64],
+        confidences: npt.NDArray[np.float64],
+        roles: npt.NDArray[np.str_],
+        timestamps: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        """
+        Vectorized merge_input_entries: merges many lists of entries at once, and returns the same values, bit for
+        bit. It requires numpy.
+
+        The entries are along the last axis of the arrays (which broadcast together), and the result has the shape
+        of the other axes. The kernels are in the kernels module (see KERNELS): policies without one merge each list
+        with merge_input_entries.
+
+        Args:
+            values (NDArray[float64]): The values of the inputs.
+            confidences (NDArray[float64]): The confidence levels of the inputs.
+            roles (NDArray[str_]): The PolicyRole of the actors.
+            timestamps (NDArray[float64]): The acquisition times of the inputs.
+        """
+        from .kernels import merge_arrays
+
+        return merge_arrays(cls, values, confidences, roles, timestamps)
+
 
 class BinaryPolicy(Policy, ABC):
     """BinaryPolicy is the abstract superclass for all binary policies."""
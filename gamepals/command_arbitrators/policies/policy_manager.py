@@ -1,11 +1,12 @@
 import logging
 from dataclasses import dataclass
+from typing import Callable
 
 from gamepals.agents import Actor, ActorID, HumanActor, SWAgentActor
 from gamepals.agents.actions import GameAction
 from gamepals.utils.configuration_handler import ConfigurationHandler
 
-from .input_entry import PolicyRole
+from .input_entry import ActionInputRecord, InputEntry, PolicyRole
 from .policy import Policy
 from .policy_continuous_or import PolicyContinuousOR
 
@@ -18,6 +19,23 @@ class PolicyMapEntry:
     actors: dict[ActorID, PolicyRole]
 
 
+@dataclass
+class CompiledPolicy:
+    """
+    A PolicyMapEntry frozen for the merges: the Input Entries of the actors are built once, in a fixed order,
+    and refer to the ActionInputRecords where the inputs are stored, so they are always up to date.
+    """
+
+    policy_type: type[Policy]
+    actor_slots: dict[ActorID, int]  # Index of the actor in entries
+    roles: list[PolicyRole]
+    records: list[ActionInputRecord]
+    entries: list[InputEntry]
+
+    def merge(self) -> float:
+        return self.policy_type.merge_input_entries(self.entries)
+
+
 logger = logging.getLogger(__file__)
 
 
@@ -75,6 +93,31 @@ class PolicyManager:
             else:
                 raise ValueError(f"Action {action} allows maximum {max_actors} actors")
 
+    def compile(
+        self, get_record: Callable[[ActorID, GameAction], ActionInputRecord]
+    ) -> dict[GameAction, CompiledPolicy]:
+        """
+        Freezes the registered Policies and Actors into a CompiledPolicy for each action.
+        get_record returns the ActionInputRecord where the input of an Actor for an action is stored.
+        """
+        compiled = dict()
+        for action, policy_entry in self.policies_map.items():
+            actor_ids = list(policy_entry.actors.keys())
+            roles = [policy_entry.actors[actor_id] for actor_id in actor_ids]
+            records = [get_record(actor_id, action) for actor_id in actor_ids]
+
+            compiled[action] = CompiledPolicy(
+                policy_type=policy_entry.policy_type,
+                actor_slots={actor_id: i for i, actor_id in enumerate(actor_ids)},
+                roles=roles,
+                records=records,
+                entries=[
+                    InputEntry(actor_id, role, record)
+                    for actor_id, role, record in zip(actor_ids, roles, records)
+                ],
+            )
+        return compiled
+
     def get_policy(self, action: GameAction) -> PolicyMapEntry:
         found = self.policies_map.get(action)
         if found is None:
@@ -0,0 +1,243 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from gamepals.agents import Actor, ActorID, HumanActor, SWAgentActor
+from gamepals.agents.actions import ActionConversionManager, ActionInputWithConfidence, GameAction
+from gamepals.agents.observer import ActorData, MessageData
+from gamepals.sources import PhysicalControllerListener, RecordingGamepad, VirtualControllerProvider
+from gamepals.sources.game import GameState, GameStateListener
+from gamepals.utils.configuration_handler import ConfigurationHandler
+
+from .command_arbitrator import CommandArbitrator
+from .session_recorder import RecordedActor, SessionReader
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayGameStateListener(GameStateListener):
+    """The Game State Listener of the replayed Software Agents. It never receives a Game State"""
+
+    def start_listening(self) -> None:
+        pass
+
+    def get_json(self) -> dict[str, Any]:
+        return dict()
+
+
+class ReplayAgentActor(SWAgentActor):
+    """
+    ReplayAgentActor stands in for a recorded Software Agent: it doesn't compute any action, as its recorded inputs
+    are replayed instead. A subclass is made for every agent name (see ReplayEngine), as agents are identified by
+    their class name in the configuration.
+    """
+
+    def __init__(self, game_state: GameStateListener, actions: list[GameAction]) -> None:
+        super().__init__(game_state)
+        self.actions = actions
+
+    def compute_actions(self, game_state: GameState) -> list[ActionInputWithConfidence]:
+        return list()
+
+    def get_controllable_actions(self) -> list[GameAction]:
+        return self.actions
+
+
+class ReplayVirtualController(VirtualControllerProvider):
+    """
+    The Virtual Controller of a replay: it records its reports instead of sending them to a device (see
+    RecordingGamepad), and doesn't wait for the game when it's reset.
+    """
+
+    RESET_DELAYS = (0.0, 0.0)
+
+    def __init__(self) -> None:
+        super().__init__(RecordingGamepad)
+
+    @property
+    def recording_gamepad(self) -> RecordingGamepad:
+        """The gamepad recording the reports. Raises RuntimeError if the controller isn't started"""
+        if not isinstance(self.gamepad, RecordingGamepad):
+            raise RuntimeError("The virtual controller of the replay isn't started")
+        return self.gamepad
+
+
+@dataclass
+class ReplayStats:
+    inputs: int = 0
+    dropped_inputs: int = 0  # Inputs for actions their actor doesn't control in the configuration
+    messages: int = 0
+    game_packets: int = 0
+    batches: int = 0
+    reports: int = 0  # Reports sent to the virtual controller
+    recorded_seconds: float = 0.0
+    replay_seconds: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than real time the session was replayed"""
+        return self.recorded_seconds / self.replay_seconds if self.replay_seconds > 0 else 0.0
+
+
+class ReplayEngine:
+    """
+    ReplayEngine feeds a session recorded by a SessionRecorder back through a CommandArbitrator, as fast as the CPU
+    allows, to evaluate policies and confidence levels on recorded sessions.
+
+    The arbitrator is built from the current configuration, so its policies and roles can differ from the recorded
+    session, and so can the confidence levels of the humans (with use_recorded_confidences=False).
+    The recorded Actors are replaced by stand-ins that don't read any controller or game state, and the virtual
+    controller doesn't need a device: the reports it sends are collected in reports, with the time of the inputs
+    that produced them.
+
+    Updates are arbitrated one at a time, as they were received. With a tick rate, they are arbitrated together with
+    the updates recorded in the same tick instead, like the fixed-rate CommandArbitrator does.
+    """
+
+    def __init__(
+        self,
+        conversion_manager: ActionConversionManager,
+        tick_rate: float | None = None,
+        use_recorded_confidences: bool = True,
+        on_game_packet: Callable[[float, bytes], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            tick_rate (float | None, optional): The frequency (in Hz) of the arbitration ticks. If None, every update
+                is arbitrated on its own.
+            use_recorded_confidences (bool, optional): If False, the inputs of the humans get the confidence levels of
+                the configuration instead of the recorded ones.
+            on_game_packet (Callable[[float, bytes], None] | None, optional): Called with the time and the payload
+                of every recorded game state packet.
+        """
+        self.config_handler = ConfigurationHandler()
+        self.conversion_manager = conversion_manager
+        self.tick_rate = tick_rate
+        self.use_recorded_confidences = use_recorded_confidences
+        self.on_game_packet = on_game_packet
+
+        self.arbitrator = CommandArbitrator(
+            self.config_handler.get_policy_types(), conversion_manager, tick_rate
+        )
+        self.virtual_controller = ReplayVirtualController()
+        self.arbitrator.virtual_controller = self.virtual_controller
+        self.game_state_listener = ReplayGameStateListener()
+
+        self.reports: list[tuple[float, bytes]] = list()
+        self.stats = ReplayStats()
+
+        self.__actors: dict[ActorID, Actor] = dict()  # Recorded actor id -> stand-in
+        self.__controlled_actions: dict[ActorID, frozenset[GameAction]] = dict()
+        self.__agent_types: dict[str, type[ReplayAgentActor]] = dict()
+        self.__started = False
+
+    def run(self, path: str) -> ReplayStats:
+        """Replays the session recorded at path, returning its stats"""
+        started_at = time.perf_counter()
+        first_timestamp: float | None = None
+        timestamp = 0.0
+
+        updates: list[ActorData | MessageData] = list()
+        timestamps: list[float] = list()
+        tick = 0
+
+        for timestamp, record in SessionReader(path, self.config_handler.get_game_action_type()):
+            if isinstance(record, RecordedActor):
+                self.__add_actor(record)
+                continue
+
+            if not self.__started:
+                self.__start()
+            if first_timestamp is None:
+                first_timestamp = timestamp
+
+            if isinstance(record, bytes):
+                self.stats.game_packets += 1
+                if self.on_game_packet is not None:
+                    self.on_game_packet(timestamp, record)
+                continue
+
+            update = self.__to_replayed(record)
+            if update is None:
+                continue
+
+            if self.tick_rate:
+                record_tick = int((timestamp - first_timestamp) * self.tick_rate)
+                if record_tick != tick:
+                    self.__arbitrate(updates, timestamps)
+                    tick = record_tick
+                updates.append(update)
+                timestamps.append(timestamp)
+            else:
+                self.__arbitrate([update], [timestamp])
+
+        self.__arbitrate(updates, timestamps)
+
+        self.stats.recorded_seconds = timestamp - (first_timestamp or timestamp)
+        self.stats.replay_seconds = time.perf_counter() - started_at
+        return self.stats
+
+    def __add_actor(self, recorded: RecordedActor) -> None:
+        actor: Actor
+        if recorded.index >= 0:
+            listener = PhysicalControllerListener(recorded.index, late_init=True)
+            actor = HumanActor(listener, self.conversion_manager)
+        else:
+            agent_type = self.__agent_types.get(recorded.name, None)
+            if agent_type is None:
+                agent_type = type(recorded.name, (ReplayAgentActor,), dict())
+                self.__agent_types[recorded.name] = agent_type
+            actor = agent_type(self.game_state_listener, recorded.actions)
+
+        self.arbitrator.add_actor(actor)
+        self.__actors[recorded.actor_id] = actor
+
+    def __start(self) -> None:
+        """Prepares the arbitrator once all the recorded actors are added"""
+        self.arbitrator.compile()
+        self.virtual_controller.start()
+        self.__controlled_actions = {
+            actor_id: frozenset(actor.get_controlled_actions())
+            for actor_id, actor in self.__actors.items()
+        }
+        self.__started = True
+
+    def __to_replayed(self, update: ActorData | MessageData) -> ActorData | MessageData | None:
+        """Returns the update as sent by the stand-in of its actor, or None if it is dropped"""
+        actor = self.__actors[update.actor_id]
+
+        if isinstance(update, MessageData):
+            self.stats.messages += 1
+            return MessageData(actor.get_id(), update.message)
+
+        action = update.data.action
+        if action not in self.__controlled_actions[update.actor_id]:
+            self.stats.dropped_inputs += 1
+            return None
+
+        confidence = update.data.confidence
+        if not self.use_recorded_confidences and isinstance(actor, HumanActor):
+            confidence = actor.confidence_levels.get(action, confidence)
+
+        self.stats.inputs += 1
+        return ActorData(
+            actor.get_id(), ActionInputWithConfidence(action, update.data.val, confidence)
+        )
+
+    def __arbitrate(
+        self, updates: list[ActorData | MessageData], timestamps: list[float]
+    ) -> None:
+        if len(updates) == 0:
+            return
+
+        self.arbitrator._arbitrate(updates, timestamps)
+        self.stats.batches += 1
+
+        gamepad = self.virtual_controller.recording_gamepad
+        self.reports.extend((timestamps[-1], report) for report in gamepad.flushed_reports)
+        self.stats.reports += len(gamepad.flushed_reports)
+        gamepad.flushed_reports.clear()
+
+        updates.clear()
+        timestamps.clear()
@@ -0,0 +1,275 @@
+import logging
+import struct
+import threading as th
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, Type
+
+from gamepals.agents import Actor, ActorID, HumanActor, SWAgentActor
+from gamepals.agents.actions import ActionInputWithConfidence, GameAction
+from gamepals.agents.observer import ActorData, ActorObserver, MessageData
+from gamepals.utils.configuration_handler import ConfigurationHandler
+from gamepals.utils.logging import Loggable
+
+logger = logging.getLogger(__name__)
+
+# This file contains the format of the session recordings, with their writer and reader.
+#
+# A recording is a header (FILE_HEADER_STRUCT) followed by records. Every record starts with RECORD_STRUCT (kind and
+# time.time() of the record), followed by:
+# * STRING: id and length (uint16) of an UTF-8 string. Actor ids, names and actions are written once as strings, and
+#   referred to by their id afterwards;
+# * ACTOR: slot of the actor, index of the human (-1 for software agents), ids of the actor id and name strings,
+#   number of controlled actions and the ids of their strings;
+# * INPUT: slot of the actor, id of the action string, value and confidence (float64, as they are sent);
+# * MESSAGE: slot of the actor, length (uint16) of the UTF-8 message;
+# * GAME_PACKET: length (uint32) of the payload of a game state packet, as it was received from the game.
+# All the values are little-endian.
+
+MAGIC = b"GPRS"
+VERSION = 1
+FILE_HEADER_STRUCT = struct.Struct("<4sB")
+
+RECORD_STRUCT = struct.Struct("<Bd")  # kind, timestamp
+STRING = 0
+ACTOR = 1
+INPUT = 2
+MESSAGE = 3
+GAME_PACKET = 4
+
+STRING_STRUCT = struct.Struct("<HH")  # id, length
+ACTOR_STRUCT = struct.Struct("<HhHHH")  # slot, human index, actor id, name, number of actions
+ACTION_ID_STRUCT = struct.Struct("<H")
+INPUT_STRUCT = struct.Struct("<HHdd")  # slot, action, value, confidence
+MESSAGE_STRUCT = struct.Struct("<HH")  # slot, length
+MAX_MESSAGE_LENGTH = (1 << 16) - 1  # bytes, longer messages are truncated
+GAME_PACKET_STRUCT = struct.Struct("<I")  # length
+
+
+@dataclass
+class RecordedActor:
+    """An Actor of a recorded session"""
+
+    actor_id: ActorID
+    name: str
+    index: int  # Index of the human in the configuration, -1 for software agents
+    actions: list[GameAction]  # The actions it was controlling
+
+
+class SessionRecorder(ActorObserver, Loggable):
+    """
+    SessionRecorder records a session in a compact binary file: every input and message sent by the Actors and every
+    game state packet received from the game, with the time they were received at. Sessions can be replayed
+    with a ReplayEngine.
+
+    Actors are recorded with add_actor, before they are started. Records are written by the threads of the Actors
+    and of the game state listener, one at a time, through a buffered file.
+    """
+
+    FILE_BUFFER_SIZE = 1 << 16  # bytes
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__file = open(path, "wb", buffering=self.FILE_BUFFER_SIZE)
+        self.__lock = th.Lock()
+        self.__strings: dict[str, int] = dict()
+        self.__slots: dict[ActorID, int] = dict()
+        self.__closed = False
+
+        self.inputs = 0
+        self.messages = 0
+        self.game_packets = 0
+        self.bytes_written = 0
+
+        self.__write(FILE_HEADER_STRUCT.pack(MAGIC, VERSION))
+
+    def add_actor(self, actor: Actor) -> None:
+        """Records the Actor and subscribes to its inputs and messages"""
+        index = -1
+        name = actor.__class__.__name__
+        if isinstance(actor, HumanActor):
+            index = actor.get_index()
+        elif isinstance(actor, SWAgentActor):
+            name = actor.get_name()
+        actions = actor.get_controlled_actions()
+
+        with self.__lock:
+            slot = len(self.__slots)
+            self.__slots[actor.get_id()] = slot
+            actor_id = self.__string(actor.get_id())
+            name_id = self.__string(name)
+            action_ids = [self.__string(action) for action in actions]
+
+            self.__write(RECORD_STRUCT.pack(ACTOR, time.time()))
+            self.__write(ACTOR_STRUCT.pack(slot, index, actor_id, name_id, len(action_ids)))
+            for action_id in action_ids:
+                self.__write(ACTION_ID_STRUCT.pack(action_id))
+
+        actor.subscribe(self)
+
+    def on_input_update(self, actor_data: ActorData) -> None:
+        with self.__lock:
+            slot = self.__slots.get(actor_data.actor_id, None)
+            if self.__closed or slot is None:
+                return
+
+            action_id = self.__string(actor_data.data.action)
+            self.__write(RECORD_STRUCT.pack(INPUT, time.time()))
+            self.__write(
+                INPUT_STRUCT.pack(
+                    slot, action_id, actor_data.data.val, actor_data.data.confidence
+                )
+            )
+            self.inputs += 1
+
+    def on_message_update(self, message_data: MessageData) -> None:
+        with self.__lock:
+            slot = self.__slots.get(message_data.actor_id, None)
+            if self.__closed or slot is None:
+                return
+
+            message = message_data.message.encode()
+            if len(message) > MAX_MESSAGE_LENGTH:
+                logger.warning(
+                    f"Message of {len(message)} bytes from {message_data.actor_id} truncated to "
+                    f"{MAX_MESSAGE_LENGTH} bytes"
+                )
+                # Without the bytes of a character cut in half
+                message = message[:MAX_MESSAGE_LENGTH].decode(errors="ignore").encode()
+            self.__write(RECORD_STRUCT.pack(MESSAGE, time.time()))
+            self.__write(MESSAGE_STRUCT.pack(slot, len(message)))
+            self.__write(message)
+            self.messages += 1
+
+    def record_game_packet(self, payload: bytes | memoryview) -> None:
+        """Records the payload of a game state packet, as it was received from the game"""
+        with self.__lock:
+            if self.__closed:
+                return
+
+            self.__write(RECORD_STRUCT.pack(GAME_PACKET, time.time()))
+            self.__write(GAME_PACKET_STRUCT.pack(len(payload)))
+            self.__write(payload)
+            self.game_packets += 1
+
+    def close(self) -> None:
+        """Writes the buffered records and closes the file. Later records are ignored"""
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__file.close()
+        logger.info(f"Recorded session to {self.path} ({self.bytes_written} bytes)")
+
+    def __string(self, string: str) -> int:
+        """Returns the id of the string, writing it first if it's new. Must be called with the lock held"""
+        string_id = self.__strings.get(string, None)
+        if string_id is None:
+            string_id = len(self.__strings)
+            self.__strings[string] = string_id
+            encoded = string.encode()
+            self.__write(RECORD_STRUCT.pack(STRING, time.time()))
+            self.__write(STRING_STRUCT.pack(string_id, len(encoded)))
+            self.__write(encoded)
+        return string_id
+
+    def __write(self, data: bytes | memoryview) -> None:
+        self.__file.write(data)
+        self.bytes_written += len(data)
+
+    def get_json(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "inputs": self.inputs,
+            "messages": self.messages,
+            "game_packets": self.game_packets,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class SessionReader:
+    """
+    SessionReader reads a session recorded by a SessionRecorder.
+
+    Iterating over it yields the time of each record with a RecordedActor, an ActorData, a MessageData or the
+    payload of a game state packet (bytes). ActorData and MessageData refer to the actor ids of the recording.
+    A recording that was cut short (e.g. the program was killed) is read up to its last complete record.
+    """
+
+    def __init__(self, path: str, game_action_type: Type[GameAction] | None = None) -> None:
+        """
+        Args:
+            game_action_type (Type[GameAction] | None, optional): The Game Actions of the recorded game.
+                Defaults to the one of the configuration.
+        """
+        self.path = path
+        self.game_action_type = (
+            game_action_type or ConfigurationHandler().get_game_action_type()
+        )
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[float, RecordedActor | ActorData | MessageData | bytes]]:
+        with open(self.path, "rb") as file:
+            header = file.read(FILE_HEADER_STRUCT.size)
+            if len(header) < FILE_HEADER_STRUCT.size:
+                raise ValueError(f"{self.path} is not a session recording")
+            magic, version = FILE_HEADER_STRUCT.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a session recording")
+            if version != VERSION:
+                raise ValueError(f"Unsupported session recording version {version}")
+
+            strings: list[str] = list()
+            actors: list[ActorID] = list()
+
+            def read(size: int) -> bytes:
+                data = file.read(size)
+                if len(data) < size:
+                    raise EOFError
+                return data
+
+            try:
+                while True:
+                    record_header = file.read(RECORD_STRUCT.size)
+                    if len(record_header) == 0:
+                        return
+                    if len(record_header) < RECORD_STRUCT.size:
+                        raise EOFError
+                    kind, timestamp = RECORD_STRUCT.unpack(record_header)
+
+                    if kind == INPUT:
+                        slot, action_id, val, confidence = INPUT_STRUCT.unpack(
+                            read(INPUT_STRUCT.size)
+                        )
+                        action = self.game_action_type(strings[action_id])
+                        yield timestamp, ActorData(
+                            actors[slot], ActionInputWithConfidence(action, val, confidence)
+                        )
+                    elif kind == GAME_PACKET:
+                        (length,) = GAME_PACKET_STRUCT.unpack(read(GAME_PACKET_STRUCT.size))
+                        yield timestamp, read(length)
+                    elif kind == STRING:
+                        _, length = STRING_STRUCT.unpack(read(STRING_STRUCT.size))
+                        strings.append(read(length).decode())
+                    elif kind == MESSAGE:
+                        slot, length = MESSAGE_STRUCT.unpack(read(MESSAGE_STRUCT.size))
+                        yield timestamp, MessageData(actors[slot], read(length).decode())
+                    elif kind == ACTOR:
+                        _, index, actor_id, name_id, n_actions = ACTOR_STRUCT.unpack(
+                            read(ACTOR_STRUCT.size)
+                        )
+                        action_ids = struct.unpack(
+                            f"<{n_actions}H", read(ACTION_ID_STRUCT.size * n_actions)
+                        )
+                        actors.append(ActorID(strings[actor_id]))
+                        yield timestamp, RecordedActor(
+                            actor_id=actors[-1],
+                            name=strings[name_id],
+                            index=index,
+                            actions=[self.game_action_type(strings[i]) for i in action_ids],
+                        )
+                    else:
+                        raise ValueError(f"Unknown record kind {kind} in {self.path}")
+            except EOFError:
+                logger.warning(f"Session recording {self.path} ends with a truncated record")
@@ -1,10 +1,16 @@
 from . import controller, game
+from .device_watcher import DeviceWatcher
+from .physical_controller_hub import PhysicalControllerHub
 from .physical_controller_listener import PhysicalControllerListener
+from .recording_gamepad import RecordingGamepad
 from .virtual_controller_provider import VirtualControllerProvider
 
 __all__ = [
+    "DeviceWatcher",
+    "PhysicalControllerHub",
     "PhysicalControllerListener",
     "VirtualControllerProvider",
+    "RecordingGamepad",
     "game",
     "controller",
 ]
@@ -9,6 +9,7 @@ class InputData:
     """The wrapper class of the Data sent to a Controller Observer"""
 
     c_input: ControllerInput
+    read_at: float | None = None  # time.perf_counter() when the input was read from the controller
 
 
 class ControllerObserver(ABC):
@@ -0,0 +1,129 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import struct
+import sys
+
+from .physical_controller_listener import RefreshableDeviceManager
+
+
+class DeviceWatcher:
+    """
+    DeviceWatcher reports the gamepads connected and disconnected, as udev adds and removes their links in the by-id
+    directory of the input devices. It watches the directory with inotify (Linux only), and its parent too, as the
+    directory only exists while at least one device is linked there.
+
+    Its file descriptor becomes readable when there are changes, so it can be waited on with a selector.
+    """
+
+    # Flags of inotify(7)
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    CONNECTED_MASK = IN_CREATE | IN_MOVED_TO | IN_ATTRIB
+    DISCONNECTED_MASK = IN_DELETE | IN_MOVED_FROM
+
+    # struct inotify_event: watch descriptor, mask, cookie, length of the name that follows
+    EVENT_STRUCT = struct.Struct("iIII")
+    READ_SIZE = 4096
+
+    def __init__(self, root: str = RefreshableDeviceManager.DEVICES_ROOT) -> None:
+        """
+        Args:
+            root (str, optional): The directory of the input devices. Defaults to /dev/input.
+        """
+        self.root = root
+        self.by_id = os.path.join(root, "by-id")
+
+        self.__libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.__fd = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.__root_watch = self.__add_watch(root, self.IN_CREATE | self.IN_MOVED_TO)
+        self.__by_id_watch: int | None = None
+        self.__watch_by_id()
+
+    @staticmethod
+    def is_supported() -> bool:
+        return sys.platform.startswith("linux")
+
+    def fileno(self) -> int:
+        return self.__fd
+
+    def read_changes(self) -> list[tuple[bool, str]]:
+        """
+        Returns the gamepads connected (True) and disconnected (False) since the last call, in order, as the paths of
+        their links. A gamepad can be reported as connected more than once.
+        """
+        data = b""
+        try:
+            while chunk := os.read(self.__fd, self.READ_SIZE):
+                data += chunk
+        except BlockingIOError:
+            pass
+
+        changes: list[tuple[bool, str]] = list()
+        offset = 0
+        while offset + self.EVENT_STRUCT.size <= len(data):
+            watch, mask, _, length = self.EVENT_STRUCT.unpack_from(data, offset)
+            offset += self.EVENT_STRUCT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            if watch == self.__root_watch:
+                if mask & self.IN_ISDIR and name == "by-id" and self.__watch_by_id():
+                    # Links made before the directory was watched have no event of their own
+                    changes.extend((True, path) for path in self.list_gamepads())
+            elif watch == self.__by_id_watch:
+                if mask & (self.IN_IGNORED | self.IN_DELETE_SELF):
+                    self.__by_id_watch = None
+                elif fnmatch.fnmatch(name, RefreshableDeviceManager.GAMEPAD_PATTERN):
+                    path = os.path.join(self.by_id, name)
+                    if mask & self.CONNECTED_MASK:
+                        changes.append((True, path))
+                    elif mask & self.DISCONNECTED_MASK:
+                        changes.append((False, path))
+        return changes
+
+    def list_gamepads(self) -> list[str]:
+        """Returns the paths of the links of the gamepads connected"""
+        try:
+            names = os.listdir(self.by_id)
+        except FileNotFoundError:
+            return list()
+        return [
+            os.path.join(self.by_id, name)
+            for name in sorted(names)
+            if fnmatch.fnmatch(name, RefreshableDeviceManager.GAMEPAD_PATTERN)
+        ]
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+    def __watch_by_id(self) -> bool:
+        """Starts watching the by-id directory, if it exists. Returns True if it wasn't watched before"""
+        if self.__by_id_watch is not None:
+            return False
+        try:
+            self.__by_id_watch = self.__add_watch(
+                self.by_id, self.CONNECTED_MASK | self.DISCONNECTED_MASK | self.IN_DELETE_SELF
+            )
+        except FileNotFoundError:
+            return False
+        return True
+
+    def __add_watch(self, path: str, mask: int) -> int:
+        watch = self.__libc.inotify_add_watch(self.__fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if watch < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)  # FileNotFoundError if path doesn't exist
+        return watch
@@ -0,0 +1,64 @@
+import struct
+import sys
+from typing import Any, Iterable, NamedTuple
+
+from .controller import InputType
+from .input_conditioning import AnalogAxis
+
+
+class EventTarget(NamedTuple):
+    """What the events of a code of a gamepad are translated to"""
+
+    positive: InputType  # The InputType of the values >= 0
+    negative: InputType  # The InputType of the values < 0 (the other side of a stick axis, otherwise positive)
+    divisor: int  # The values are divided by it to be normalized (1 for buttons, which are left as they are)
+    axis: AnalogAxis | None  # The analog axis of the code, if it can be conditioned
+
+
+class EventTranslator:
+    """
+    EventTranslator translates the events of a gamepad into EventTargets and their values, with tables compiled once
+    per device: the evdev (type, code) of every code the gamepad's inputs are mapped from is resolved in advance, with
+    the event codes of the gamepad's DeviceManager. A whole batch of events is translated in one pass, and Sync
+    events and unmapped codes are dropped before any object is made for them.
+
+    Events can be translated from the bytes read from an evdev device (translate_raw), or from the events of the
+    inputs package (translate_events), as on Windows.
+    """
+
+    # struct input_event, skipping its timestamp (two longs): its type and code read together as the key of the
+    # tables, and its value
+    RAW_EVENT_STRUCT = struct.Struct(f"{struct.calcsize('ll')}xIi")
+
+    def __init__(self, codes: dict[str, Any], targets: dict[str, EventTarget]) -> None:
+        """
+        Args:
+            codes (dict[str, Any]): The event codes of the DeviceManager of the gamepad ("types", and the codes of
+                each type by name).
+            targets (dict[str, EventTarget]): The EventTarget of the codes (by name, e.g. "ABS_X") to translate.
+        """
+        self.named_table = dict(targets)
+        self.raw_table: dict[int, EventTarget] = dict()
+        for ev_type, type_name in codes.get("types", dict()).items():
+            for code, name in codes.get(type_name, dict()).items():
+                if name in targets:
+                    self.raw_table[self.raw_key(ev_type, code)] = targets[name]
+
+    @staticmethod
+    def raw_key(ev_type: int, code: int) -> int:
+        """Returns the key of the table for the type and code of an event, as RAW_EVENT_STRUCT reads them"""
+        return ev_type | code << 16 if sys.byteorder == "little" else ev_type << 16 | code
+
+    def translate_raw(self, data: bytes) -> list[tuple[EventTarget, int]]:
+        """Translates the events in data, a whole number of struct input_event read from an evdev device"""
+        table = self.raw_table
+        return [
+            (target, value)
+            for key, value in self.RAW_EVENT_STRUCT.iter_unpack(data)
+            if (target := table.get(key)) is not None
+        ]
+
+    def translate_events(self, events: Iterable[Any]) -> list[tuple[EventTarget, int]]:
+        """Translates events of the inputs package"""
+        table = self.named_table
+        return [(target, event.state) for event in events if (target := table.get(event.code)) is not None]
@@ -4,4 +4,7 @@ from abc import ABC
 class GameState(ABC):
     """GameState is the Superclass of any Game State class being sent to SW Agents"""
 
-    pass
+    # time.perf_counter() of when the state was received from the game and of when it was decoded, 0 if unknown.
+    # They are used to trace the Software Agents (see Tracer)
+    received_at: float = 0.0
+    decoded_at: float = 0.0
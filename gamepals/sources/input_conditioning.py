@@ -0,0 +1,190 @@
+import math
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+
+class AnalogAxis(StrEnum):
+    """An analog axis of an XBOX 360 Controller, before sticks are split into their positive and negative sides"""
+
+    STICK_LEFT_X = "Stick_Left_X"  # Values are in [-1, 1]
+    STICK_LEFT_Y = "Stick_Left_Y"
+    STICK_RIGHT_X = "Stick_Right_X"
+    STICK_RIGHT_Y = "Stick_Right_Y"
+    TRIGGER_LEFT = "Trigger_Left"  # Values are in [0, 1]
+    TRIGGER_RIGHT = "Trigger_Right"
+
+    def get_other_stick_axis(self) -> "AnalogAxis | None":
+        """Returns the other axis of the same stick, or None for triggers"""
+        return _OTHER_STICK_AXIS.get(self, None)
+
+
+_OTHER_STICK_AXIS = {
+    AnalogAxis.STICK_LEFT_X: AnalogAxis.STICK_LEFT_Y,
+    AnalogAxis.STICK_LEFT_Y: AnalogAxis.STICK_LEFT_X,
+    AnalogAxis.STICK_RIGHT_X: AnalogAxis.STICK_RIGHT_Y,
+    AnalogAxis.STICK_RIGHT_Y: AnalogAxis.STICK_RIGHT_X,
+}
+
+
+@dataclass(frozen=True)
+class ConditioningSettings:
+    """
+    How the values of an AnalogAxis are conditioned, in order:
+
+    * radial_deadzone: sticks only. If the distance of the stick from its center is below it, both its axes are 0,
+      otherwise the distance is rescaled from [radial_deadzone, 1] to [0, 1].
+    * deadzone: values closer to 0 are 0, the others are rescaled from [deadzone, 1] to [0, 1].
+    * quantization: values are rounded to a multiple of it.
+    * threshold: values that differ from the last one sent by less than it are dropped, unless they are 0 or 1.
+    * max_rate: at most max_rate values (per second) are sent. The values that come sooner are coalesced: only the
+      last one is sent, when allowed.
+
+    0 disables a stage.
+    """
+
+    radial_deadzone: float = 0.0
+    deadzone: float = 0.0
+    quantization: float = 0.0
+    threshold: float = 0.0
+    max_rate: float = 0.0  # Hz
+
+    def __post_init__(self) -> None:
+        for name in ("radial_deadzone", "deadzone"):
+            if not 0.0 <= getattr(self, name) < 1.0:
+                raise ValueError(f"Invalid input conditioning: {name} must be in [0, 1)")
+        for name in ("quantization", "threshold", "max_rate"):
+            if getattr(self, name) < 0.0:
+                raise ValueError(f"Invalid input conditioning: {name} can't be negative")
+
+    @classmethod
+    def from_dict(cls, config: dict[str, Any]) -> "ConditioningSettings":
+        """Reads the settings from a [[conditioning]] table of the assistance configuration"""
+        return cls(**{name: float(config[name]) for name in cls.__dataclass_fields__ if name in config})
+
+
+class AxisState:
+    __slots__ = ("settings", "raw", "sent", "sent_at", "pending", "pending_read_at")
+
+    def __init__(self, settings: ConditioningSettings) -> None:
+        self.settings = settings
+        self.raw = 0.0  # Last value received
+        self.sent: float | None = None  # Last value sent
+        self.sent_at = -math.inf  # time.perf_counter() when it was sent
+        self.pending: float | None = None  # Value coalesced by max_rate, to be sent at deadline
+        self.pending_read_at = 0.0
+
+    @property
+    def deadline(self) -> float:
+        return self.sent_at + 1 / self.settings.max_rate
+
+
+class InputConditioner:
+    """
+    InputConditioner conditions the values of the analog axes of a Physical Controller before they become Controller
+    Inputs, to filter the noise of the sticks and limit the rate of their updates (see ConditioningSettings).
+
+    The values to send are returned with the time.perf_counter() when they were read. The values coalesced by
+    max_rate are returned by flush, which must be called by next_deadline at the latest.
+    """
+
+    def __init__(self, settings: dict[AnalogAxis, ConditioningSettings]) -> None:
+        self.__partners: dict[AnalogAxis, AnalogAxis] = dict()  # The other axis of the sticks with a radial deadzone
+        for axis, axis_settings in settings.items():
+            if axis_settings.radial_deadzone == 0:
+                continue
+            other_axis = axis.get_other_stick_axis()
+            if other_axis is None:
+                raise ValueError(f"Invalid input conditioning: {axis} isn't a stick axis, it has no radial deadzone")
+            if other_axis not in settings or settings[other_axis].radial_deadzone != axis_settings.radial_deadzone:
+                raise ValueError(f"Invalid input conditioning: {axis} and {other_axis} need the same radial deadzone")
+            self.__partners[axis] = other_axis
+
+        self.__axes = {axis: AxisState(axis_settings) for axis, axis_settings in settings.items()}
+        self.received = 0  # Values received
+        self.sent = 0  # Values sent
+
+    def is_conditioned(self, axis: AnalogAxis) -> bool:
+        return axis in self.__axes
+
+    def condition(self, axis: AnalogAxis, value: float, now: float) -> list[tuple[AnalogAxis, float, float]]:
+        """
+        Returns the values to send for a new value of the axis (normalized). A radial deadzone can change the values
+        of both axes of the stick.
+
+        Args:
+            now (float): The time.perf_counter() when the value was read.
+        """
+        self.received += 1
+        state = self.__axes[axis]
+        state.raw = value
+
+        other_axis = self.__partners.get(axis, None)
+        if other_axis is not None:
+            other_state = self.__axes[other_axis]
+            value, other_value = self.__radial_deadzone(value, other_state.raw, state.settings.radial_deadzone)
+            return self.__update(axis, state, value, now) + self.__update(other_axis, other_state, other_value, now)
+
+        return self.__update(axis, state, value, now)
+
+    def flush(self, now: float) -> list[tuple[AnalogAxis, float, float]]:
+        """Returns the values coalesced by max_rate that can be sent by now"""
+        sent = list()
+        for axis, state in self.__axes.items():
+            if state.pending is not None and now >= state.deadline:
+                sent.append(self.__send(axis, state, state.pending, now, state.pending_read_at))
+        return sent
+
+    def next_deadline(self) -> float | None:
+        """Returns the time.perf_counter() when the next coalesced value can be sent, None if there's none"""
+        deadlines = [state.deadline for state in self.__axes.values() if state.pending is not None]
+        return min(deadlines) if deadlines else None
+
+    def __update(
+        self, axis: AnalogAxis, state: AxisState, value: float, now: float
+    ) -> list[tuple[AnalogAxis, float, float]]:
+        settings = state.settings
+        value = self.__deadzone(value, settings.deadzone)
+        if settings.quantization > 0:
+            value = round(value / settings.quantization) * settings.quantization
+        value = max(-1.0, min(value, 1.0))
+
+        if state.sent is not None:
+            is_bound = value == 0.0 or abs(value) == 1.0
+            if value == state.sent or (not is_bound and abs(value - state.sent) < settings.threshold):
+                state.pending = None  # Back to the value sent
+                return list()
+
+        if settings.max_rate > 0 and now < state.deadline:
+            state.pending = value
+            state.pending_read_at = now
+            return list()
+        return [self.__send(axis, state, value, now, now)]
+
+    def __send(
+        self, axis: AnalogAxis, state: AxisState, value: float, now: float, read_at: float
+    ) -> tuple[AnalogAxis, float, float]:
+        state.sent = value
+        state.sent_at = now
+        state.pending = None
+        self.sent += 1
+        return axis, value, read_at
+
+    @staticmethod
+    def __radial_deadzone(x: float, y: float, deadzone: float) -> tuple[float, float]:
+        magnitude = math.hypot(x, y)
+        if magnitude < deadzone:
+            return 0.0, 0.0
+        scale = min((magnitude - deadzone) / (1 - deadzone), 1.0) / magnitude
+        return x * scale, y * scale
+
+    @staticmethod
+    def __deadzone(value: float, deadzone: float) -> float:
+        if abs(value) < deadzone:
+            return 0.0
+        if deadzone == 0:
+            return value
+        return math.copysign((abs(value) - deadzone) / (1 - deadzone), value)
+
+    def get_json(self) -> dict[str, Any]:
+        return {"received": self.received, "sent": self.sent}
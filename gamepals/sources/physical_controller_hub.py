@@ -0,0 +1,312 @@
+import logging
+import os
+import selectors
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from gamepals.utils.logging import Loggable
+
+from .device_watcher import DeviceWatcher
+from .physical_controller_listener import (
+    EvdevGamePad,
+    NonBlockingGamePad,
+    PhysicalControllerListener,
+    RefreshableDeviceManager,
+    UnpluggedError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class DeviceCounters:
+    """The events read from a Physical Controller, counting only the ones translated into inputs"""
+
+    events: int = 0
+    events_per_second: float = 0.0
+    window_events: int = 0  # Events read since the rate was last updated
+    last_notified_at: float = 0.0  # time.perf_counter() of the last notification of the subscribers
+
+
+class PhysicalControllerHub(Loggable):
+    """
+    PhysicalControllerHub reads the inputs of every Physical Controller from a single thread, and notifies the
+    subscribers of each PhysicalControllerListener registered to it, instead of each listener running its own thread
+    and its own RefreshableDeviceManager.
+
+    The gamepads read from their evdev device (see EvdevGamePad) are waited on together with a selector, the others
+    are polled every POLL_INTERVAL. The events of a gamepad are dispatched in the order they are read. As with a
+    listener of its own, the subscribers are notified with None after MAX_WAIT_FOR_INPUT without inputs.
+
+    On Linux, gamepads are attached and detached as soon as they are plugged and unplugged, as reported by a
+    DeviceWatcher. A gamepad plugged again goes back to the listener it had (see PhysicalControllerListener.device_id),
+    a new one to the first listener without a gamepad, preferring the ones that never had one. Elsewhere, the
+    devices are refreshed every CHECK_GAMEPAD_INTERVAL while a listener is waiting for its gamepad.
+    """
+
+    POLL_INTERVAL = 0.001  # seconds
+    RATE_INTERVAL = 1.0  # seconds between two updates of the event rates
+
+    def __init__(self, devices: RefreshableDeviceManager | None = None, watch_devices: bool = True) -> None:
+        """
+        Args:
+            devices (RefreshableDeviceManager | None, optional): The manager of the devices to read the gamepads
+                from. Defaults to a new one.
+            watch_devices (bool, optional): If False, or if the devices can't be watched, the devices are refreshed
+                periodically instead. Defaults to True.
+        """
+        self.devices = devices if devices is not None else RefreshableDeviceManager()
+        self.running: bool = False
+        self.thread: threading.Thread | None = None
+
+        self.__selector = selectors.DefaultSelector()
+        self.__watcher: DeviceWatcher | None = None
+        if watch_devices and DeviceWatcher.is_supported():
+            try:
+                self.__watcher = DeviceWatcher(self.devices.root)
+                self.__selector.register(self.__watcher.fileno(), selectors.EVENT_READ, self.__watcher)
+            except OSError as e:
+                logger.warning("Can't watch the devices (%s), refreshing them periodically instead", e)
+
+        self.__listeners: list[PhysicalControllerListener] = list()
+        self.__polled: list[PhysicalControllerListener] = list()
+        self.__counters: dict[int, DeviceCounters] = dict()
+
+        # Listeners added (True) or removed (False) by other threads, applied by the thread of the hub
+        self.__changes: deque[tuple[bool, PhysicalControllerListener]] = deque()
+        self.__next_devices_check = 0.0
+        self.__rates_updated_at = 0.0
+
+    def add(self, listener: PhysicalControllerListener) -> None:
+        """Starts reading the gamepad of the listener. If it's not connected yet, it's attached once it is"""
+        self.__changes.append((True, listener))
+
+    def remove(self, listener: PhysicalControllerListener) -> None:
+        """Stops reading the gamepad of the listener"""
+        self.__changes.append((False, listener))
+
+    def start(self) -> None:
+        """Starts the thread reading the gamepads"""
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread reading the gamepads, and closes their devices"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        self.__apply_changes()
+        for listener in list(self.__listeners):
+            self.__detach(listener)
+        if self.__watcher is not None:
+            self.__selector.unregister(self.__watcher.fileno())
+            self.__watcher.close()
+            self.__watcher = None
+
+    def _loop(self) -> None:
+        self.__rates_updated_at = time.perf_counter()
+        if self.__watcher is not None:
+            self.devices.update_gamepads()
+
+        while self.running:
+            self.__apply_changes()
+            self.__check_devices()
+
+            timeout = self.POLL_INTERVAL if self.__polled else PhysicalControllerListener.MAX_WAIT_FOR_INPUT
+            deadline = self.__next_conditioning_deadline()
+            if deadline is not None:
+                timeout = max(0.0, min(timeout, deadline - time.perf_counter()))
+            if self.__selector.get_map():
+                ready = self.__selector.select(timeout)
+            else:  # Selecting nothing fails on Windows
+                time.sleep(timeout)
+                ready = []
+
+            for key, _ in ready:
+                if isinstance(key.data, DeviceWatcher):
+                    self.__apply_device_changes(key.data)
+                else:
+                    self.__read(key.data)
+            for listener in list(self.__polled):
+                self.__poll(listener)
+
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                for listener in self.__listeners:
+                    listener.flush_conditioned(now)
+            self.__notify_idle(now)
+            if now - self.__rates_updated_at >= self.RATE_INTERVAL:
+                self.__update_rates(now)
+
+    def __apply_changes(self) -> None:
+        while self.__changes:
+            added, listener = self.__changes.popleft()
+            if added and listener not in self.__listeners:
+                self.__listeners.append(listener)
+                self.__counters.setdefault(listener.get_index(), DeviceCounters())
+                if listener.gamepad is not None:
+                    self.__attach(listener)
+                elif self.__watcher is not None:
+                    self.__assign_gamepads()
+                else:
+                    self.__next_devices_check = 0.0
+            elif not added and listener in self.__listeners:
+                self.__detach(listener)
+                self.__listeners.remove(listener)
+
+    def __check_devices(self) -> None:
+        """Opens the gamepads of the listeners that are waiting for them to be connected, by refreshing the devices"""
+        waiting = [listener for listener in self.__listeners if listener.gamepad is None]
+        if self.__watcher is not None or not waiting or time.perf_counter() < self.__next_devices_check:
+            return
+
+        self.devices.update_gamepads()
+        for listener in waiting:
+            if listener._try_init_gamepad(refresh=False):
+                self.__attach(listener)
+        self.__next_devices_check = time.perf_counter() + PhysicalControllerListener.CHECK_GAMEPAD_INTERVAL
+
+    def __apply_device_changes(self, watcher: DeviceWatcher) -> None:
+        for connected, device_path in watcher.read_changes():
+            if connected:
+                if self.devices.add_gamepad(device_path) is not None:
+                    logger.info("Gamepad connected: %s", device_path)
+                    self.__assign_gamepads()
+                continue
+
+            gamepad = self.devices.remove_gamepad(device_path)
+            if gamepad is None:
+                continue
+            logger.info("Gamepad disconnected: %s", device_path)
+            for listener in self.__listeners:
+                if listener.gamepad is not None and listener.gamepad._gamepad is gamepad:
+                    self.__detach(listener)
+
+    def __assign_gamepads(self) -> None:
+        """Gives the gamepads connected that no listener is reading to the listeners waiting for one"""
+        attached = {
+            listener.gamepad._gamepad._character_device_path
+            for listener in self.__listeners
+            if listener.gamepad is not None
+        }
+        for gamepad in self.devices.gamepads:
+            waiting = [listener for listener in self.__listeners if listener.gamepad is None]
+            if not waiting:
+                return
+            if gamepad._character_device_path in attached:
+                continue
+
+            device_id = os.path.basename(gamepad._device_path)
+            listener = next(
+                (listener for listener in waiting if listener.device_id == device_id),
+                next((listener for listener in waiting if listener.device_id is None), waiting[0]),
+            )
+            listener.attach_gamepad(gamepad)
+            self.__attach(listener)
+
+    def __attach(self, listener: PhysicalControllerListener) -> None:
+        if isinstance(listener.gamepad, EvdevGamePad):
+            self.__selector.register(listener.gamepad.fileno(), selectors.EVENT_READ, listener)
+        else:
+            self.__polled.append(listener)
+        self.__counters[listener.get_index()].last_notified_at = time.perf_counter()
+
+    def __detach(self, listener: PhysicalControllerListener) -> None:
+        """Stops reading the gamepad of the listener, and closes its device"""
+        if isinstance(listener.gamepad, EvdevGamePad):
+            try:
+                self.__selector.unregister(listener.gamepad.fileno())
+            except KeyError:
+                pass
+            listener.gamepad.close()
+        elif listener in self.__polled:
+            self.__polled.remove(listener)
+        listener.gamepad = None
+
+    def __disconnect(self, listener: PhysicalControllerListener, error: Exception) -> None:
+        """Detaches the gamepad of the listener, which can't be read anymore, until it's connected again"""
+        logger.error("Gamepad %d disconnected: %s", listener.get_index(), error)
+        if listener.gamepad is not None:
+            self.devices.remove_gamepad(listener.gamepad._gamepad._device_path)
+        self.__detach(listener)
+        self.__next_devices_check = 0.0
+
+    def __read(self, listener: PhysicalControllerListener) -> None:
+        gamepad = listener.gamepad
+        if not isinstance(gamepad, EvdevGamePad):  # Disconnected by an earlier change of the devices
+            return
+        try:
+            data = gamepad.read_raw()
+        except OSError as e:
+            self.__disconnect(listener, e)
+            return
+        if data:
+            self.__dispatch(listener, listener.dispatch_raw, data)
+
+    def __poll(self, listener: PhysicalControllerListener) -> None:
+        gamepad = listener.gamepad
+        if not isinstance(gamepad, NonBlockingGamePad):
+            return
+        try:
+            events = gamepad.poll()
+        except (OSError, UnpluggedError) as e:
+            self.__disconnect(listener, e)
+            return
+        except Exception as e:
+            logger.error("Error while getting gamepad events: %s", e)
+            return
+        if events:
+            self.__dispatch(listener, listener.dispatch_events, events)
+
+    def __dispatch(
+        self, listener: PhysicalControllerListener, dispatch: Callable[[Any, float], int], events: Any
+    ) -> None:
+        read_at = time.perf_counter()
+        counters = self.__counters[listener.get_index()]
+        count = dispatch(events, read_at)
+        counters.events += count
+        counters.window_events += count
+        counters.last_notified_at = read_at
+
+    def __next_conditioning_deadline(self) -> float | None:
+        """Returns when the next value held back by the conditioning of a gamepad can be sent"""
+        deadlines = [
+            deadline
+            for listener in self.__listeners
+            if listener.conditioner is not None and (deadline := listener.conditioner.next_deadline()) is not None
+        ]
+        return min(deadlines) if deadlines else None
+
+    def __notify_idle(self, now: float) -> None:
+        for listener in self.__listeners:
+            counters = self.__counters[listener.get_index()]
+            if listener.gamepad is not None and now - counters.last_notified_at >= listener.MAX_WAIT_FOR_INPUT:
+                listener.notify_all(None)
+                counters.last_notified_at = now
+
+    def __update_rates(self, now: float) -> None:
+        elapsed = now - self.__rates_updated_at
+        for counters in self.__counters.values():
+            counters.events_per_second = counters.window_events / elapsed
+            counters.window_events = 0
+        self.__rates_updated_at = now
+
+    def get_json(self) -> dict[str, Any]:
+        listeners = {listener.get_index(): listener for listener in list(self.__listeners)}
+        data: dict[str, Any] = dict()
+        for index, counters in list(self.__counters.items()):
+            listener = listeners.get(index, None)
+            data[str(index)] = {
+                "device": listener.device_id if listener is not None else None,
+                "connected": listener is not None and listener.gamepad is not None,
+                "events": counters.events,
+                "events_per_second": counters.events_per_second,
+            }
+            if listener is not None and listener.conditioner is not None:
+                data[str(index)]["conditioning"] = listener.conditioner.get_json()
+        return data
@@ -1,10 +1,20 @@
+import glob
 import logging
+import os
+import selectors
+import struct
 import threading
 import time
+from typing import TYPE_CHECKING
 
-from inputs import DeviceManager, GamePad, devices, WIN
+from inputs import DeviceManager, GamePad, UnpluggedError, devices, WIN
 
 from .controller import ControllerInput, ControllerObserver, InputData, InputType
+from .event_translation import EventTarget, EventTranslator
+from .input_conditioning import AnalogAxis, ConditioningSettings, InputConditioner
+
+if TYPE_CHECKING:
+    from .physical_controller_hub import PhysicalControllerHub
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +23,17 @@ class RefreshableDeviceManager(DeviceManager):
     """
     This class is a DeviceManager that can be refreshed to detect new gamepads.
     It is used to detect gamepads that are connected after the program has started.
+
+    On Linux, gamepads are found in the by-id directory of root, where udev links each of them as
+    "<bus>-<name>-event-joystick", and can also be added and removed one by one (see DeviceWatcher).
     """
 
-    def __init__(self):
+    DEVICES_ROOT = "/dev/input"
+    GAMEPAD_PATTERN = "*-event-joystick"
+
+    def __init__(self, root: str = DEVICES_ROOT):
         super().__init__()
+        self.root = root
 
         # Due to the way inputs works, codes are not properly initialized when the class is created.
         # This is a workaround to initialize them properly.
@@ -24,7 +41,37 @@ class RefreshableDeviceManager(DeviceManager):
 
     def update_gamepads(self) -> None:
         self.gamepads: list[GamePad] = list()
-        self._detect_gamepads()
+        if WIN:
+            self._detect_gamepads()
+            return
+
+        for device_path in sorted(glob.glob(os.path.join(self.root, "by-id", self.GAMEPAD_PATTERN))):
+            self.add_gamepad(device_path)
+
+    def add_gamepad(self, device_path: str) -> GamePad | None:
+        """Adds the gamepad linked at device_path. Returns None if it was already added, or can't be read"""
+        character_device_path = os.path.realpath(device_path)
+        if any(gamepad._character_device_path == character_device_path for gamepad in self.gamepads):
+            return None
+
+        try:
+            gamepad = self._make_gamepad(device_path)
+        except OSError as e:
+            logger.warning("Can't add gamepad %s: %s", device_path, e)
+            return None
+        self.gamepads.append(gamepad)
+        return gamepad
+
+    def remove_gamepad(self, device_path: str) -> GamePad | None:
+        """Removes the gamepad linked at device_path, and returns it (None if there was none)"""
+        for gamepad in self.gamepads:
+            if gamepad._device_path == device_path:
+                self.gamepads.remove(gamepad)
+                return gamepad
+        return None
+
+    def _make_gamepad(self, device_path: str) -> GamePad:
+        return GamePad(self, device_path)
 
 
 class NonBlockingGamePad:
@@ -41,14 +88,17 @@ class NonBlockingGamePad:
     def read(self):
         return next(iter(self))
 
+    def poll(self):
+        """Returns the events available, without waiting"""
+        if WIN:
+            self._gamepad._GamePad__check_state()
+        return self._gamepad._do_iter() or []
+
     def __iter__(self):
         while True:
             start = time.time()
             while True:
-                if WIN:
-                    self._gamepad._GamePad__check_state()
-
-                event = self._gamepad._do_iter()
+                event = self.poll()
                 if event:
                     yield event
                     break
@@ -56,6 +106,67 @@ class NonBlockingGamePad:
                     yield []
 
 
+class EvdevGamePad:
+    """
+    This class reads the events of a GamePad from the inputs package straight from its evdev character device (Linux).
+
+    Unlike NonBlockingGamePad, it doesn't poll the device: gamepad.read() waits on the device with a selector (epoll),
+    so the thread sleeps until an event arrives or timeout seconds pass, after which it returns an empty list.
+    """
+
+    # struct input_event of the kernel: timestamp (seconds, microseconds), type, code, value
+    EVENT_STRUCT = struct.Struct("llHHi")
+    MAX_EVENTS_PER_READ = 64
+
+    def __init__(self, gamepad: GamePad, timeout: float = 0.0):
+        self._gamepad = gamepad
+        self._timeout = timeout
+        self._fd = os.open(gamepad._character_device_path, os.O_RDONLY | os.O_NONBLOCK)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+        self._pending = b""  # Bytes of an event that was only partially read
+
+    @staticmethod
+    def is_supported(gamepad: GamePad) -> bool:
+        """Returns True if the gamepad has an evdev character device to read from"""
+        return not WIN and bool(getattr(gamepad, "_character_device_path", None))
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read(self):
+        data = self.read_raw(self._timeout)
+        return [self._gamepad._make_event(*fields) for fields in self.EVENT_STRUCT.iter_unpack(data)]
+
+    def read_raw(self, timeout: float = 0.0) -> bytes:
+        """
+        Returns the bytes of the complete events (struct input_event) available, after waiting at most timeout seconds
+        for some. Without a timeout, it doesn't wait.
+        """
+        if timeout > 0 and not self._selector.select(timeout):
+            return b""
+        try:
+            data = os.read(self._fd, self.EVENT_STRUCT.size * self.MAX_EVENTS_PER_READ)
+        except BlockingIOError:
+            return b""
+        if not data:
+            raise OSError(f"Gamepad device {self._gamepad._character_device_path} was closed")
+
+        if self._pending:
+            data = self._pending + data
+        complete = len(data) - len(data) % self.EVENT_STRUCT.size
+        self._pending = data[complete:]
+        return data[:complete] if self._pending else data
+
+    def __iter__(self):
+        while True:
+            yield self.read()
+
+    def close(self) -> None:
+        self._selector.close()
+        os.close(self._fd)
+
+
 class PhysicalControllerListener:
     """
     The PhysicalControllerListener class listens to the inputs of a Physical Controller and
@@ -67,7 +178,9 @@ class PhysicalControllerListener:
     CHECK_GAMEPAD_INTERVAL = 2.5  # seconds
     MAX_WAIT_FOR_INPUT = 1 / 30  # seconds
 
-    def __init__(self, gamepad_number: int, late_init: bool = False) -> None:
+    def __init__(
+        self, gamepad_number: int, late_init: bool = False, hub: "PhysicalControllerHub | None" = None
+    ) -> None:
         """
         Initializes the PhysicalControllerListener with the given gamepad number.
 
@@ -75,6 +188,7 @@ class PhysicalControllerListener:
             gamepad_number (int): The index of the gamepad in the list of gamepads.
             0 is the first gamepad, 1 is the second, etc.
             late_init (bool, optional): If True, the gamepad will not be immediately initialized. Instead, the thread will wait for the gamepad to be connected. Defaults to False.
+            hub (PhysicalControllerHub | None, optional): If given, the gamepad is read by the thread of the hub, along with the other gamepads, instead of a thread of its own. Defaults to None.
         """
 
         # gamepad_number is the index of the device in the inputs.devices.gamepads list
@@ -88,12 +202,16 @@ class PhysicalControllerListener:
         self.listener_thread: threading.Thread | None = None
 
         self._inputs_index = gamepad_number
-        self.gamepad: NonBlockingGamePad | None = None
+        self.gamepad: NonBlockingGamePad | EvdevGamePad | None = None
+        self.device_id: str | None = None  # Name of the gamepad's device, to recognize it when it's reconnected
+        self.conditioner: InputConditioner | None = None
+        self.translator: EventTranslator | None = None
 
-        self.devices = RefreshableDeviceManager()
+        self.hub = hub
+        self.devices = hub.devices if hub is not None else RefreshableDeviceManager()
 
         if not late_init:
-            if not self.__try_init_gamepad():
+            if not self._try_init_gamepad():
                 raise RuntimeError(
                     f"Gamepad {self._inputs_index} not found. Please check if it is connected."
                 )
@@ -102,30 +220,63 @@ class PhysicalControllerListener:
             # to avoid conflicts with the virtual controller.
             self._inputs_index += 1
 
-    def __try_init_gamepad(self) -> bool:
-        self.devices.update_gamepads()
+    def _try_init_gamepad(self, refresh: bool = True) -> bool:
+        """
+        Opens the gamepad, if connected.
+
+        Args:
+            refresh (bool, optional): If False, the gamepads detected by the last refresh of the devices are used.
+        """
+        if refresh:
+            self.devices.update_gamepads()
 
         if self._inputs_index < len(self.devices.gamepads):
-            self.gamepad = NonBlockingGamePad(self.devices.gamepads[self._inputs_index], self.MAX_WAIT_FOR_INPUT)
-            logger.info("Gamepad %d initialized", self._inputs_index)
+            self.attach_gamepad(self.devices.gamepads[self._inputs_index])
             return True
 
         logger.error("Gamepad %d not found", self._inputs_index)
         return False
 
+    def attach_gamepad(self, gamepad: GamePad) -> None:
+        """Opens the gamepad and starts reading its inputs"""
+        self.gamepad = self.open_gamepad(gamepad)
+        self.device_id = os.path.basename(gamepad._device_path)
+        self.translator = self.compile_translator()
+        logger.info("Gamepad %d initialized (%s)", self.gamepad_id, self.device_id)
+
+    def open_gamepad(self, gamepad: GamePad) -> NonBlockingGamePad | EvdevGamePad:
+        """Wraps the gamepad in a reader that waits at most MAX_WAIT_FOR_INPUT for its events"""
+        if EvdevGamePad.is_supported(gamepad):
+            try:
+                return EvdevGamePad(gamepad, self.MAX_WAIT_FOR_INPUT)
+            except OSError as e:
+                logger.warning("Can't read gamepad %d from its device (%s), polling it instead", self._inputs_index, e)
+        return NonBlockingGamePad(gamepad, self.MAX_WAIT_FOR_INPUT)
+
+    def set_conditioning(self, settings: dict[AnalogAxis, ConditioningSettings]) -> None:
+        """Sets how the values of the analog axes are conditioned before being sent. No settings disable it"""
+        self.conditioner = InputConditioner(settings) if settings else None
+
     def subscribe(self, subscriber: ControllerObserver) -> None:
         """Adds a subscriber to the list of subscribers"""
         self.subscribers.append(subscriber)
 
-    def notify_all(self, c_input: ControllerInput | None) -> None:
+    def notify_all(
+        self, c_input: ControllerInput | None, read_at: float | None = None
+    ) -> None:
         """Notifies all subscribers of an input, wrapped in an InputData object"""
-        data = InputData(c_input) if c_input else None
+        data = InputData(c_input, read_at) if c_input else None
         # logger.info("Sending data %s", data)
         for subscriber in self.subscribers:
             subscriber.on_controller_update(data)
 
     def start_listening(self) -> None:
         """Starts listening to the physical controller inputs and notifying its subscribers"""
+        if self.hub is not None:
+            self.running = True
+            self.hub.add(self)
+            return
+
         if self.listener_thread is None or not self.listener_thread.is_alive():
             self.running = True
             self.listener_thread = threading.Thread(
@@ -136,36 +287,106 @@ class PhysicalControllerListener:
     def stop_listening(self) -> None:
         """Stops listening for inputs"""
         self.running = False
+        if self.hub is not None:
+            self.hub.remove(self)
+            return
+
         if self.listener_thread:
             self.listener_thread.join()
+        if isinstance(self.gamepad, EvdevGamePad):
+            self.gamepad.close()
+            self.gamepad = None
 
     def _listen_loop(self) -> None:
-        """The loop that listens for controller inputs"""
-        while self.gamepad is None and self.running:
-            if not self.__try_init_gamepad():
-                time.sleep(self.CHECK_GAMEPAD_INTERVAL)
+        """The loop that listens for controller inputs, and waits for the gamepad again when it's disconnected"""
+        while self.running:
+            while self.gamepad is None and self.running:
+                if not self._try_init_gamepad():
+                    time.sleep(self.CHECK_GAMEPAD_INTERVAL)
+
+            while self.running and self.gamepad is not None:
+                try:
+                    if isinstance(self.gamepad, EvdevGamePad):
+                        data = self.gamepad.read_raw(self.MAX_WAIT_FOR_INPUT)
+                        read_at = time.perf_counter()
+                        count = self.dispatch_raw(data, read_at) if data else None
+                    else:
+                        events = self.gamepad.read()
+                        read_at = time.perf_counter()
+                        count = self.dispatch_events(events, read_at) if events else None
+                except (OSError, UnpluggedError) as e:
+                    self._disconnect_gamepad(e)
+                    break
+                except Exception as e:
+                    logger.error("Error while getting gamepad events: %s", e)
+                    continue
 
-        while self.running and self.gamepad is not None:
-            events = list()
-            try:
-                if self.gamepad is not None:
-                    events = self.gamepad.read()
-            except Exception as e:
-                logger.error("Error while getting gamepad events: %s", e)
-                continue
+                self.flush_conditioned(time.perf_counter())
+                if count is None:
+                    self.notify_all(None)
+
+    def _disconnect_gamepad(self, error: Exception) -> None:
+        """Closes the gamepad, which can't be read anymore, until it's connected again"""
+        logger.error("Gamepad %d disconnected: %s", self.gamepad_id, error)
+        if isinstance(self.gamepad, EvdevGamePad):
+            self.gamepad.close()
+        self.gamepad = None
+
+    def compile_translator(self) -> EventTranslator:
+        """Compiles the translation of the events of the gamepad into inputs, with the event codes of its devices"""
+        targets = {
+            code: EventTarget(
+                input_types[0], input_types[-1], self.get_divisor(input_types[0]), self.EVENT_AXES.get(code, None)
+            )
+            for code, input_types in self.INPUT_TYPES_MAP.items()
+        }
+        return EventTranslator(self.devices.codes, targets)
 
-            if len(events) == 0:
-                self.notify_all(None)
+    def dispatch_events(self, events: list, read_at: float) -> int:
+        """
+        Notifies the subscribers of the inputs of the events (of the inputs package), in order. Returns the number of
+        events translated into inputs.
+
+        Args:
+            read_at (float): The time.perf_counter() when the events were read.
+        """
+        if self.translator is None:
+            self.translator = self.compile_translator()
+        return self.dispatch_translated(self.translator.translate_events(events), read_at)
+
+    def dispatch_raw(self, data: bytes, read_at: float) -> int:
+        """Like dispatch_events, for the bytes of events read from an evdev device (see EvdevGamePad.read_raw)"""
+        if self.translator is None:
+            self.translator = self.compile_translator()
+        return self.dispatch_translated(self.translator.translate_raw(data), read_at)
+
+    def dispatch_translated(self, translated: list[tuple[EventTarget, int]], read_at: float) -> int:
+        """Notifies the subscribers of the inputs of events translated by an EventTranslator, in order"""
+        conditioner = self.conditioner
+        for target, state in translated:
+            if target.axis is not None and conditioner is not None and conditioner.is_conditioned(target.axis):
+                value = state / target.divisor
+                for conditioned_axis, conditioned_value, _ in conditioner.condition(target.axis, value, read_at):
+                    self.notify_all(self.axis_to_input(conditioned_axis, conditioned_value), read_at)
                 continue
 
-            for event in events:
-                if event.ev_type == "Sync":
-                    continue
+            input_type = target.positive if state >= 0 else target.negative
+            value = state / target.divisor if target.divisor != 1 else state
+            self.notify_all(ControllerInput(input_type, value), read_at)
+        return len(translated)
+
+    def flush_conditioned(self, now: float) -> None:
+        """Sends the values of the analog axes that were held back by the conditioning, and can be sent by now"""
+        if self.conditioner is None:
+            return
+        for axis, value, read_at in self.conditioner.flush(now):
+            self.notify_all(self.axis_to_input(axis, value), read_at)
 
-                observed = self.event_to_input(event)
-                if observed:
-                    logger.debug("Sending input %s", observed)
-                    self.notify_all(observed)
+    def axis_to_input(self, axis: AnalogAxis, value: float) -> ControllerInput:
+        """Converts a (normalized) value of an analog axis to a Controller Input"""
+        input_types = self.INPUT_TYPES_MAP[self.AXIS_EVENTS[axis]]
+        idx = 0 if len(input_types) == 1 or value >= 0 else 1
+        return ControllerInput(input_types[idx], value)
 
     def event_to_input(self, event) -> ControllerInput | None:
         """Converts an event from the physical controller to a Controller Input"""
@@ -185,9 +406,15 @@ class PhysicalControllerListener:
     @staticmethod
     def normalize(input_type: InputType, val: int) -> float:
         """Normalizes the value of the input into relative values between -1 and 1 (or 0 and 1)"""
+        divisor = PhysicalControllerListener.get_divisor(input_type)
+        return val / divisor if divisor != 1 else val
+
+    @staticmethod
+    def get_divisor(input_type: InputType) -> int:
+        """Returns the number the values of the input are divided by to be normalized (1 if they aren't)"""
         match input_type:
             case InputType.TRIGGER_RIGHT | InputType.TRIGGER_LEFT:
-                return val / 255
+                return 255
             case (
             InputType.STICK_LEFT_X_POS
             | InputType.STICK_LEFT_X_NEG
@@ -198,9 +425,9 @@ class PhysicalControllerListener:
             | InputType.STICK_RIGHT_Y_POS
             | InputType.STICK_RIGHT_Y_NEG
             ):
-                return val / 32768
+                return 32768
             case _:
-                return val
+                return 1
 
     def get_index(self) -> int:
         """
@@ -230,3 +457,14 @@ class PhysicalControllerListener:
         "BTN_START": [InputType.BTN_BACK],
         "BTN_SELECT": [InputType.BTN_START],
     }
+
+    # Map of the "inputs" identifiers of the analog axes, which can be conditioned
+    EVENT_AXES: dict[str, AnalogAxis] = {
+        "ABS_X": AnalogAxis.STICK_LEFT_X,
+        "ABS_Y": AnalogAxis.STICK_LEFT_Y,
+        "ABS_RX": AnalogAxis.STICK_RIGHT_X,
+        "ABS_RY": AnalogAxis.STICK_RIGHT_Y,
+        "ABS_Z": AnalogAxis.TRIGGER_LEFT,
+        "ABS_RZ": AnalogAxis.TRIGGER_RIGHT,
+    }
+    AXIS_EVENTS: dict[AnalogAxis, str] = {axis: code for code, axis in EVENT_AXES.items()}
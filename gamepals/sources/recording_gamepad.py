@@ -0,0 +1,67 @@
+import ctypes
+
+
+class RecordingGamepadReport(ctypes.Structure):
+    """Same layout as the XUSB_REPORT of vgamepad"""
+
+    _fields_ = [
+        ("wButtons", ctypes.c_ushort),
+        ("bLeftTrigger", ctypes.c_ubyte),
+        ("bRightTrigger", ctypes.c_ubyte),
+        ("sThumbLX", ctypes.c_short),
+        ("sThumbLY", ctypes.c_short),
+        ("sThumbRX", ctypes.c_short),
+        ("sThumbRY", ctypes.c_short),
+    ]
+
+
+class RecordingGamepad:
+    """
+    RecordingGamepad is a stand-in for vgamepad's VX360Gamepad that doesn't need a driver.
+
+    It keeps the report in memory like vgamepad does, and records a copy of it on every update, instead of sending
+    it to a virtual device. It can be passed to a VirtualControllerProvider to run or test it on any platform.
+    """
+
+    def __init__(self) -> None:
+        self.report = RecordingGamepadReport()
+        self.flushed_reports: list[bytes] = list()
+
+    @property
+    def updates(self) -> int:
+        """The number of times the report was sent"""
+        return len(self.flushed_reports)
+
+    def press_button(self, button: int) -> None:
+        self.report.wButtons |= int(button)
+
+    def release_button(self, button: int) -> None:
+        self.report.wButtons &= ~int(button) & 0xFFFF
+
+    def left_trigger_float(self, value_float: float) -> None:
+        self.report.bLeftTrigger = RecordingGamepad.__to_trigger(value_float)
+
+    def right_trigger_float(self, value_float: float) -> None:
+        self.report.bRightTrigger = RecordingGamepad.__to_trigger(value_float)
+
+    def left_joystick_float(self, x_value_float: float, y_value_float: float) -> None:
+        self.report.sThumbLX = RecordingGamepad.__to_axis(x_value_float)
+        self.report.sThumbLY = RecordingGamepad.__to_axis(y_value_float)
+
+    def right_joystick_float(self, x_value_float: float, y_value_float: float) -> None:
+        self.report.sThumbRX = RecordingGamepad.__to_axis(x_value_float)
+        self.report.sThumbRY = RecordingGamepad.__to_axis(y_value_float)
+
+    def reset(self) -> None:
+        self.report = RecordingGamepadReport()
+
+    def update(self) -> None:
+        self.flushed_reports.append(bytes(self.report))
+
+    @staticmethod
+    def __to_trigger(value_float: float) -> int:
+        return min(max(round(value_float * 255), 0), 255)
+
+    @staticmethod
+    def __to_axis(value_float: float) -> int:
+        return min(max(round(value_float * 32767), -32768), 32767)
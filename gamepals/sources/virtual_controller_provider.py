@@ -1,11 +1,17 @@
 import logging
 import time
 from dataclasses import asdict
-from typing import Any
+from typing import Any, Callable
 
 import vgamepad as vg
 
-from gamepals.utils.logging import Loggable
+from gamepals.utils.logging import (
+    InputLatencyTracker,
+    LatencyStage,
+    Loggable,
+    TickTrace,
+    TraceStage,
+)
 
 from .controller import (
     ControllerInput,
@@ -20,26 +26,89 @@ logger = logging.getLogger(__name__)
 class VirtualControllerProvider(Loggable):
     """
     The VirtualControllerProvider class provides an XBOX 360 Virtual Controller, whose inputs can be requested via the execute and execute_stick methods
+
+    Inputs are applied to the in-memory report of the controller, which is then sent to the device. Inputs executed
+    between begin_frame and commit_frame (or with execute_many) are sent together, and a report that didn't change
+    since it was last sent is not sent again.
+    The provider keeps its own packed copy of the report (a bitmask for the buttons, floats for the analog axes),
+    so inputs that don't change it (analog values within analog_epsilon) are dropped without touching the device.
+    Analog values at rest (0) or at full tilt (-1 or 1) are always sent, however close they are to the last one.
+    Every executed input is published to the Logger (see Loggable).
     """
 
+    PUBLISHES_CHANGES = True
+
     INPUT_THRESHOLD: float = (
         0.7  # The float value after which the input is interpreted as a 1
     )
+    DEFAULT_ANALOG_EPSILON: float = 0.0
+    RESET_DELAYS: tuple[float, float] = (0.5, 0.1)  # seconds, waited before and after a reset
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        gamepad_factory: Callable[[], Any] = vg.VX360Gamepad,
+        analog_epsilon: float = DEFAULT_ANALOG_EPSILON,
+    ) -> None:
+        """
+        Args:
+            gamepad_factory (Callable[[], Any], optional): Creates the gamepad when the provider is started.
+                Defaults to the vgamepad XBOX 360 controller, a RecordingGamepad can be used to run without a driver.
+            analog_epsilon (float, optional): The smallest change of a stick or trigger value that is sent to the
+                controller. Defaults to 0, i.e. only identical values are dropped.
+        """
+        self.gamepad_factory = gamepad_factory
+        self.analog_epsilon = analog_epsilon
         self.gamepad: vg.VX360Gamepad | None = None
         self.gamepad_state: ControllerInputsMap = ControllerInputsMap()
         self.left_stick_values: tuple[float, float] = (0, 0)  # (X, Y)
         self.right_stick_values: tuple[float, float] = (0, 0)  # (X, Y)
 
+        self.__buttons = 0
+        self.__triggers = [0.0, 0.0]  # (Left, Right)
+
+        self.flushes = 0
+        self.skipped_flushes = 0
+        self.suppressed_inputs = 0
+        self.__in_frame = False
+        self.__flushed_report: bytes | None = None
+
+        self.latency_tracker = InputLatencyTracker()
+        self.__pending_read_times: list[float] = list()  # Of the controller inputs not sent yet
+        self.__pending_traces: list[TickTrace] = list()
+
     def start(self) -> None:
-        self.gamepad = vg.VX360Gamepad()
+        self.gamepad = self.gamepad_factory()
+
+    def begin_frame(self) -> None:
+        """Starts collecting inputs: they are sent to the device all together by commit_frame"""
+        self.__in_frame = True
+
+    def commit_frame(self) -> None:
+        """Sends the inputs executed since begin_frame to the device, if they changed its state"""
+        self.__in_frame = False
+        self.__flush()
 
-    def execute(self, c_input: ControllerInput) -> None:
+    def execute_many(self, c_inputs: list[ControllerInput]) -> None:
+        """Executes all the Controller Inputs, sending them to the device at once"""
+        self.begin_frame()
+        for c_input in c_inputs:
+            self.execute(c_input)
+        self.commit_frame()
+
+    def execute(
+        self,
+        c_input: ControllerInput,
+        read_at: float | None = None,
+        trace: TickTrace | None = None,
+    ) -> bool:
         """
         Receives Controller Inputs and produces them on a Virtual Controller.
 
         Valid for any single-value Input Type.
+        Inside a frame, the input is only sent to the device by commit_frame.
+        Returns False if the input didn't change the state of the controller, in which case nothing is sent.
+        read_at is the time the physical controller input it comes from was read, if any: the latency is recorded
+        when it's sent (see InputLatencyTracker). Likewise, trace is marked when it's sent, or dropped (see Tracer).
         """
 
         assert self.gamepad is not None, "Gamepad not initialized. Call start() first."
@@ -50,51 +119,143 @@ class VirtualControllerProvider(Loggable):
                 type=c_input.type, val=c_input.val, confidence=1.0
             )
         )
+        if self._log_channel is not None:
+            record = self.gamepad_state.inputs_map[c_input.type]
+            self.publish_change(
+                (c_input.type.value,),
+                dict(val=record.val, confidence=record.confidence, timestamp=record.timestamp),
+            )
+
+        changed = False
 
         if c_input.type in self.STICKS:
             if c_input.val > 0 and c_input.type in self.NEGATIVE_AXIS:
                 c_input.val = -c_input.val
             if c_input.type in self.RIGHT_STICK:  # Right Stick
                 if c_input.type in self.RIGHT_STICK_Y:
-                    self.right_stick_values = (self.right_stick_values[0], c_input.val)
+                    values = (self.right_stick_values[0], c_input.val)
                 else:
-                    self.right_stick_values = (c_input.val, self.right_stick_values[1])
-                self.gamepad.right_joystick_float(
-                    x_value_float=self.right_stick_values[0],
-                    y_value_float=self.right_stick_values[1],
-                )
+                    values = (c_input.val, self.right_stick_values[1])
+                if self.__axes_changed(self.right_stick_values, values):
+                    self.right_stick_values = values
+                    self.gamepad.right_joystick_float(
+                        x_value_float=values[0], y_value_float=values[1]
+                    )
+                    changed = True
             elif c_input.type in self.LEFT_STICK:  # Left Stick
                 if c_input.type in self.LEFT_STICK_Y:
-                    self.left_stick_values = (self.left_stick_values[0], c_input.val)
+                    values = (self.left_stick_values[0], c_input.val)
                 else:
-                    self.left_stick_values = (c_input.val, self.left_stick_values[1])
-                self.gamepad.left_joystick_float(
-                    x_value_float=self.left_stick_values[0],
-                    y_value_float=self.left_stick_values[1],
-                )
+                    values = (c_input.val, self.left_stick_values[1])
+                if self.__axes_changed(self.left_stick_values, values):
+                    self.left_stick_values = values
+                    self.gamepad.left_joystick_float(
+                        x_value_float=values[0], y_value_float=values[1]
+                    )
+                    changed = True
 
         if c_input.type in self.BTN_TO_VGBUTTON:  # Press-Release Buttons
-            if abs(c_input.val) > self.INPUT_THRESHOLD:
-                self.gamepad.press_button(self.BTN_TO_VGBUTTON[c_input.type])
-            else:
-                self.gamepad.release_button(self.BTN_TO_VGBUTTON[c_input.type])
+            button = self.BTN_TO_VGBUTTON[c_input.type]
+            pressed = abs(c_input.val) > self.INPUT_THRESHOLD
+            changed = self.__set_buttons(button, pressed)
 
         elif c_input.type in self.DPADS:  # Direction Pad (values are -1, 0 or 1)
             if c_input.val != 0:
-                self.gamepad.press_button(
-                    self.DPAD_TO_VGBUTTON[(c_input.type, c_input.val)]
+                changed = self.__set_buttons(
+                    self.DPAD_TO_VGBUTTON[(c_input.type, c_input.val)], True
                 )
             else:
-                self.gamepad.release_button(self.DPAD_TO_VGBUTTON[(c_input.type, 1)])
-                self.gamepad.release_button(self.DPAD_TO_VGBUTTON[(c_input.type, -1)])
+                released = (
+                    self.DPAD_TO_VGBUTTON[(c_input.type, 1)]
+                    | self.DPAD_TO_VGBUTTON[(c_input.type, -1)]
+                )
+                changed = self.__set_buttons(released, False)
 
         elif c_input.type in self.TRIGGERS:  # Triggers (values are in [0, 1])
-            if c_input.type == InputType.TRIGGER_LEFT:
-                self.gamepad.left_trigger_float(c_input.val)
-            else:
-                self.gamepad.right_trigger_float(c_input.val)
+            index = 0 if c_input.type == InputType.TRIGGER_LEFT else 1
+            if self.__analog_changed(self.__triggers[index], c_input.val):
+                self.__triggers[index] = c_input.val
+                if index == 0:
+                    self.gamepad.left_trigger_float(c_input.val)
+                else:
+                    self.gamepad.right_trigger_float(c_input.val)
+                changed = True
+
+        if trace is not None:
+            self.__pending_traces.append(trace)
+        if not changed:
+            self.suppressed_inputs += 1
+            if not self.__in_frame:
+                self.__end_traces()
+            return False
+
+        if read_at is not None:
+            self.__pending_read_times.append(read_at)
+        if not self.__in_frame:
+            self.__flush()
+        return True
+
+    def __axes_changed(
+        self, current: tuple[float, float], values: tuple[float, float]
+    ) -> bool:
+        return self.__analog_changed(current[0], values[0]) or self.__analog_changed(
+            current[1], values[1]
+        )
+
+    def __analog_changed(self, current: float, value: float) -> bool:
+        """Whether the value differs from the current one by more than analog_epsilon, or is a new rest or full tilt value"""
+        if value == current:
+            return False
+        return (
+            value == 0 or abs(value) == 1 or abs(value - current) > self.analog_epsilon
+        )
+
+    def __set_buttons(self, buttons: int, pressed: bool) -> bool:
+        """Presses or releases the buttons in the bitmask. Returns False if they already were"""
+        assert self.gamepad is not None, "Gamepad not initialized. Call start() first."
+
+        new_buttons = self.__buttons | buttons if pressed else self.__buttons & ~buttons
+        if new_buttons == self.__buttons:
+            return False
+
+        for button in self.__VGBUTTONS:
+            if button & (new_buttons ^ self.__buttons):
+                if pressed:
+                    self.gamepad.press_button(button)
+                else:
+                    self.gamepad.release_button(button)
+        self.__buttons = new_buttons
+        return True
+
+    def __flush(self) -> None:
+        """Sends the report to the device, unless it's the same that was sent last"""
+
+        assert self.gamepad is not None, "Gamepad not initialized. Call start() first."
+
+        report = bytes(self.gamepad.report)
+        if report == self.__flushed_report:
+            self.skipped_flushes += 1
+            self.__pending_read_times.clear()
+            self.__end_traces()
+            return
 
         self.gamepad.update()
+        self.__flushed_report = report
+        self.flushes += 1
+
+        for read_at in self.__pending_read_times:
+            self.latency_tracker.record(LatencyStage.OUTPUT, read_at)
+        self.__pending_read_times.clear()
+        self.__end_traces()
+
+    def __end_traces(self) -> None:
+        """
+        Ends the output stage of the pending traces. The traces whose inputs didn't change the report end it too,
+        as nothing more is done for their tick, so that every traced tick is counted in the totals.
+        """
+        for trace in self.__pending_traces:
+            trace.mark(TraceStage.OUTPUT)
+        self.__pending_traces.clear()
 
     def reset_controls(self) -> None:
         """Releases all buttons of the Virtual Controller"""
@@ -102,19 +263,34 @@ class VirtualControllerProvider(Loggable):
         assert self.gamepad is not None, "Gamepad not initialized. Call start() first."
 
         time.sleep(
-            0.5
+            self.RESET_DELAYS[0]
         )  # This looks unnecessary, but it's needed for it to work even when the level is reset
         self.gamepad.reset()
         self.gamepad.update()
+        self.__flushed_report = bytes(self.gamepad.report)
+        self.__buttons = 0
+        self.__triggers = [0.0, 0.0]
+        self.left_stick_values = (0, 0)
+        self.right_stick_values = (0, 0)
         logger.info("Gamepad was reset")
-        time.sleep(0.1)
+        time.sleep(self.RESET_DELAYS[1])
 
     def get_json(self) -> dict[str, Any]:
         data: dict[str, Any] = dict()
         for input_type, input_map in self.gamepad_state.inputs_map.items():
             data[input_type.value] = asdict(input_map)
+        data.update(self.get_counters())
         return data
 
+    def get_counters(self) -> dict[str, Any]:
+        return {
+            "writes": {
+                "flushes": self.flushes,
+                "skipped_flushes": self.skipped_flushes,
+                "suppressed_inputs": self.suppressed_inputs,
+            }
+        }
+
     # Map of conversions between the InputType enum and the vg.XUSB_BUTTON used by the package vgamepad
     BTN_TO_VGBUTTON = {
         InputType.BTN_A: vg.XUSB_BUTTON.XUSB_GAMEPAD_A,
@@ -137,6 +313,8 @@ class VirtualControllerProvider(Loggable):
         (InputType.DIR_PAD_X, 1.0): vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
     }
 
+    __VGBUTTONS = list(BTN_TO_VGBUTTON.values()) + list(DPAD_TO_VGBUTTON.values())
+
     # Arrays of InputTypes that can be used to check the category of the Input Type
     DPADS = [InputType.DIR_PAD_X, InputType.DIR_PAD_Y]
     TRIGGERS = [InputType.TRIGGER_LEFT, InputType.TRIGGER_RIGHT]
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
     from gamepals.agents.sw_agent_actor import SWAgentActor
     from gamepals.command_arbitrators.policies import Policy, PolicyRole
     from gamepals.sources.controller import InputType
+    from gamepals.sources.input_conditioning import AnalogAxis, ConditioningSettings
 else:
     GameAction = Any
 
@@ -25,7 +26,7 @@ class ConfigurationHandler:
     * game_config, containing general information about the game and the game inputs.
     * agents_config, containing information about which software agents are available for the specified game.
     * assistance_config, containing all information about the actors involved in the architecture, which actions
-     they control and which inputs they use
+     they control and which inputs they use, and how the analog inputs of the humans are conditioned
 
     It implements a Singleton pattern.
 
@@ -87,6 +88,10 @@ class ConfigurationHandler:
         self._action_to_game_input_map: dict[GameAction, list[InputType]] = defaultdict(
             list
         )
+        # Conditioning of the analog axes, by human (-1 for every human)
+        self._input_conditioning: dict[int, dict[AnalogAxis, ConditioningSettings]] = (
+            defaultdict(dict)
+        )
 
     @staticmethod
     def _get_game_specific_class(class_name: str) -> Optional[Type[GameAction]]:
@@ -114,6 +119,7 @@ class ConfigurationHandler:
         """
         from gamepals.command_arbitrators.policies import PolicyName, PolicyRole
         from gamepals.sources.controller import InputType
+        from gamepals.sources.input_conditioning import AnalogAxis, ConditioningSettings
 
         # TODO: Configuration Validation should go here
 
@@ -190,6 +196,11 @@ class ConfigurationHandler:
 
             self._agents_params[agent["name"]] = agent["params"]
 
+        for conditioning in assistance_config.get("conditioning", list()):
+            settings = ConditioningSettings.from_dict(conditioning)
+            for axis in conditioning.get("axes", list()):
+                self._input_conditioning[conditioning.get("idx", -1)][AnalogAxis(axis)] = settings
+
     def get_policy_types(self) -> dict[GameAction, Type[Policy]]:
         """Returns the Policy associated with every Input Type"""
         return self._policy_types
@@ -198,6 +209,10 @@ class ConfigurationHandler:
         """Returns the confidence level associated with every GameAction, for a specific HumanActor"""
         return self._confidence_levels.get(user_idx, dict())
 
+    def get_input_conditioning(self, user_idx: int) -> dict[AnalogAxis, ConditioningSettings]:
+        """Returns how the analog axes of a specific HumanActor are conditioned"""
+        return self._input_conditioning.get(-1, dict()) | self._input_conditioning.get(user_idx, dict())
+
     def get_user_controlled_actions(self, user_idx: int) -> list[GameAction]:
         """Returns the list of game actions that a certain HumanActor is responsible for"""
         return self._user_actions.get(user_idx, list())
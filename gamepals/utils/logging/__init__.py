@@ -1,4 +1,19 @@
+from .latency import InputLatencyTracker, LatencyHistogram, LatencyStage
 from .loggable import Loggable
 from .logger import Logger
+from .telemetry import Telemetry, TelemetryChannel, TelemetryColumn
+from .tracing import TickTrace, Tracer, TraceStage
 
-__all__ = ["Logger", "Loggable"]
+__all__ = [
+    "Logger",
+    "Loggable",
+    "Telemetry",
+    "TelemetryChannel",
+    "TelemetryColumn",
+    "InputLatencyTracker",
+    "LatencyHistogram",
+    "LatencyStage",
+    "Tracer",
+    "TickTrace",
+    "TraceStage",
+]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from enum import StrEnum
+from typing import Any, Optional
+
+from .loggable import Loggable
+
+
+class LatencyHistogram:
+    """
+    LatencyHistogram counts latencies in log-linear buckets, like an HDR histogram: every power of two (in
+    microseconds) is split in SUB_BUCKETS buckets, so percentiles are within 1 / SUB_BUCKETS of the real value whatever
+    the latency, in a fixed amount of memory. Recording is thread-safe.
+    """
+
+    SUB_BUCKETS = 16
+    MAX_SECONDS = 60.0  # Longer latencies are counted as MAX_SECONDS
+
+    __SUB_BUCKET_BITS = SUB_BUCKETS.bit_length() - 1
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.max = 0.0  # seconds
+        self.__counts = [0] * (self.__bucket(int(self.MAX_SECONDS * 1e6)) + 1)
+        self.__lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        bucket = self.__bucket(int(min(max(seconds, 0.0), self.MAX_SECONDS) * 1e6))
+        with self.__lock:
+            self.__counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, percentile: float) -> float:
+        """Returns the latency (in seconds) below which the given percentage of the latencies are"""
+        with self.__lock:
+            counts = self.__counts.copy()
+            count = self.count
+            max_seconds = self.max
+        if count == 0:
+            return 0.0
+
+        threshold = count * percentile / 100
+        seen = 0
+        for bucket, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= threshold and bucket_count > 0:
+                return min(self.__upper_bound(bucket) / 1e6, max_seconds)
+        return max_seconds
+
+    def __bucket(self, micros: int) -> int:
+        if micros < 2 * self.SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - self.__SUB_BUCKET_BITS - 1
+        return shift * self.SUB_BUCKETS + (micros >> shift)
+
+    def __upper_bound(self, bucket: int) -> int:
+        """The largest latency (in microseconds) counted in the bucket"""
+        if bucket < 2 * self.SUB_BUCKETS:
+            return bucket
+        shift = bucket // self.SUB_BUCKETS - 1
+        return ((bucket - shift * self.SUB_BUCKETS + 1) << shift) - 1
+
+    def get_json(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count > 0 else 0.0,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+
+class LatencyStage(StrEnum):
+    """The points an input of a Physical Controller goes through before it reaches the Virtual Controller"""
+
+    CONVERTED = "converted"  # Converted to Game Actions by its HumanActor
+    DEQUEUED = "dequeued"  # Taken from the queue by the arbitration thread
+    MERGED = "merged"  # Merged with the inputs of the other Actors
+    OUTPUT = "output"  # Sent to the Virtual Controller device
+
+
+class InputLatencyTracker(Loggable):
+    """
+    InputLatencyTracker measures the time from the reading of an input of a Physical Controller to each LatencyStage,
+    with a histogram for each stage. The reading time (time.perf_counter) is carried along with the input.
+
+    It implements a Singleton pattern.
+    """
+
+    _instance: Optional[InputLatencyTracker] = None
+
+    def __new__(cls) -> InputLatencyTracker:
+        if cls._instance is None:
+            cls._instance = super(InputLatencyTracker, cls).__new__(cls)
+            cls._instance.reset()
+        return cls._instance
+
+    histograms: dict[LatencyStage, LatencyHistogram]
+
+    def reset(self) -> None:
+        """Starts new histograms"""
+        self.histograms = {stage: LatencyHistogram() for stage in LatencyStage}
+
+    def record(self, stage: LatencyStage, read_at: float | None) -> None:
+        """Records the time elapsed since read_at. Inputs that don't come from a controller (None) are ignored"""
+        if read_at is not None:
+            self.histograms[stage].record(time.perf_counter() - read_at)
+
+    def get_json(self) -> dict[str, Any]:
+        return {stage.value: histogram.get_json() for stage, histogram in self.histograms.items()}
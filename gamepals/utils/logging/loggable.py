@@ -1,9 +1,46 @@
 from abc import abstractmethod
+from collections import deque
 from typing import Any
 
 
+class LogChannel:
+    """
+    LogChannel carries the changes published by Loggables to their Logger.
+
+    Publishing is a deque append, which is thread-safe without a lock, so the publishing threads never wait for the
+    Logger. Published values must not be modified afterwards.
+    """
+
+    def __init__(self) -> None:
+        self.__changes: deque[tuple[str, tuple[Any, ...], Any]] = deque()
+
+    def publish(self, tag: str, path: tuple[Any, ...], value: Any) -> None:
+        self.__changes.append((tag, path, value))
+
+    def drain(self) -> list[tuple[str, tuple[Any, ...], Any]]:
+        """Removes and returns the changes published so far, in order"""
+        changes = list()
+        try:
+            while True:
+                changes.append(self.__changes.popleft())
+        except IndexError:
+            return changes
+
+
 class Loggable:
-    """Loggable is the interface for every class that wants to be logged"""
+    """
+    Loggable is the interface for every class that wants to be logged.
+
+    By default the Logger calls get_json at every log. Loggables with PUBLISHES_CHANGES publish every change of their
+    state instead (see publish_change), from the thread that makes it: the Logger calls their get_json only once, when
+    they are attached to it, and keeps its own copy of their state up to date with the changes, so it must return a
+    dict. Values that are safe to read from any thread (e.g. counters) can be returned by get_counters, which is
+    called at every log.
+    """
+
+    PUBLISHES_CHANGES: bool = False
+
+    _log_channel: LogChannel | None = None
 
     @classmethod
     def get_tag(cls) -> str:
@@ -14,3 +51,20 @@ class Loggable:
     def get_json(self) -> dict[str, Any] | list[Any]:
         """Returns the json to log"""
         pass
+
+    def get_counters(self) -> dict[str, Any]:
+        """Returns the values that are read at every log by Loggables with PUBLISHES_CHANGES"""
+        return dict()
+
+    def attach_log_channel(self, channel: LogChannel | None) -> None:
+        """Sets the channel the changes are published to. None stops publishing"""
+        self._log_channel = channel
+
+    def publish_change(self, path: tuple[Any, ...], value: Any) -> None:
+        """
+        Publishes that the value at path (a key for each level of the json) changed. Does nothing if the Loggable
+        isn't attached to a Logger.
+        """
+        channel = self._log_channel
+        if channel is not None:
+            channel.publish(self.get_tag(), path, value)
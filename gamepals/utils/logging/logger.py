@@ -5,9 +5,9 @@ import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, List
 
-from .loggable import Loggable
+from .loggable import LogChannel, Loggable
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,14 @@ logger = logging.getLogger(__name__)
 class Logger:
     """
     Logger is the class that handles writing the state of the gamepals architecture on a log file
+
+    The state of the Loggables that publish their changes is kept by the Logger, so it never reads their data
+    structures while they are being modified. Every KEYFRAME_INTERVAL logs, a keyframe with their whole state is
+    written; the logs in between only have the values that changed since the previous log, to be merged into it.
     """
 
     INTERVAL_BETWEEN_LOGS = 1.0  # seconds
+    KEYFRAME_INTERVAL = 10  # logs
     LOGS_DIR = "logs"
 
     def __init__(
@@ -44,6 +49,19 @@ class Logger:
 
         self.loggables = loggables
         self.running: bool = False
+        self.channel = LogChannel()
+        self.__states: dict[str, dict[str, Any]] = dict()
+        for loggable in loggables:
+            if loggable.PUBLISHES_CHANGES:
+                # Attached first, so the changes made while taking the state aren't missed
+                loggable.attach_log_channel(self.channel)
+                state = loggable.get_json()
+                if not isinstance(state, dict):
+                    raise TypeError(
+                        f"{loggable.get_tag()} publishes its changes, so get_json must return a dict, not a "
+                        f"{type(state).__name__}"
+                    )
+                self.__states[loggable.get_tag()] = state
         self._thread: threading.Thread | None = None
         self._start_time: float = 0.0
 
@@ -68,6 +86,9 @@ class Logger:
         self.running = False
         if self._thread:
             self._thread.join()
+        for loggable in self.loggables:
+            if loggable.PUBLISHES_CHANGES:
+                loggable.attach_log_channel(None)
 
     def _logging_loop(self):
         idx = 0
@@ -76,17 +97,39 @@ class Logger:
                 now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 time_since_start = time.time() - self._start_time
 
+                keyframe = idx % self.KEYFRAME_INTERVAL == 0
                 new_log = dict(
                     idx=idx,
                     time=now,
                     timestamp=time.time(),
                     since_start=time_since_start,
+                    keyframe=keyframe,
                 )
+                changes = self._apply_changes()
                 for loggable in self.loggables:
-                    new_log[loggable.get_tag()] = loggable.get_json()
+                    tag = loggable.get_tag()
+                    if not loggable.PUBLISHES_CHANGES:
+                        new_log[tag] = loggable.get_json()
+                    elif keyframe:
+                        new_log[tag] = {**self.__states[tag], **loggable.get_counters()}
+                    else:
+                        new_log[tag] = {**changes.get(tag, {}), **loggable.get_counters()}
 
                 file.write(json.dumps(new_log))
                 file.write("\n")
 
                 idx += 1
                 time.sleep(self.INTERVAL_BETWEEN_LOGS)
+
+    def _apply_changes(self) -> dict[str, dict[str, Any]]:
+        """Applies the published changes to the states of the Loggables, returning the changed values by tag"""
+        changes: dict[str, dict[str, Any]] = dict()
+        for tag, path, value in self.channel.drain():
+            for node in (self.__states[tag], changes.setdefault(tag, dict())):
+                for key in path[:-1]:
+                    child = node.get(key, None)
+                    if not isinstance(child, dict):
+                        child = node[key] = dict()
+                    node = child
+                node[path[-1]] = value
+        return changes
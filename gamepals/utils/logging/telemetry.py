@@ -0,0 +1,348 @@
+import argparse
+import json
+import logging
+import struct
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .loggable import Loggable
+
+logger = logging.getLogger(__name__)
+
+# This file contains the telemetry subsystem: channels of fixed-type columns, which are buffered in memory and
+# written in batches to binary files by a background thread, and the reader of those files.
+#
+# A telemetry file is a header (HEADER_STRUCT) followed by blocks, each starting with its kind (uint8):
+# * SCHEMA: channel id (uint16), name and number of columns (uint16). Every column has a name, an array typecode
+#   (1 byte) and its labels (uint16 count, then strings): integer columns with labels hold indices into them.
+#   The schemas of all the channels are written at the start of every file, so each file can be read on its own;
+# * BATCH: channel id (uint16), number of rows (uint32), then the values of each column, one column after the other.
+# Strings are an uint16 length followed by UTF-8 bytes. Values are in the byte order written in the header.
+
+MAGIC = b"GPTL"
+VERSION = 1
+HEADER_STRUCT = struct.Struct("<4sBB")  # magic, version, byte order (0 little, 1 big)
+SCHEMA = 0
+BATCH = 1
+BLOCK_STRUCT = struct.Struct("<BH")  # kind, channel id
+COUNT_STRUCT = struct.Struct("<H")
+ROWS_STRUCT = struct.Struct("<I")
+BYTE_ORDERS = ("little", "big")
+
+
+@dataclass
+class TelemetryColumn:
+    """A column of a TelemetryChannel, holding values of an array typecode (e.g. "d" for float64)"""
+
+    name: str
+    typecode: str
+    labels: list[str] | None = None  # Names of the values of an integer column (e.g. the members of an Enum)
+
+
+class TelemetryChannel:
+    """
+    TelemetryChannel is a ring buffer of rows with fixed-type columns, preallocated as arrays.
+
+    Rows are appended by a single producer thread and taken by the Telemetry flush thread. Appending never blocks
+    nor allocates: if the buffer is full, because the flush thread is behind, the row is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        channel_id: int,
+        name: str,
+        columns: list[TelemetryColumn],
+        capacity: int,
+        wake_flush: threading.Event,
+    ) -> None:
+        self.channel_id = channel_id
+        self.name = name
+        self.columns = columns
+        self.capacity = capacity
+        self.rows = 0
+        self.dropped = 0
+
+        self.__values = [
+            array(column.typecode, bytes(capacity * array(column.typecode).itemsize))
+            for column in columns
+        ]
+        self.__head = 0  # Written only by the producer
+        self.__tail = 0  # Written only by the flush thread
+        self.__wake_flush = wake_flush
+        self.__wake_at = capacity // 2
+
+    def append(self, *values: Any) -> None:
+        """Appends a row, with a value for each column"""
+        head = self.__head
+        pending = head - self.__tail
+        if pending >= self.capacity:
+            self.dropped += 1
+            return
+
+        index = head % self.capacity
+        for column, value in zip(self.__values, values):
+            column[index] = value
+        self.__head = head + 1
+        self.rows += 1
+
+        if pending == self.__wake_at:
+            self.__wake_flush.set()
+
+    def take(self) -> tuple[int, list[bytes]]:
+        """Removes the pending rows, returning their number and the bytes of each column"""
+        head = self.__head
+        tail = self.__tail
+        n_rows = head - tail
+        if n_rows == 0:
+            return 0, list()
+
+        start = tail % self.capacity
+        end = start + n_rows
+        if end <= self.capacity:
+            columns = [values[start:end].tobytes() for values in self.__values]
+        else:
+            end -= self.capacity
+            columns = [
+                values[start:].tobytes() + values[:end].tobytes() for values in self.__values
+            ]
+
+        self.__tail = head
+        return n_rows, columns
+
+    def schema(self) -> bytes:
+        data = bytearray(BLOCK_STRUCT.pack(SCHEMA, self.channel_id))
+        data += _pack_string(self.name)
+        data += COUNT_STRUCT.pack(len(self.columns))
+        for column in self.columns:
+            data += _pack_string(column.name)
+            data += column.typecode.encode()
+            labels = column.labels or list()
+            data += COUNT_STRUCT.pack(len(labels))
+            for label in labels:
+                data += _pack_string(label)
+        return bytes(data)
+
+
+class Telemetry(Loggable):
+    """
+    Telemetry records high-frequency events (e.g. every arbitrated command, every game tick) into TelemetryChannels,
+    which a background thread writes in batches to binary files. It's meant for what the Logger is too coarse for:
+    the Logger takes a snapshot of the Loggables every second.
+
+    Batches are written every flush_interval, or earlier when a channel is half full. When a file reaches
+    max_file_bytes, the next batches go to a new file (path_000.tlm, path_001.tlm, ...). The files can be converted to
+    NDJSON with: python -m gamepals.utils.logging.telemetry output.ndjson path_000.tlm ...
+    """
+
+    DEFAULT_CAPACITY = 1 << 16  # rows
+    DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+    DEFAULT_MAX_FILE_BYTES = 64 * 1024 * 1024
+    FILE_SUFFIX = ".tlm"
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    ) -> None:
+        """
+        Args:
+            path (str): The path of the files, without the index and the suffix.
+            flush_interval (float, optional): The longest time (in seconds) rows are buffered before being written.
+            max_file_bytes (int, optional): The size after which a new file is started.
+        """
+        self.path = Path(path)
+        if self.path.suffix == self.FILE_SUFFIX:
+            self.path = self.path.with_suffix("")
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+
+        self.channels: list[TelemetryChannel] = list()
+        self.files: list[Path] = list()
+        self.bytes_written = 0
+        self.batches = 0
+
+        self.__file: IO[bytes] | None = None
+        self.__wake_flush = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.__running = False
+
+    def channel(
+        self, name: str, columns: list[TelemetryColumn], capacity: int = DEFAULT_CAPACITY
+    ) -> TelemetryChannel:
+        """Creates a channel. Channels must be created before start()"""
+        if self.__running:
+            raise RuntimeError("Telemetry channels must be created before starting it")
+
+        channel = TelemetryChannel(
+            len(self.channels), name, columns, capacity, self.__wake_flush
+        )
+        self.channels.append(channel)
+        return channel
+
+    def start(self) -> None:
+        if self.__running:
+            return
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__flush_loop, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Writes the buffered rows and closes the file"""
+        if not self.__running:
+            return
+        self.__running = False
+        self.__wake_flush.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __flush_loop(self) -> None:
+        while self.__running:
+            self.__wake_flush.wait(self.flush_interval)
+            self.__wake_flush.clear()
+            self.flush()
+
+        self.flush()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def flush(self) -> None:
+        """Writes the buffered rows of all the channels. Only the flush thread calls it while running"""
+        for channel in self.channels:
+            n_rows, columns = channel.take()
+            if n_rows == 0:
+                continue
+
+            file = self.__get_file()
+            data = BLOCK_STRUCT.pack(BATCH, channel.channel_id) + ROWS_STRUCT.pack(n_rows)
+            file.write(data)
+            for column in columns:
+                file.write(column)
+
+            self.bytes_written += len(data) + sum(len(column) for column in columns)
+            self.batches += 1
+
+        if self.__file is not None:
+            self.__file.flush()
+            if self.__file.tell() >= self.max_file_bytes:
+                self.__file.close()
+                self.__file = None
+
+    def __get_file(self) -> IO[bytes]:
+        """Returns the current file, starting a new one if needed"""
+        if self.__file is None:
+            path = self.path.with_name(
+                f"{self.path.name}_{len(self.files):03d}{self.FILE_SUFFIX}"
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.__file = open(path, "wb")
+            self.files.append(path)
+
+            self.__file.write(
+                HEADER_STRUCT.pack(MAGIC, VERSION, BYTE_ORDERS.index(sys.byteorder))
+            )
+            for channel in self.channels:
+                self.__file.write(channel.schema())
+        return self.__file
+
+    def get_json(self) -> dict[str, Any]:
+        return {
+            "files": len(self.files),
+            "bytes_written": self.bytes_written,
+            "batches": self.batches,
+            "channels": {
+                channel.name: {"rows": channel.rows, "dropped": channel.dropped}
+                for channel in self.channels
+            },
+        }
+
+
+def read_telemetry(path: str | Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Reads a telemetry file, yielding the channel name and the values of every row"""
+    with open(path, "rb") as file:
+        magic, version, byte_order = HEADER_STRUCT.unpack(_read(file, HEADER_STRUCT.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported telemetry file version {version}")
+        swap = BYTE_ORDERS[byte_order] != sys.byteorder
+
+        channels: dict[int, tuple[str, list[TelemetryColumn]]] = dict()
+        while block := file.read(BLOCK_STRUCT.size):
+            kind, channel_id = BLOCK_STRUCT.unpack(block)
+
+            if kind == SCHEMA:
+                name = _read_string(file)
+                columns = list()
+                for _ in range(COUNT_STRUCT.unpack(_read(file, COUNT_STRUCT.size))[0]):
+                    column_name = _read_string(file)
+                    typecode = _read(file, 1).decode()
+                    n_labels = COUNT_STRUCT.unpack(_read(file, COUNT_STRUCT.size))[0]
+                    labels = [_read_string(file) for _ in range(n_labels)] or None
+                    columns.append(TelemetryColumn(column_name, typecode, labels))
+                channels[channel_id] = (name, columns)
+
+            elif kind == BATCH:
+                name, columns = channels[channel_id]
+                (n_rows,) = ROWS_STRUCT.unpack(_read(file, ROWS_STRUCT.size))
+                values = list()
+                for column in columns:
+                    column_values = array(column.typecode)
+                    column_values.frombytes(_read(file, n_rows * column_values.itemsize))
+                    if swap:
+                        column_values.byteswap()
+                    labels = column.labels
+                    values.append(
+                        [labels[v] for v in column_values] if labels else column_values.tolist()
+                    )
+
+                names = [column.name for column in columns]
+                for row in zip(*values):
+                    yield name, dict(zip(names, row))
+
+            else:
+                raise ValueError(f"Unknown block kind {kind} in {path}")
+
+
+def telemetry_to_ndjson(paths: list[str], output: IO[str]) -> int:
+    """Converts telemetry files to NDJSON, a line for each row with its channel. Returns the number of rows"""
+    rows = 0
+    for path in paths:
+        for channel, row in read_telemetry(path):
+            output.write(json.dumps(dict(channel=channel, **row)))
+            output.write("\n")
+            rows += 1
+    return rows
+
+
+def _pack_string(string: str) -> bytes:
+    encoded = string.encode()
+    return COUNT_STRUCT.pack(len(encoded)) + encoded
+
+
+def _read(file: IO[bytes], size: int) -> bytes:
+    data = file.read(size)
+    if len(data) < size:
+        raise ValueError(f"Truncated telemetry file {file.name}")
+    return data
+
+
+def _read_string(file: IO[bytes]) -> str:
+    (length,) = COUNT_STRUCT.unpack(_read(file, COUNT_STRUCT.size))
+    return _read(file, length).decode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts telemetry files to NDJSON")
+    parser.add_argument("output", type=str, help="The NDJSON file to write")
+    parser.add_argument("files", type=str, nargs="+", help="The telemetry files, in order")
+    args = parser.parse_args()
+
+    with open(args.output, "w") as output:
+        n_rows = telemetry_to_ndjson(args.files, output)
+    print(f"Converted {n_rows} rows to {args.output}")
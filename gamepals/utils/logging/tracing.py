@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from enum import StrEnum
+from typing import Any, Optional
+
+from .latency import LatencyHistogram
+from .loggable import Loggable
+
+
+class TraceStage(StrEnum):
+    """The stages a Game State goes through, from its packet to the Virtual Controller, in order"""
+
+    DECODE = "decode"  # Decoding the packet received from the game
+    DISPATCH = "dispatch"  # Waiting for the Software Agent to be notified of the state
+    OBSERVATION = "observation"  # Building the observation of the model
+    INFERENCE = "inference"  # Running the model
+    ACTIONS = "actions"  # Making the actions of the agent from the output of the model
+    QUEUE = "queue"  # Sending the actions to the arbitrator, and waiting for the arbitration thread
+    MERGE = "merge"  # Merging the actions with the inputs of the other Actors
+    OUTPUT = "output"  # Sending the report to the Virtual Controller device
+
+
+_STAGE_ORDER = {stage: i for i, stage in enumerate(TraceStage)}
+
+
+class TickTrace:
+    """
+    TickTrace follows a Game State through the TraceStages of a Software Agent, recording the time spent in each one.
+
+    The trace travels with the inputs of the agent, so it's marked by several threads, one after the other. A stage is
+    only recorded the first time it's reached: the actions of a tick are merged and sent together, or one after the
+    other, and the first one to get there ends the stage. Stages can be skipped, e.g. by agents without a model.
+    """
+
+    __slots__ = ("tracer", "tag", "started_at", "last_at", "stage_index")
+
+    def __init__(self, tracer: Tracer, tag: str, started_at: float) -> None:
+        self.tracer = tracer
+        self.tag = tag
+        self.started_at = started_at
+        self.last_at = started_at
+        self.stage_index = -1
+
+    def mark(self, stage: TraceStage, at: float | None = None) -> None:
+        """Ends the stage, now or at the given time.perf_counter() time"""
+        index = _STAGE_ORDER[stage]
+        if index <= self.stage_index:
+            return
+
+        if at is None:
+            at = time.perf_counter()
+        self.tracer.record(self.tag, stage, at - self.last_at)
+        self.last_at = at
+        self.stage_index = index
+        if stage == TraceStage.OUTPUT:
+            self.tracer.record_total(self.tag, at - self.started_at)
+
+
+class Tracer(Loggable):
+    """
+    Tracer collects the TickTraces of the Software Agents: for each agent class, a histogram of the time spent in
+    each TraceStage, and one of the time from the reception of a Game State to the Virtual Controller output.
+
+    It's disabled by default, in which case no trace is started and the instrumented code only checks for None.
+
+    It implements a Singleton pattern.
+    """
+
+    _instance: Optional[Tracer] = None
+
+    def __new__(cls) -> Tracer:
+        if cls._instance is None:
+            cls._instance = super(Tracer, cls).__new__(cls)
+            cls._instance.enabled = False
+            cls._instance.budget = None
+            cls._instance.__lock = threading.Lock()
+            cls._instance.reset()
+        return cls._instance
+
+    enabled: bool
+    budget: float | None  # seconds
+    histograms: dict[str, dict[TraceStage, LatencyHistogram]]
+    totals: dict[str, LatencyHistogram]
+    __lock: threading.Lock
+
+    def enable(self, budget: float | None = None) -> None:
+        """
+        Args:
+            budget (float | None, optional): The time (in seconds) between two Game States the agents are notified
+                of, that the report breaks down.
+        """
+        self.enabled = True
+        self.budget = budget
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Starts new histograms"""
+        with self.__lock:
+            self.histograms = dict()
+            self.totals = dict()
+
+    def start(self, tag: str, received_at: float, decoded_at: float) -> TickTrace | None:
+        """
+        Starts the trace of a Game State for the agent with the given tag, marking its decoding and its dispatch.
+        Returns None if the Tracer is disabled.
+
+        Args:
+            received_at (float): The time.perf_counter() when the state was received. 0 if unknown.
+            decoded_at (float): The time.perf_counter() when the state was decoded. 0 if unknown.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.perf_counter()
+        trace = TickTrace(self, tag, received_at or decoded_at or now)
+        if decoded_at:
+            trace.mark(TraceStage.DECODE, decoded_at)
+        trace.mark(TraceStage.DISPATCH, now)
+        return trace
+
+    def record(self, tag: str, stage: TraceStage, seconds: float) -> None:
+        stages = self.histograms.get(tag, None)
+        if stages is None:
+            with self.__lock:
+                stages = self.histograms.setdefault(
+                    tag, {stage: LatencyHistogram() for stage in TraceStage}
+                )
+                self.totals.setdefault(tag, LatencyHistogram())
+        stages[stage].record(seconds)
+
+    def record_total(self, tag: str, seconds: float) -> None:
+        self.totals[tag].record(seconds)
+
+    def get_json(self) -> dict[str, Any]:
+        with self.__lock:
+            tags = list(self.histograms.items())
+
+        data: dict[str, Any] = dict()
+        for tag, stages in tags:
+            data[tag] = {
+                stage.value: histogram.get_json()
+                for stage, histogram in stages.items()
+                if histogram.count > 0
+            }
+            data[tag]["total"] = self.totals[tag].get_json()
+        return data
+
+    def report(self) -> str:
+        """Returns a table of the time spent in each stage, by agent, and of its share of the budget"""
+        lines = list()
+        header = f"{'':>14} {'ticks':>7} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        if self.budget:
+            header += f" {'budget':>7}"
+
+        for tag, stages in self.get_json().items():
+            budget = f", budget {self.budget * 1e3:.1f} ms" if self.budget else ""
+            lines.append(f"{tag}{budget}")
+            lines.append(header)
+            for stage, metrics in stages.items():
+                line = (
+                    f"{stage:>14} {metrics['count']:7d} {metrics['mean_ms']:8.3f} {metrics['p50_ms']:8.3f} "
+                    f"{metrics['p99_ms']:8.3f} {metrics['max_ms']:8.3f}"
+                )
+                if self.budget:
+                    line += f" {metrics['mean_ms'] / (self.budget * 1e3):7.1%}"
+                lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""
+Compares the event-driven arbitration with the fixed-rate one, under a burst of stick inputs.
+
+Each human pilot is a controller that sends jittering left stick values at a fixed rate, as a worn stick does.
+The virtual controller doesn't create a device: it records the reports it would send to it (RecordingGamepad).
+For each mode, the benchmark reports the inputs received, the inputs executed, the device updates (and the ones
+skipped because the report didn't change), the CPU time, the input-to-execution latency and the latency from the
+reading of an input to the device update.
+Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.arbitration_benchmark --rates 0 60 120 240 --events 2000 --seconds 5
+"""
+
+import argparse
+import random
+import time
+import tomllib
+
+from gamepals.agents import HumanActor
+from gamepals.agents.actions import ActionConversionManager
+from gamepals.command_arbitrators import CommandArbitrator
+from gamepals.sources import (PhysicalControllerListener, RecordingGamepad,
+                              VirtualControllerProvider)
+from gamepals.sources.controller import ControllerInput, InputType
+from gamepals.utils.configuration_handler import ConfigurationHandler
+from gamepals.utils.logging import InputLatencyTracker, LatencyStage, TickTrace
+
+from rocket_league.agents import RLGameAction  # Registers the game actions
+
+CONFIGS_DIR = "configs"
+
+
+class JitterControllerListener(PhysicalControllerListener):
+    """Sends random left stick values at a fixed rate instead of reading a physical controller"""
+
+    def __init__(self, gamepad_number: int, events_per_second: float) -> None:
+        super().__init__(gamepad_number, late_init=True)
+        self.period = 1 / events_per_second
+
+    def _listen_loop(self) -> None:
+        next_event = time.perf_counter()
+        while self.running:
+            self.notify_all(
+                ControllerInput(InputType.STICK_LEFT_X_POS, random.uniform(0.0, 1.0)),
+                time.perf_counter(),
+            )
+            next_event += self.period
+            delay = next_event - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class CountingVirtualController(VirtualControllerProvider):
+    def __init__(self) -> None:
+        super().__init__(RecordingGamepad)
+        self.executed = 0
+
+    def execute(
+        self,
+        c_input: ControllerInput,
+        read_at: float | None = None,
+        trace: TickTrace | None = None,
+    ) -> bool:
+        self.executed += 1
+        return super().execute(c_input, read_at, trace)
+
+
+def run(
+    tick_rate: float | None, n_humans: int, events_per_second: float, seconds: float
+) -> dict[str, float]:
+    config_handler = ConfigurationHandler()
+    conversion_manager = ActionConversionManager()
+
+    arbitrator = CommandArbitrator(
+        config_handler.get_policy_types(), conversion_manager, tick_rate=tick_rate
+    )
+    virtual_controller = CountingVirtualController()
+    arbitrator.virtual_controller = virtual_controller
+
+    listeners = list()
+    for i in range(n_humans):
+        listener = JitterControllerListener(i, events_per_second)
+        arbitrator.add_actor(HumanActor(listener, conversion_manager))
+        listeners.append(listener)
+
+    latency_tracker = InputLatencyTracker()
+    latency_tracker.reset()
+    cpu_start = time.process_time()
+    arbitrator.start()
+    time.sleep(seconds)
+    for listener in listeners:
+        listener.stop_listening()
+    arbitrator.stop()
+    cpu = time.process_time() - cpu_start
+
+    metrics = arbitrator.queue.get_json()
+    output_latency = latency_tracker.histograms[LatencyStage.OUTPUT]
+    return {
+        "inputs": metrics["updates"],
+        "executed": virtual_controller.executed,
+        "device_updates": virtual_controller.flushes,
+        "skipped_updates": virtual_controller.skipped_flushes,
+        "cpu_s": cpu,
+        "latency_p50_ms": metrics.get("latency_p50_ms", 0.0),
+        "latency_p99_ms": metrics.get("latency_p99_ms", 0.0),
+        "output_p50_ms": output_latency.percentile(50) * 1e3,
+        "output_p99_ms": output_latency.percentile(99) * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rates",
+        type=float,
+        nargs="+",
+        default=[0, 60, 120, 240],
+        help="Arbitration rates (Hz) to compare. 0 is the event-driven mode",
+    )
+    parser.add_argument("--humans", type=int, default=2)
+    parser.add_argument(
+        "--events", type=float, default=2000, help="Stick events per second, per human"
+    )
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with (
+        open(f"{CONFIGS_DIR}/game.toml", "rb") as game_config,
+        open(f"{CONFIGS_DIR}/agents.toml", "rb") as agents_config,
+        open(f"{CONFIGS_DIR}/two_humans.toml", "rb") as assistance_config,
+    ):
+        ConfigurationHandler(
+            tomllib.load(game_config),
+            tomllib.load(agents_config),
+            tomllib.load(assistance_config),
+        )
+
+    for rate in args.rates:
+        result = run(rate or None, args.humans, args.events, args.seconds)
+        mode = f"{rate:g} Hz" if rate else "event-driven"
+        print(
+            f"{mode:>12}: {result['inputs']:7d} inputs, {result['executed']:7d} executed, "
+            f"{result['device_updates']:6d} device updates ({result['skipped_updates']} skipped), CPU {result['cpu_s']:5.2f} s, "
+            f"latency p50 {result['latency_p50_ms']:6.2f} ms, p99 {result['latency_p99_ms']:6.2f} ms, "
+            f"read to device p50 {result['output_p50_ms']:6.2f} ms, p99 {result['output_p99_ms']:6.2f} ms"
+        )
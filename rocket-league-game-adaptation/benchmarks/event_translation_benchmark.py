@@ -0,0 +1,133 @@
+"""
+Compares the events per second a PhysicalControllerListener converts into Controller Inputs, from the bytes read
+from an evdev device, before and after translating them with the table it compiles for its gamepad (EventTranslator).
+
+Before, an event object of the inputs package was made for every event, Sync events included, and its code was
+looked up by name; after, a whole read is translated in one pass and the events without inputs are dropped first.
+The events are taken from recordings of evdev devices, such as:
+
+    cat /dev/input/by-id/usb-Microsoft_Controller-event-joystick > pad.evdev
+
+split into reads of one frame (the events up to a SYN_REPORT) each, as they come when the listener keeps up. Without
+recordings, a synthetic stream is used: both sticks moving, with buttons and triggers now and then.
+Linux only. Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.event_translation_benchmark pad.evdev
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from inputs import InputDevice
+
+from gamepals.sources import PhysicalControllerListener
+from gamepals.sources.physical_controller_listener import EvdevGamePad
+
+EV_SYN, EV_KEY, EV_ABS, EV_MSC = 0, 1, 3, 4
+SYN_REPORT = 0
+MSC_SCAN = 4
+ABS_X, ABS_Y, ABS_Z, ABS_RX, ABS_RY, ABS_RZ = 0, 1, 2, 3, 4, 5
+BTN_SOUTH, BTN_EAST = 0x130, 0x131
+
+
+def split_reads(data: bytes, frames_per_read: int) -> list[bytes]:
+    """Splits the events into reads of frames_per_read frames"""
+    size = EvdevGamePad.EVENT_STRUCT.size
+    data = data[: len(data) - len(data) % size]
+    reads: list[bytes] = list()
+    start, frames = 0, 0
+    for offset, (_, _, ev_type, code, _) in enumerate(EvdevGamePad.EVENT_STRUCT.iter_unpack(data)):
+        if ev_type == EV_SYN and code == SYN_REPORT:
+            frames += 1
+            if frames == frames_per_read:
+                reads.append(data[start : (offset + 1) * size])
+                start, frames = (offset + 1) * size, 0
+    if start < len(data):
+        reads.append(data[start:])
+    return reads
+
+
+def synthetic_stream(frames: int, seed: int = 0) -> bytes:
+    """Frames of a controller at 250 Hz: both sticks moving, and a button or trigger in one frame out of ten"""
+    rng = random.Random(seed)
+    events = list()
+    for frame in range(frames):
+        t = frame / 250
+        seconds, microseconds = int(t), int(t % 1 * 1e6)
+        for code in (ABS_X, ABS_Y, ABS_RX, ABS_RY):
+            if rng.random() < 0.8:
+                events.append((seconds, microseconds, EV_ABS, code, rng.randint(-32768, 32767)))
+        if rng.random() < 0.1:
+            if rng.random() < 0.5:
+                button = rng.choice([BTN_SOUTH, BTN_EAST])
+                events.append((seconds, microseconds, EV_MSC, MSC_SCAN, 0x90001 + button - BTN_SOUTH))
+                events.append((seconds, microseconds, EV_KEY, button, rng.randint(0, 1)))
+            else:
+                events.append((seconds, microseconds, EV_ABS, rng.choice([ABS_Z, ABS_RZ]), rng.randint(0, 255)))
+        events.append((seconds, microseconds, EV_SYN, SYN_REPORT, 0))
+    return b"".join(EvdevGamePad.EVENT_STRUCT.pack(*event) for event in events)
+
+
+def run_events(listener: PhysicalControllerListener, reads: list[bytes]) -> int:
+    """Converts the reads as the listener did before, returning the number of inputs"""
+    device = SimpleNamespace(manager=listener.devices)  # The GamePad the events are made for
+    count = 0
+    for data in reads:
+        for fields in EvdevGamePad.EVENT_STRUCT.iter_unpack(data):
+            event = InputDevice._make_event(device, *fields)
+            if event.ev_type == "Sync":
+                continue
+            observed = listener.event_to_input(event)
+            if observed:
+                listener.notify_all(observed, 0.0)
+                count += 1
+    return count
+
+
+def run_translated(listener: PhysicalControllerListener, reads: list[bytes]) -> int:
+    """Converts the reads with the translation table of the listener, returning the number of inputs"""
+    return sum(listener.dispatch_raw(data, 0.0) for data in reads)
+
+
+def measure(run, listener: PhysicalControllerListener, reads: list[bytes], repeat: int) -> tuple[float, int]:
+    """Returns the best events per second of the runs, and the number of inputs"""
+    n_events = sum(len(data) for data in reads) // EvdevGamePad.EVENT_STRUCT.size
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = run(listener, reads)
+        best = max(best, n_events / (time.perf_counter() - start))
+    return best, count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recordings", type=str, nargs="*", help="Events recorded from evdev devices")
+    parser.add_argument("--frames", type=int, default=50000, help="Frames of the synthetic stream")
+    parser.add_argument("--frames-per-read", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    streams: list[tuple[str, bytes]] = list()
+    for path in args.recordings:
+        with open(path, "rb") as recording:
+            streams.append((path, recording.read()))
+    if not args.recordings:
+        streams.append(("synthetic", synthetic_stream(args.frames)))
+
+    listener = PhysicalControllerListener(0, late_init=True)
+    listener.translator = listener.compile_translator()
+
+    for name, stream in streams:
+        reads = split_reads(stream, args.frames_per_read)
+        n_events = len(stream) // EvdevGamePad.EVENT_STRUCT.size
+        before, before_inputs = measure(run_events, listener, reads, args.repeat)
+        after, after_inputs = measure(run_translated, listener, reads, args.repeat)
+        if before_inputs != after_inputs:
+            raise RuntimeError(f"{name}: {before_inputs} inputs before, {after_inputs} after")
+
+        print(f"{name}: {n_events} events in {len(reads)} reads, {after_inputs} inputs")
+        print(f"  events:     {before:10.0f} events/s")
+        print(f"  translated: {after:10.0f} events/s ({after / before:.2f}x)")
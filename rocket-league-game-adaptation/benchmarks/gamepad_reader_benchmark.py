@@ -0,0 +1,132 @@
+"""
+Compares the CPU time used to read a controller by the polling reader (NonBlockingGamePad) and by the one waiting on
+its evdev device (EvdevGamePad), when the player is idle and when they send events at increasing rates.
+
+The controller is a fake evdev device: a named pipe, to which a thread writes input events (a left stick move
+followed by a sync event) at a fixed rate. The readers are read in a loop, as PhysicalControllerListener does.
+Linux only. Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.gamepad_reader_benchmark --rates 0 100 1000 --seconds 3
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+from gamepals.sources import PhysicalControllerListener
+from gamepals.sources.physical_controller_listener import EvdevGamePad, NonBlockingGamePad
+
+EV_SYN = 0
+EV_ABS = 3
+ABS_X = 0
+EVENT_TYPES = {EV_SYN: "Sync", EV_ABS: "Absolute"}
+
+
+@dataclass
+class FakeEvent:
+    ev_type: str
+    code: int
+    state: int
+
+
+class PipeGamePad:
+    """Stands in for a GamePad of the inputs package, whose evdev device is a named pipe"""
+
+    def __init__(self, path: str) -> None:
+        self._character_device_path = path
+        self.__fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+
+    def _make_event(self, tv_sec: int, tv_usec: int, ev_type: int, code: int, value: int) -> FakeEvent:
+        return FakeEvent(EVENT_TYPES.get(ev_type, "Misc"), code, value)
+
+    def _do_iter(self) -> list[FakeEvent] | None:
+        """Returns the events available, or None if there are none (like the inputs package does on Windows)"""
+        try:
+            data = os.read(self.__fd, EvdevGamePad.EVENT_STRUCT.size * EvdevGamePad.MAX_EVENTS_PER_READ)
+        except BlockingIOError:
+            return None
+        return [self._make_event(*fields) for fields in EvdevGamePad.EVENT_STRUCT.iter_unpack(data)] or None
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+
+def write_events(path: str, rate: float, stop: threading.Event) -> None:
+    fd = os.open(path, os.O_WRONLY)
+    period = 1 / rate if rate > 0 else None
+    next_event = time.perf_counter()
+    value = 0
+    while not stop.is_set():
+        if period is None:
+            stop.wait(0.1)
+            continue
+
+        now = time.time()
+        seconds, micros = int(now), int(now % 1 * 1e6)
+        value = (value + 1) % 32768
+        os.write(
+            fd,
+            EvdevGamePad.EVENT_STRUCT.pack(seconds, micros, EV_ABS, ABS_X, value)
+            + EvdevGamePad.EVENT_STRUCT.pack(seconds, micros, EV_SYN, 0, 0),
+        )
+        next_event += period
+        delay = next_event - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    os.close(fd)
+
+
+def run(reader_type: type, rate: float, seconds: float) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "event0")
+        os.mkfifo(path)
+        gamepad = PipeGamePad(path)  # The reading end must be opened first
+        stop = threading.Event()
+        writer = threading.Thread(target=write_events, args=(path, rate, stop))
+        writer.start()
+
+        reader = reader_type(gamepad, PhysicalControllerListener.MAX_WAIT_FOR_INPUT)
+        result = {"events": 0, "empty_reads": 0, "cpu_s": 0.0}
+
+        def read_loop() -> None:
+            cpu_start = time.thread_time()
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                events = reader.read()
+                if len(events) == 0:
+                    result["empty_reads"] += 1
+                result["events"] += sum(1 for event in events if event.ev_type != "Sync")
+            result["cpu_s"] = time.thread_time() - cpu_start
+
+        read_thread = threading.Thread(target=read_loop)
+        read_thread.start()
+        read_thread.join()
+
+        stop.set()
+        writer.join()
+        if isinstance(reader, EvdevGamePad):
+            reader.close()
+        gamepad.close()
+
+    result["cpu_percent"] = result["cpu_s"] / seconds * 100
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rates", type=float, nargs="+", default=[0, 100, 1000], help="Events per second. 0 is an idle player"
+    )
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for rate in args.rates:
+        for reader_type in (NonBlockingGamePad, EvdevGamePad):
+            result = run(reader_type, rate, args.seconds)
+            print(
+                f"{reader_type.__name__:>18} at {rate:6g} events/s: CPU {result['cpu_percent']:5.1f}% of a core, "
+                f"{result['events']} events, {result['empty_reads']} empty reads"
+            )
@@ -0,0 +1,103 @@
+"""
+Measures the per-tick inference latency against the number of copilots sharing a policy.
+
+Every tick, each copilot submits one observation. In sequential mode the copilots run one forward pass each, one
+after another, as they do when notified by the RLGameStateListener. In batched mode each copilot submits from its
+own thread, as they would if they were notified concurrently, and the InferenceEngine runs the observations pending
+together in a single forward pass.
+The policy has random weights, so no trained policy file is needed.
+Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.inference_benchmark --copilots 1 2 4 8 --ticks 200
+"""
+
+import argparse
+import statistics
+import threading as th
+import time
+
+import numpy as np
+import torch
+
+from rocket_league.agents.models.discrete_policy import DiscretePolicy
+from rocket_league.agents.models.inference_engine import InferenceEngine
+from rocket_league.agents.models.model import DEFAULT_DEVICE, POLICY_LAYER_SIZES
+
+OBS_SIZE = 114
+ACTION_SPACE_SIZE = 3
+
+
+def make_engine(n_copilots: int) -> InferenceEngine:
+    policy = DiscretePolicy(
+        OBS_SIZE, ACTION_SPACE_SIZE, POLICY_LAYER_SIZES, DEFAULT_DEVICE
+    ).to(DEFAULT_DEVICE)
+    engine = InferenceEngine(policy)
+    for _ in range(n_copilots):
+        engine.register()
+    return engine
+
+
+def run_sequential(n_copilots: int, n_ticks: int) -> list[float]:
+    engine = make_engine(n_copilots)
+    obs = np.random.rand(n_copilots, OBS_SIZE).astype(np.float32)
+
+    latencies = list()
+    for _ in range(n_ticks):
+        start = time.perf_counter()
+        for i in range(n_copilots):
+            engine.infer(obs[i])
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def run_batched(n_copilots: int, n_ticks: int) -> list[float]:
+    engine = make_engine(n_copilots)
+    obs = np.random.rand(n_copilots, OBS_SIZE).astype(np.float32)
+
+    tick_start = th.Barrier(n_copilots + 1)
+    tick_end = th.Barrier(n_copilots + 1)
+
+    def copilot(i: int) -> None:
+        for _ in range(n_ticks):
+            tick_start.wait()
+            engine.infer(obs[i])
+            tick_end.wait()
+
+    threads = [th.Thread(target=copilot, args=(i,)) for i in range(n_copilots)]
+    for thread in threads:
+        thread.start()
+
+    latencies = list()
+    for _ in range(n_ticks):
+        tick_start.wait()
+        start = time.perf_counter()
+        tick_end.wait()
+        latencies.append(time.perf_counter() - start)
+
+    for thread in threads:
+        thread.join()
+
+    return latencies
+
+
+def describe(latencies: list[float]) -> str:
+    ms = sorted(latency * 1e3 for latency in latencies)
+    return (
+        f"p50 {statistics.median(ms):7.2f} ms, "
+        f"p99 {ms[int(len(ms) * 0.99) - 1]:7.2f} ms, max {ms[-1]:7.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copilots", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+
+    for n in args.copilots:
+        print(f"{n} copilots")
+        print(f"  sequential: {describe(run_sequential(n, args.ticks))}")
+        print(f"  batched:    {describe(run_batched(n, args.ticks))}")
@@ -0,0 +1,152 @@
+"""
+Measures how many analog inputs the input conditioning of the humans (the [[conditioning]] tables of the assistance
+configuration) lets through, out of the ones read from their controllers.
+
+The inputs are taken from sessions recorded with main.py --record: the values of the actions each human controls with
+a single stick axis or trigger are the values of that axis. Without recordings, a synthetic trace of a noisy stick is
+used instead: resting, held and swept at 250 events per second per axis.
+Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.input_conditioning_benchmark --assistance configs/movement_only.toml session.rec
+"""
+
+import argparse
+import math
+import random
+import tomllib
+from collections import Counter
+
+from gamepals.command_arbitrators import SessionReader
+from gamepals.command_arbitrators.session_recorder import RecordedActor
+from gamepals.agents.observer import ActorData
+from gamepals.sources.input_conditioning import AnalogAxis, InputConditioner
+from gamepals.utils.configuration_handler import ConfigurationHandler
+
+from rocket_league.agents import RLGameAction  # Registers the game actions
+
+CONFIGS_DIR = "configs"
+
+Trace = list[tuple[float, AnalogAxis, float]]  # Time, axis and value of every event
+
+
+def to_axis(input_types: list) -> AnalogAxis | None:
+    """Returns the analog axis of the inputs of an action, None if they aren't the two sides of one axis or a trigger"""
+    axes = {input_type.value.removesuffix("_Pos").removesuffix("_Neg") for input_type in input_types}
+    if len(axes) != 1:
+        return None
+    axis = axes.pop()
+    return AnalogAxis(axis) if axis in AnalogAxis._value2member_map_ else None
+
+
+def read_recording(path: str, config_handler: ConfigurationHandler) -> dict[int, Trace]:
+    """Returns the trace of the analog axes of every human of the recording"""
+    humans: dict[object, int] = dict()  # Actor id -> index of the human
+    traces: dict[int, Trace] = dict()
+    for timestamp, record in SessionReader(path, config_handler.get_game_action_type()):
+        if isinstance(record, RecordedActor):
+            if record.index >= 0:
+                humans[record.actor_id] = record.index
+            continue
+        if not isinstance(record, ActorData) or record.actor_id not in humans:
+            continue
+
+        index = humans[record.actor_id]
+        axis = to_axis(config_handler.action_to_user_input(index, record.data.action) or list())
+        if axis is not None:
+            traces.setdefault(index, list()).append((timestamp, axis, record.data.val))
+    return traces
+
+
+def synthetic_trace(seconds: float, rate: float = 250.0, seed: int = 0) -> Trace:
+    """A left stick resting, held and swept, with the noise of its sensors. Events are sent only on changes"""
+    rng = random.Random(seed)
+    trace: Trace = list()
+    last = {AnalogAxis.STICK_LEFT_X: None, AnalogAxis.STICK_LEFT_Y: None}
+    t = 0.0
+    while t < seconds:
+        mode, duration = rng.choice(["rest", "hold", "sweep"]), rng.uniform(0.5, 3.0)
+        angle, radius = rng.uniform(0, 2 * math.pi), rng.uniform(0.3, 1.0)
+        start = t
+        while t < min(start + duration, seconds):
+            if mode == "rest":
+                position = (0.0, 0.0)
+            elif mode == "hold":
+                position = (radius * math.cos(angle), radius * math.sin(angle))
+            else:
+                phase = angle + 2 * math.pi * (t - start) / duration
+                position = (radius * math.cos(phase), radius * math.sin(phase))
+
+            for axis, value in zip(last, position):
+                raw = round((value + rng.gauss(0, 0.004)) * 32768)
+                raw = max(-32768, min(raw, 32767))
+                if raw != last[axis]:
+                    last[axis] = raw
+                    trace.append((t, axis, raw / 32768))
+            t += 1 / rate
+    return trace
+
+
+def run(trace: Trace, conditioner: InputConditioner) -> Counter:
+    """Feeds the trace to the conditioner, as the listener would, returning the values sent by axis"""
+    sent: Counter = Counter()
+    for timestamp, axis, value in trace:
+        for sent_axis, _, _ in conditioner.flush(timestamp):
+            sent[sent_axis] += 1
+        if conditioner.is_conditioned(axis):
+            outputs = conditioner.condition(axis, value, timestamp)
+        else:
+            outputs = [(axis, value, timestamp)]
+        for sent_axis, _, _ in outputs:
+            sent[sent_axis] += 1
+    for sent_axis, _, _ in conditioner.flush(math.inf):
+        sent[sent_axis] += 1
+    return sent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recordings", type=str, nargs="*", help="Sessions recorded with main.py --record")
+    parser.add_argument("--assistance", type=str, default=f"{CONFIGS_DIR}/movement_only.toml")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the synthetic trace")
+    args = parser.parse_args()
+
+    with (
+        open(f"{CONFIGS_DIR}/game.toml", "rb") as game_config,
+        open(f"{CONFIGS_DIR}/agents.toml", "rb") as agents_config,
+        open(args.assistance, "rb") as assistance_config,
+    ):
+        config_handler = ConfigurationHandler(
+            tomllib.load(game_config),
+            tomllib.load(agents_config),
+            tomllib.load(assistance_config),
+        )
+
+    traces: list[tuple[str, int | None, Trace]] = list()  # No index for the recordings without analog inputs
+    for path in args.recordings:
+        recorded = read_recording(path, config_handler)
+        traces.extend((path, index, trace) for index, trace in sorted(recorded.items()))
+        if not recorded:
+            traces.append((path, None, list()))
+    if not args.recordings:
+        traces.append(("synthetic", 0, synthetic_trace(args.seconds)))
+
+    for name, index, trace in traces:
+        if index is None:
+            print(f"{name}: no analog inputs (no human controls an action with a single stick axis or trigger)")
+            continue
+
+        received = Counter(axis for _, axis, _ in trace)
+        sent = run(trace, InputConditioner(config_handler.get_input_conditioning(index)))
+        seconds = max(trace[-1][0] - trace[0][0], 1e-9) if trace else 1.0
+        print(f"{name}, human {index} ({seconds:.1f} s):")
+        for axis in sorted(received):
+            print(
+                f"  {axis:>14}: {received[axis] / seconds:7.1f} -> {sent[axis] / seconds:7.1f} events/s "
+                f"({1 - sent[axis] / received[axis]:6.1%} fewer)"
+            )
+        total_received, total_sent = sum(received.values()), sum(sent.values())
+        if total_received:
+            print(
+                f"  {'total':>14}: {total_received / seconds:7.1f} -> {total_sent / seconds:7.1f} events/s "
+                f"({1 - total_sent / total_received:6.1%} fewer)"
+            )
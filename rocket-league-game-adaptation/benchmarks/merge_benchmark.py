@@ -0,0 +1,82 @@
+"""
+Measures the merges per second of the CommandArbitrator, before and after compiling its dispatch tables.
+
+Two human pilots (configured as in configs/two_humans.toml) send inputs for all their actions. Each input is
+applied and its action merged, as the arbitration thread does, without executing the result on a controller.
+Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.merge_benchmark --inputs 200000
+"""
+
+import argparse
+import itertools
+import time
+import tomllib
+
+from gamepals.agents import HumanActor
+from gamepals.agents.actions import ActionConversionManager, ActionInputWithConfidence
+from gamepals.agents.observer import ActorData
+from gamepals.command_arbitrators import CommandArbitrator
+from gamepals.sources import PhysicalControllerListener
+from gamepals.utils.configuration_handler import ConfigurationHandler
+
+from rocket_league.agents import RLGameAction  # Registers the game actions
+
+CONFIGS_DIR = "configs"
+
+
+def make_inputs(arbitrator: CommandArbitrator, n_inputs: int) -> list[ActorData]:
+    sources = [
+        (actor_id, action)
+        for actor_id, actor in arbitrator.actors.items()
+        for action in actor.get_controlled_actions()
+    ]
+    values = itertools.cycle([0.0, 0.25, 1.0, -0.5, 0.75])
+
+    return [
+        ActorData(actor_id, ActionInputWithConfidence(action, next(values), 1.0))
+        for (actor_id, action), _ in zip(itertools.cycle(sources), range(n_inputs))
+    ]
+
+
+def run(arbitrator: CommandArbitrator, inputs: list[ActorData]) -> float:
+    """Returns the merges per second"""
+    start = time.perf_counter()
+    for actor_data in inputs:
+        if arbitrator._apply_input(actor_data):
+            arbitrator._merge_by_action(actor_data.data.action)
+    return len(inputs) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--inputs", type=int, default=200000)
+    args = parser.parse_args()
+
+    with (
+        open(f"{CONFIGS_DIR}/game.toml", "rb") as game_config,
+        open(f"{CONFIGS_DIR}/agents.toml", "rb") as agents_config,
+        open(f"{CONFIGS_DIR}/two_humans.toml", "rb") as assistance_config,
+    ):
+        config_handler = ConfigurationHandler(
+            tomllib.load(game_config),
+            tomllib.load(agents_config),
+            tomllib.load(assistance_config),
+        )
+
+    conversion_manager = ActionConversionManager()
+    arbitrator = CommandArbitrator(
+        config_handler.get_policy_types(), conversion_manager
+    )
+    for i in range(config_handler.get_humans_count()):
+        listener = PhysicalControllerListener(i, late_init=True)
+        arbitrator.add_actor(HumanActor(listener, conversion_manager))
+
+    inputs = make_inputs(arbitrator, args.inputs)
+
+    before = run(arbitrator, inputs)
+    arbitrator.compile()
+    after = run(arbitrator, inputs)
+
+    print(f"not compiled: {before:10.0f} merges/s")
+    print(f"compiled:     {after:10.0f} merges/s ({after / before:.2f}x)")
@@ -0,0 +1,50 @@
+"""
+Compares the decoding throughput of the JSON and binary game packet formats.
+
+Packets are generated by the MockModServer and decoded into an RLGameState, as the RLGameStateListener does.
+The orientation of every car is then read, as the observation builders do.
+Run from the rocket-league-game-adaptation folder:
+
+    python -m benchmarks.packet_decode_benchmark --cars 2 --packets 20000
+"""
+
+import argparse
+import time
+
+from rocket_league.mod import RLGameState
+from rocket_league.mod.mock_mod_server import MockModServer
+from rocket_league.mod.packet_codec import (WireFormat, decode_payload,
+                                            encode_binary, encode_json)
+
+
+def run(wire_format: WireFormat, num_cars: int, n_packets: int) -> float:
+    server = MockModServer(num_cars=num_cars)
+    encode = encode_binary if wire_format == WireFormat.BINARY else encode_json
+    payloads = [encode(server.make_packet(tick)) for tick in range(n_packets)]
+    game_state = RLGameState()
+
+    start = time.perf_counter()
+    for payload in payloads:
+        game_state.decode(decode_payload(payload), 1)
+        for player in game_state.players:
+            for car_data in (player.car_data, player.inverted_car_data):
+                car_data.forward()
+                car_data.up()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{wire_format.name:>6}: {len(payloads[0]):5d} bytes/packet, "
+        f"{n_packets / elapsed:10.0f} packets/s, {elapsed / n_packets * 1e6:7.2f} us/packet"
+    )
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=2)
+    parser.add_argument("--packets", type=int, default=20000)
+    args = parser.parse_args()
+
+    json_time = run(WireFormat.JSON, args.cars, args.packets)
+    binary_time = run(WireFormat.BINARY, args.cars, args.packets)
+    print(f"Speedup: {json_time / binary_time:.2f}x")
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 import time
@@ -9,23 +10,65 @@ from gamepals.agents.actions import (
     ActionToAxisDelegate,
     ActionToBinaryInputsDelegate,
 )
-from gamepals.command_arbitrators import CommandArbitrator
-from gamepals.sources import PhysicalControllerListener
+from gamepals.command_arbitrators import CommandArbitrator, SessionRecorder
+from gamepals.sources import (
+    PhysicalControllerHub,
+    PhysicalControllerListener,
+    VirtualControllerProvider,
+)
 from gamepals.utils import ArgParser
-from gamepals.utils.logging import Logger
+from gamepals.utils.logging import InputLatencyTracker, Logger, Telemetry, Tracer
 
 from rocket_league.agents import *
+from rocket_league.agents.models import Model
 from rocket_league.mod import RLGameStateListener
 
 
-def main(arg_parser: ArgParser) -> None:
-    # Logger
-    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
-    logger = logging.getLogger(__name__)
+class RLArgParser(ArgParser):
+    def _add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--model-host",
+            action="store_true",
+            help="Run the copilots' policies in worker processes instead of the main one",
+        )
+        parser.add_argument(
+            "--model-host-threads",
+            type=int,
+            default=1,
+            help="Number of torch threads of each worker process",
+        )
+        parser.add_argument(
+            "--arbitration-rate",
+            type=float,
+            default=None,
+            help="Arbitrate the inputs at this fixed rate (Hz) instead of as soon as they are received",
+        )
+        parser.add_argument(
+            "--analog-epsilon",
+            type=float,
+            default=VirtualControllerProvider.DEFAULT_ANALOG_EPSILON,
+            help="Smallest change of a stick or trigger value sent to the virtual controller",
+        )
+        parser.add_argument(
+            "--record",
+            type=str,
+            default=None,
+            help="Record every input and game state packet to this file, to be replayed with replay.py",
+        )
+        parser.add_argument(
+            "--telemetry",
+            type=str,
+            default=None,
+            help="Record every arbitrated command and game tick to binary telemetry files starting with this path",
+        )
+        parser.add_argument(
+            "--trace",
+            action="store_true",
+            help="Trace the copilots, from each game tick to the virtual controller, and print a report at the end",
+        )
 
-    # (Globally) init Configuration Handler
-    config_handler = arg_parser.init_config_handler()
 
+def create_conversion_manager() -> ActionConversionManager:
     delegates: list[ActionConversionDelegate] = [
         ActionToBinaryInputsDelegate(0, RLGameAction.THROTTLE),
         ActionToAxisDelegate(0, RLGameAction.STEER_YAW),
@@ -34,23 +77,52 @@ def main(arg_parser: ArgParser) -> None:
         ActionToBinaryInputsDelegate(2, RLGameAction.THROTTLE),
         ActionToAxisDelegate(2, RLGameAction.STEER_YAW),
     ]
-    conversion_manager = ActionConversionManager(delegates)
+    return ActionConversionManager(delegates)
+
+
+def main(arg_parser: ArgParser) -> None:
+    # Logger
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    # (Globally) init Configuration Handler
+    config_handler = arg_parser.init_config_handler()
+
+    if arg_parser.args.model_host:
+        Model.use_model_hosts(arg_parser.args.model_host_threads)
+
+    conversion_manager = create_conversion_manager()
 
     arbitrator = CommandArbitrator(
-        config_handler.get_policy_types(), conversion_manager
+        config_handler.get_policy_types(),
+        conversion_manager,
+        tick_rate=arg_parser.args.arbitration_rate,
     )
+    arbitrator.get_virtual_controller().analog_epsilon = arg_parser.args.analog_epsilon
+
+    recorder: SessionRecorder | None = None
+    if arg_parser.args.record:
+        recorder = SessionRecorder(arg_parser.args.record)
+
+    telemetry: Telemetry | None = None
+    if arg_parser.args.telemetry:
+        telemetry = Telemetry(arg_parser.args.telemetry)
+        arbitrator.enable_telemetry(telemetry)
 
     # Human Pilots
     pilots: list[HumanActor] = list()
     controller_listeners: list[PhysicalControllerListener] = list()
+    controller_hub = PhysicalControllerHub()  # Reads every gamepad from a single thread
 
     for gamepad_index in range(config_handler.get_humans_count()):
         # Register Human Actor
         controller_listener = PhysicalControllerListener(
-            gamepad_number=gamepad_index, late_init=True
+            gamepad_number=gamepad_index, late_init=True, hub=controller_hub
         )
         pilot = HumanActor(controller_listener, conversion_manager)
         arbitrator.add_actor(pilot)
+        if recorder is not None:
+            recorder.add_actor(pilot)
         # Track Pilots and Listeners
         pilots.append(pilot)
         controller_listeners.append(controller_listener)
@@ -60,7 +132,10 @@ def main(arg_parser: ArgParser) -> None:
         )
 
     # AI Agents
-    game_state_listener = RLGameStateListener()
+    game_state_listener = RLGameStateListener(recorder=recorder, telemetry=telemetry)
+    tracer = Tracer()
+    if arg_parser.args.trace:
+        tracer.enable(budget=game_state_listener.tick_skip / game_state_listener.target_fps)
 
     for agent in config_handler.get_necessary_agents():
         agent_params = config_handler.get_params_for_agent(agent.get_name())
@@ -76,6 +151,8 @@ def main(arg_parser: ArgParser) -> None:
         agent_instance = agent(game_state_listener, **agent_params)
 
         arbitrator.add_actor(agent_instance)
+        if recorder is not None:
+            recorder.add_actor(agent_instance)
 
         logger.info(
             f"Registered agent {agent.get_name()} with ID {agent_instance.get_id()}."
@@ -85,11 +162,21 @@ def main(arg_parser: ArgParser) -> None:
         loggables=[
             game_state_listener,
             arbitrator,
+            arbitrator.queue,
             arbitrator.get_virtual_controller(),
+            BaseCopilot.obs_cache,
+            InputLatencyTracker(),
+            controller_hub,
+            *([tracer] if tracer.enabled else []),
+            *([recorder] if recorder is not None else []),
+            *([telemetry] if telemetry is not None else []),
         ],
         log_file_path=arg_parser.get_output_file(),
     )
 
+    if telemetry is not None:
+        telemetry.start()
+    controller_hub.start()
     arbitrator.start()
     game_state_listener.start_listening()
     system_logger.start()
@@ -102,10 +189,19 @@ def main(arg_parser: ArgParser) -> None:
     finally:
         system_logger.stop()
         game_state_listener.stop_listening()
+        arbitrator.stop()
+        if recorder is not None:
+            recorder.close()
+        if telemetry is not None:
+            telemetry.stop()
+        Model.close_engines()
         for controller_listener in controller_listeners:
-            controller_listener.stop_listening()  # Known issue: this only really stops after you press an input on the controller
+            controller_listener.stop_listening()
+        controller_hub.stop()
+        if tracer.enabled:
+            print(tracer.report())
 
 
 if __name__ == "__main__":
-    parser = ArgParser()
+    parser = RLArgParser()
     main(parser)
@@ -1,6 +1,7 @@
 #include "pch.h"
 #include "Broadcaster.h"
 
+#include <algorithm>
 #include <vector>
 #include <winsock2.h>
 #include <ws2tcpip.h>
@@ -68,14 +69,40 @@ void broadcaster::accept_clients()
             continue;
         }
 
-		LOG("Client connected\n");
+        const wire_format format = read_hello(socket);
+		LOG("Client connected ({})\n", format == wire_format::binary ? "binary" : "json");
 
         std::lock_guard<std::mutex> lock(client_mutex_);
-        client_sockets_.push_back(socket);
+        clients_.push_back({ socket, format });
     }
 }
 
-void broadcaster::enqueue_message(std::string&& msg)
+wire_format broadcaster::read_hello(const SOCKET socket)
+{
+    // Clients that don't send a hello (or send an invalid one) receive JSON packets
+    constexpr DWORD hello_timeout_ms = 500;
+    setsockopt(socket, SOL_SOCKET, SO_RCVTIMEO, reinterpret_cast<const char*>(&hello_timeout_ms), sizeof(hello_timeout_ms));
+
+    char hello[packet_codec::hello_size];
+    const int received = recv(socket, hello, sizeof(hello), MSG_WAITALL);
+
+    constexpr DWORD no_timeout = 0;
+    setsockopt(socket, SOL_SOCKET, SO_RCVTIMEO, reinterpret_cast<const char*>(&no_timeout), sizeof(no_timeout));
+
+    wire_format format = wire_format::json;
+    if (received > 0)
+        packet_codec::decode_hello(hello, received, format);
+
+    return format;
+}
+
+bool broadcaster::has_clients(const wire_format format)
+{
+    std::lock_guard lock(client_mutex_);
+    return std::ranges::any_of(clients_, [format](const client& c) { return c.format == format; });
+}
+
+void broadcaster::enqueue_message(encoded_message&& msg)
 {
     {
         std::lock_guard lock(queue_mutex_);
@@ -95,29 +122,33 @@ void broadcaster::broadcast_loop()
         if (!running_ && message_queue_.empty())
             break;
 
-        std::string msg = std::move(message_queue_.front());
+        encoded_message msg = std::move(message_queue_.front());
         message_queue_.pop();
         lock.unlock();
 
         std::lock_guard client_lock(client_mutex_);
-        const uint32_t length = htonl(msg.size());
         std::vector<SOCKET> to_remove;
 
-        for (const SOCKET& client : client_sockets_)
+        for (const client& client : clients_)
         {
-            int ok = send(client, reinterpret_cast<const char*>(&length), sizeof(uint32_t), 0);
+            const std::string& payload = client.format == wire_format::binary ? msg.binary : msg.json;
+            if (payload.empty())
+                continue; // The client connected after the message was encoded
+
+            const uint32_t length = htonl(payload.size());
+            int ok = send(client.socket, reinterpret_cast<const char*>(&length), sizeof(uint32_t), 0);
 
             if (ok != SOCKET_ERROR)
-                ok = send(client, msg.c_str(), msg.size(), 0);
+                ok = send(client.socket, payload.c_str(), payload.size(), 0);
 
             if (ok == SOCKET_ERROR)
-                to_remove.push_back(client);
+                to_remove.push_back(client.socket);
         }
 
-        for (SOCKET client : to_remove)
+        for (SOCKET socket : to_remove)
         {
-            closesocket(client);
-            std::erase(client_sockets_, client);
+            closesocket(socket);
+            std::erase_if(clients_, [socket](const client& c) { return c.socket == socket; });
         }
     }
 }
@@ -139,8 +170,8 @@ void broadcaster::stop()
 
     {
         std::lock_guard lock(client_mutex_);
-        for (SOCKET client : client_sockets_)
-            closesocket(client);
+        for (const client& client : clients_)
+            closesocket(client.socket);
     }
     
     if (server_ != INVALID_SOCKET)
@@ -10,6 +10,8 @@
 
 #include <nlohmann/json.hpp>
 
+#include "PacketCodec.h"
+
 class broadcaster
 {
 
@@ -22,21 +24,36 @@ public:
 	void stop();
 
 private:
+	struct client
+	{
+		SOCKET socket;
+		wire_format format;
+	};
+
+	// The same message, encoded in every format requested by at least one client
+	struct encoded_message
+	{
+		std::string json;
+		std::string binary;
+	};
+
 	void accept_clients();
 	void broadcast_loop();
-	void enqueue_message(std::string&& msg);
+	void enqueue_message(encoded_message&& msg);
+	bool has_clients(wire_format format);
+	static wire_format read_hello(SOCKET socket);
 
 	bool running_ = false;
 
 	SOCKET server_ = INVALID_SOCKET;
 
-	std::vector<SOCKET> client_sockets_;
+	std::vector<client> clients_;
 	std::mutex client_mutex_;
 
 	std::thread accept_thread_;
 	std::thread broadcast_thread_;
 
-	std::queue<std::string> message_queue_;
+	std::queue<encoded_message> message_queue_;
 	std::mutex queue_mutex_;
 	std::condition_variable queue_cv_;
 };
@@ -44,8 +61,16 @@ private:
 template<typename T>
 void broadcaster::broadcast(const T& obj)
 {
-	nlohmann::json j = obj;
-	std::string message = j.dump();
+	encoded_message message;
+
+	if (has_clients(wire_format::json))
+	{
+		nlohmann::json j = obj;
+		message.json = j.dump();
+	}
+
+	if (has_clients(wire_format::binary))
+		message.binary = packet_codec::encode_binary(obj);
 
 	enqueue_message(std::move(message));
 }
@@ -0,0 +1,121 @@
+#pragma once
+
+#include <cstdint>
+#include <cstring>
+#include <string>
+
+#include "GameTickPacket.h"
+
+// Binary wire format of the game tick packets. It must match rocket_league/mod/packet_codec.py.
+// All values are little-endian. The payload layout is:
+// header | team scores (int32) | ball physics (12 float) | cars (52 bytes each) | boost pads bitfield
+
+enum class wire_format : uint8_t
+{
+	json = 0,
+	binary = 1,
+};
+
+namespace packet_codec
+{
+	constexpr char hello_magic[4] = { 'G', 'P', 'R', 'L' };
+	constexpr size_t hello_size = 6; // magic, wire format, binary version
+
+	constexpr uint8_t binary_magic = 0xB1;
+	constexpr uint8_t binary_version = 1;
+
+	constexpr uint8_t flag_is_demolished = 1 << 0;
+	constexpr uint8_t flag_has_wheel_contact = 1 << 1;
+	constexpr uint8_t flag_is_bot = 1 << 2;
+	constexpr uint8_t flag_jumped = 1 << 3;
+	constexpr uint8_t flag_double_jumped = 1 << 4;
+
+	// Returns true if the hello is valid, storing the requested format in out
+	inline bool decode_hello(const char* data, const size_t size, wire_format& out)
+	{
+		if (size != hello_size || std::memcmp(data, hello_magic, sizeof(hello_magic)) != 0)
+			return false;
+
+		const auto format = static_cast<uint8_t>(data[4]);
+		const auto version = static_cast<uint8_t>(data[5]);
+
+		if (version != binary_version || format > static_cast<uint8_t>(wire_format::binary))
+			return false;
+
+		out = static_cast<wire_format>(format);
+		return true;
+	}
+
+	template<typename T>
+	void write(std::string& out, const T value)
+	{
+		out.append(reinterpret_cast<const char*>(&value), sizeof(T));
+	}
+
+	inline void write_physics(std::string& out, const Physics& physics)
+	{
+		write<float>(out, physics.location.X);
+		write<float>(out, physics.location.Y);
+		write<float>(out, physics.location.Z);
+		write<float>(out, static_cast<float>(physics.rotation.Pitch));
+		write<float>(out, static_cast<float>(physics.rotation.Yaw));
+		write<float>(out, static_cast<float>(physics.rotation.Roll));
+		write<float>(out, physics.velocity.X);
+		write<float>(out, physics.velocity.Y);
+		write<float>(out, physics.velocity.Z);
+		write<float>(out, physics.angular_velocity.X);
+		write<float>(out, physics.angular_velocity.Y);
+		write<float>(out, physics.angular_velocity.Z);
+	}
+
+	inline std::string encode_binary(const GameTickPacket& packet)
+	{
+		std::string out;
+		out.reserve(12 + 4 * packet.num_teams + 48 + 52 * packet.num_cars + (packet.num_boost + 7) / 8);
+
+		// Header
+		write<uint8_t>(out, binary_magic);
+		write<uint8_t>(out, binary_version);
+		write<uint8_t>(out, packet.focus);
+		write<int8_t>(out, static_cast<int8_t>(packet.local_car_index));
+		write<uint8_t>(out, static_cast<uint8_t>(packet.num_cars));
+		write<uint8_t>(out, static_cast<uint8_t>(packet.num_boost));
+		write<uint8_t>(out, static_cast<uint8_t>(packet.num_teams));
+		write<uint8_t>(out, 0); // padding
+		write<float>(out, packet.game_info.seconds_elapsed);
+
+		for (const TeamInfo& team : packet.teams)
+			write<int32_t>(out, team.score);
+
+		write_physics(out, packet.game_ball.physics);
+
+		for (const PlayerInfo& car : packet.game_cars)
+		{
+			write_physics(out, car.physics);
+			write<uint8_t>(out, static_cast<uint8_t>(car.team));
+			write<uint8_t>(out,
+				(car.is_demolished ? flag_is_demolished : 0) |
+				(car.has_wheel_contact ? flag_has_wheel_contact : 0) |
+				(car.is_bot ? flag_is_bot : 0) |
+				(car.jumped ? flag_jumped : 0) |
+				(car.double_jumped ? flag_double_jumped : 0));
+			write<uint8_t>(out, static_cast<uint8_t>(car.boost));
+			write<uint8_t>(out, 0); // padding
+		}
+
+		uint8_t bits = 0;
+		for (int i = 0; i < packet.num_boost; i++)
+		{
+			if (packet.game_boosts[i].is_active)
+				bits |= 1 << (i % 8);
+
+			if (i % 8 == 7 || i == packet.num_boost - 1)
+			{
+				write<uint8_t>(out, bits);
+				bits = 0;
+			}
+		}
+
+		return out;
+	}
+}
@@ -0,0 +1,54 @@
+"""
+Replays a session recorded with main.py --record, arbitrating it again with the given configuration files, as fast
+as possible. The assistance configuration can differ from the recorded one (policies, roles, confidence levels).
+
+    python replay.py -gc ./configs/game.toml -agc ./configs/agents.toml -asc ./configs/assistance.toml session.rec
+"""
+
+import argparse
+import logging
+import sys
+
+from gamepals.command_arbitrators import ReplayEngine
+from gamepals.utils import ArgParser
+
+from main import create_conversion_manager
+
+
+class ReplayArgParser(ArgParser):
+    def _add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("recording", type=str, help="The recorded session")
+        parser.add_argument(
+            "--arbitration-rate",
+            type=float,
+            default=None,
+            help="Arbitrate the inputs at this fixed rate (Hz) instead of one at a time",
+        )
+        parser.add_argument(
+            "--config-confidences",
+            action="store_true",
+            help="Use the humans' confidence levels of the assistance configuration instead of the recorded ones",
+        )
+
+
+def main(arg_parser: ReplayArgParser) -> None:
+    logging.basicConfig(stream=sys.stdout, level=logging.WARNING)
+
+    arg_parser.init_config_handler()
+
+    engine = ReplayEngine(
+        create_conversion_manager(),
+        tick_rate=arg_parser.args.arbitration_rate,
+        use_recorded_confidences=not arg_parser.args.config_confidences,
+    )
+    stats = engine.run(arg_parser.args.recording)
+
+    print(
+        f"Replayed {stats.recorded_seconds:.1f} s in {stats.replay_seconds:.2f} s ({stats.speedup:.0f}x): "
+        f"{stats.inputs} inputs ({stats.dropped_inputs} dropped), {stats.messages} messages, "
+        f"{stats.game_packets} game packets, {stats.batches} arbitrations, {stats.reports} controller reports"
+    )
+
+
+if __name__ == "__main__":
+    main(ReplayArgParser())
@@ -1,3 +1,4 @@
+from .base_copilot import BaseCopilot
 from .boost_copilot import BoostCopilot, NextoBoostCopilot
 from .game_action import RLGameAction
 from .handbrake_copilot import HandbrakeCopilot, NextoHandbrakeCopilot
@@ -6,6 +7,7 @@ from .movement_copilot import MovementCopilot, NextoMovementCopilot
 from .throttle_copilot import NextoThrottleCopilot, ThrottleCopilot
 
 __all__ = [
+    "BaseCopilot",
     "BoostCopilot",
     "HandbrakeCopilot",
     "JumpCopilot",
@@ -8,11 +8,12 @@ from gamepals.agents.actions import ActionInputWithConfidence, GameAction
 from gamepals.agents.observer import ActorData, MessageData
 from gamepals.sources.controller import ControllerInput
 from gamepals.sources.game import GameState
+from gamepals.utils.logging import TraceStage
 
 from ..mod import GameStateType, RLGameState, RLGameStateListener
 from .game_action import RLGameAction
 from .models import AbstractModel
-from .observation import ObsBuilder
+from .observation import ObsBuilder, ObsCache
 
 
 class ModelAction(Enum):
@@ -56,12 +57,16 @@ MODEL_ACTION_TO_GAME_ACTION_IN_AIR: dict[ModelAction, GameAction] = {
 
 
 class BaseCopilot(SWAgentActor, ABC):
+    # Shared by all the copilots, so that those using the same kind of ObsBuilder build the observation once per tick
+    obs_cache = ObsCache()
+
     def __init__(
         self, game_state_listener: RLGameStateListener, model: AbstractModel, **kwargs
     ):
         super().__init__(game_state_listener, **kwargs)
         self.model = model
         self.rl_game_state_listener = game_state_listener
+        self._notified_game_state: RLGameState | None = None
 
         self.managed_actions = list()
         for game_action in self.get_controlled_actions():
@@ -109,6 +114,9 @@ class BaseCopilot(SWAgentActor, ABC):
 
     @property
     def rl_game_state(self) -> RLGameState:
+        """The last Game State the copilot was notified of, which the listener doesn't overwrite while it's in use"""
+        if self._notified_game_state is not None:
+            return self._notified_game_state
         return self.rl_game_state_listener.game_state
 
     def __parse_model_action(self, model_action: ModelAction) -> GameAction | None:
@@ -145,6 +153,8 @@ class BaseCopilot(SWAgentActor, ABC):
 
     def compute_actions(self, game_state: GameState) -> list[ActionInputWithConfidence]:
         """Produces a list of action inputs given a Game State. Inputs are executed one after another, with no delay"""
+        if isinstance(game_state, RLGameState):
+            self._notified_game_state = game_state
 
         handler = self.state_handlers.get(self.rl_game_state.type, None)
         if handler is not None:
@@ -160,14 +170,19 @@ class BaseCopilot(SWAgentActor, ABC):
         return list()
 
     def _on_game_state(self) -> list[ActionInputWithConfidence]:
-        obs = self.obs_builder.build_obs(
+        obs = self.obs_cache.build_obs(
+            self.obs_builder,
             self.rl_game_state.local_player,
             self.rl_game_state,
             self.current_action[self.non_managed_actions_indexes],
             self.previous_action,
         )
+        if self.trace is not None:
+            self.trace.mark(TraceStage.OBSERVATION)
 
         action, weight = self.model.act(obs)
+        if self.trace is not None:
+            self.trace.mark(TraceStage.INFERENCE)
 
         for action_index, action_type in enumerate(self.managed_actions):
             if action_type.value < 5:  # Movement actions
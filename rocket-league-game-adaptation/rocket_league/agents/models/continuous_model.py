@@ -8,8 +8,9 @@ from .policy import Policy
 
 
 class ContinuousModel(Model):
+    @classmethod
     def _get_policy(
-        self,
+        cls,
         obs_size: int,
         action_space_size: int,
         policy_layer_sizes: list[int] = POLICY_LAYER_SIZES,
@@ -30,4 +31,4 @@ class ContinuousModel(Model):
     ) -> tuple[npt.NDArray[np.float32], float]:
         action, weight = super()._parse_action(action, weight)
 
-        return action.cpu().numpy(), weight
+        return torch.as_tensor(action).cpu().numpy(), weight
@@ -131,6 +131,17 @@ class ContinuousPolicy(Policy):
 
         return action.cpu(), log_prob.cpu()
 
+    def get_deterministic_actions(self, obs: Any):
+        """
+        Function to get the mean action for a batch of observations.
+        :param obs: Batch of observations, one per row.
+        :return: The mean action of each row and its summed log probability.
+        """
+        mean, std = self.get_output(obs)
+        log_prob = self.logpdf(mean, mean, std).sum(dim=-1)
+
+        return mean.cpu(), log_prob.cpu()
+
     def get_backprop_data(self, obs, acts, summed_probs=True):
         """
         Function to compute the data necessary for backpropagation.
@@ -19,8 +19,9 @@ class DiscreteModel(Model):
 
         self.__lookup_table = lookup_table
 
+    @classmethod
     def _get_policy(
-        self,
+        cls,
         obs_size: int,
         action_space_size: int,
         policy_layer_sizes: list[int] = POLICY_LAYER_SIZES,
@@ -69,6 +69,21 @@ class DiscretePolicy(Policy):
 
         return action.flatten().cpu(), log_prob.flatten().cpu()
 
+    def get_deterministic_actions(self, obs: Any):
+        """
+        Function to get the most probable action for a batch of observations.
+        :param obs: Batch of observations, one per row.
+        :return: The index of the chosen action of each row and its probability.
+        """
+
+        probs = self.get_output(obs)
+        probs = probs.view(-1, self.n_actions)
+        probs = torch.clamp(probs, min=1e-11, max=1)
+
+        probs_np = probs.cpu().numpy()
+        argmax_indexes = probs_np.argmax(axis=-1)
+        return argmax_indexes, probs_np[np.arange(len(probs_np)), argmax_indexes]
+
     def get_backprop_data(self, obs, acts):
         """
         Function to compute the data necessary for backpropagation.
@@ -0,0 +1,102 @@
+import threading as th
+from typing import Any
+
+import numpy as np
+import torch
+
+from .policy import Policy
+
+
+class InferenceRequest:
+    def __init__(self, obs: Any) -> None:
+        self.obs = obs
+        self.action: Any = None
+        self.weight: Any = None
+        self.error: BaseException | None = None
+        self.done = False
+
+
+class InferenceEngine:
+    """
+    InferenceEngine runs a Policy for all the Models sharing it, batching the observations submitted concurrently.
+
+    The first submitter of a batch becomes its leader: it stacks the observations pending into a single tensor,
+    runs one forward pass and hands each submitter its row. Observations submitted while a batch is running are
+    collected by the next leader. A submitter never waits for the others to submit, so the copilots notified one
+    after another by the game state listener each run their own forward pass, without added latency.
+    """
+
+    def __init__(self, policy: Policy) -> None:
+        self.policy = policy
+        self.participants = 0
+
+        self.requests = 0
+        self.batches = 0
+
+        self.__pending: list[InferenceRequest] = list()
+        self.__running = False
+        self.__condition = th.Condition()
+
+    def register(self) -> int:
+        """Registers a new participant, returning its id"""
+        with self.__condition:
+            self.participants += 1
+            return self.participants - 1
+
+    def infer(self, obs: Any, client: int = 0) -> tuple[Any, Any]:
+        """Returns the deterministic action of the policy for the observation, with its weight. Any client can submit"""
+        request = InferenceRequest(obs)
+
+        with self.__condition:
+            self.__pending.append(request)
+            self.requests += 1
+            self.__condition.notify_all()
+
+            while not request.done:
+                if not self.__running and self.__pending[0] is request:
+                    batch = self.__collect_batch()
+                    break
+                self.__condition.wait()
+            else:
+                return self.__result(request)
+
+        self.__run(batch)
+        return self.__result(request)
+
+    def __collect_batch(self) -> list[InferenceRequest]:
+        """Called by the leader while holding the condition lock"""
+        self.__running = True
+        batch = self.__pending
+        self.__pending = list()
+        return batch
+
+    def __run(self, batch: list[InferenceRequest]) -> None:
+        try:
+            obs = torch.as_tensor(
+                np.stack([np.asarray(r.obs) for r in batch]),
+                dtype=torch.float32,
+                device=self.policy.device,
+            )
+            with torch.no_grad():
+                actions, weights = self.policy.get_deterministic_actions(obs)
+
+            for i, request in enumerate(batch):
+                request.action = actions[i]
+                request.weight = weights[i]
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+            raise
+        finally:
+            with self.__condition:
+                for request in batch:
+                    request.done = True
+                self.batches += 1
+                self.__running = False
+                self.__condition.notify_all()
+
+    @staticmethod
+    def __result(request: InferenceRequest) -> tuple[Any, Any]:
+        if request.error is not None:
+            raise RuntimeError("Batched inference failed") from request.error
+        return request.action, request.weight
@@ -1,4 +1,5 @@
 import os
+import threading as th
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -6,6 +7,8 @@ import numpy as np
 import numpy.typing as npt
 import torch
 
+from .inference_engine import InferenceEngine
+from .model_host import ModelHost
 from .policy import Policy
 
 POLICY_LAYER_SIZES = [2048, 2048, 1024, 1024]
@@ -19,30 +22,88 @@ class AbstractModel(ABC):
 
 
 class Model(AbstractModel):
+    # Models with the same policy share its weights and its InferenceEngine (or ModelHost)
+    _engines: dict[tuple[type, str, int, int], InferenceEngine | ModelHost] = dict()
+    _engines_lock = th.Lock()
+
+    # Options of the ModelHosts, if the policies are run out of process
+    _host_options: dict[str, Any] | None = None
+
     def __init__(
         self,
         policy_name: str,
         obs_size: int,
         action_space_size: int,
     ):
+        self.policy_name = policy_name
+
+        key = (type(self), policy_name, obs_size, action_space_size)
+        with Model._engines_lock:
+            engine = Model._engines.get(key, None)
+            if engine is None:
+                engine = self._make_engine(policy_name, obs_size, action_space_size)
+                Model._engines[key] = engine
+
+        self.client = engine.register()
+        self.engine = engine
+        self.policy = engine.policy
+
+    def _make_engine(
+        self, policy_name: str, obs_size: int, action_space_size: int
+    ) -> InferenceEngine | ModelHost:
+        if Model._host_options is not None:
+            return ModelHost(
+                type(self),
+                policy_name,
+                obs_size,
+                action_space_size,
+                **Model._host_options,
+            )
+
+        policy = self._load_policy(policy_name, obs_size, action_space_size)
+        # In process, inference shares the CPU with the listeners and the arbitrator (see use_model_hosts)
+        torch.set_num_threads(1)
+        return InferenceEngine(policy)
+
+    @staticmethod
+    def use_model_hosts(num_threads: int = ModelHost.DEFAULT_NUM_THREADS) -> None:
+        """
+        Makes the Models created from now on run their policies in worker processes, one for each policy.
+
+        Args:
+            num_threads (int, optional): The number of threads torch uses in each worker process.
+        """
+        Model._host_options = {"num_threads": num_threads}
+
+    @staticmethod
+    def close_engines() -> None:
+        """Stops the worker processes of the ModelHosts"""
+        with Model._engines_lock:
+            for engine in Model._engines.values():
+                if isinstance(engine, ModelHost):
+                    engine.close()
+            Model._engines.clear()
+
+    @classmethod
+    def _load_policy(
+        cls, policy_name: str, obs_size: int, action_space_size: int
+    ) -> Policy:
         cur_dir = os.path.dirname(os.path.realpath(__file__))
         device = DEFAULT_DEVICE
 
-        self.policy_name = policy_name
-
         with open(os.path.join(cur_dir, f"policies/{policy_name}.pt"), "rb") as f:
-            policy = torch.load(f, map_location=device)
+            state_dict = torch.load(f, map_location=device)
 
-        self.policy = self._get_policy(
+        policy = cls._get_policy(
             obs_size, action_space_size, POLICY_LAYER_SIZES, device
         )
-        self.policy.load_state_dict(policy)
-
-        torch.set_num_threads(1)
+        policy.load_state_dict(state_dict)
+        return policy
 
+    @classmethod
     @abstractmethod
     def _get_policy(
-        self,
+        cls,
         obs_size: int,
         action_space_size: int,
         policy_layer_sizes: list[int] = POLICY_LAYER_SIZES,
@@ -51,9 +112,7 @@ class Model(AbstractModel):
         pass
 
     def act(self, state: Any) -> tuple[npt.NDArray[np.float32], float]:
-        with torch.no_grad():
-            action, weight = self.policy.get_action(state, deterministic=True)
-
+        action, weight = self.engine.infer(state, self.client)
         return self._parse_action(action, weight)
 
     def _parse_action(
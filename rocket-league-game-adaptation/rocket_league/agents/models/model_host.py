@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import threading as th
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Semaphore
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from .model import Model
+
+logger = logging.getLogger(__name__)
+
+
+class ShmRingBuffer:
+    """
+    ShmRingBuffer is a single producer, single consumer queue of fixed size float32 records, stored in a
+    shared memory buffer so that it can be used across processes.
+
+    The head and tail counters live in the buffer too, followed by the records. A semaphore counts the
+    records available to the consumer. The producer must not put more records than the capacity.
+    """
+
+    HEADER_SIZE = 16  # bytes, head and tail counters
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        offset: int,
+        record_size: int,
+        capacity: int,
+        items: Semaphore,
+    ) -> None:
+        self.record_size = record_size
+        self.capacity = capacity
+        self.__items = items
+
+        self.__counters = np.ndarray((2,), np.int64, buffer, offset)
+        self.__records = np.ndarray(
+            (capacity, record_size), np.float32, buffer, offset + self.HEADER_SIZE
+        )
+
+    @staticmethod
+    def nbytes(record_size: int, capacity: int) -> int:
+        return ShmRingBuffer.HEADER_SIZE + record_size * capacity * 4
+
+    def put(self, record: npt.NDArray[np.float32]) -> None:
+        """Appends a record. Only the producer can call it"""
+        head, tail = self.__counters
+        if head - tail >= self.capacity:
+            raise RuntimeError("Ring buffer is full")
+
+        self.__records[head % self.capacity] = record
+        self.__counters[0] = head + 1
+        self.__items.release()
+
+    def get(
+        self, out: npt.NDArray[np.float32], block: bool = True, timeout: float | None = None
+    ) -> bool:
+        """Pops the oldest record into out. Only the consumer can call it. Returns False if no record was available"""
+        if not self.__items.acquire(block, timeout):
+            return False
+
+        tail = self.__counters[1]
+        out[:] = self.__records[tail % self.capacity]
+        self.__counters[1] = tail + 1
+        return True
+
+
+class ModelHost:
+    """
+    ModelHost runs the Policy of a Model in a worker process, so that inference doesn't compete for the GIL with
+    the rest of the system (listeners, arbitrator and logger threads). It has the same interface as InferenceEngine.
+
+    Observations are sent to the worker through a shared memory ring buffer, tagged with the id of the client
+    that submitted them, and the actions are sent back through a ring buffer for each client. The worker runs the
+    observations it finds queued together in a single batch.
+    The worker process is started with "spawn", so torch is only initialized in it. It runs on CPU.
+    """
+
+    MAX_CLIENTS = 16
+    DEFAULT_NUM_THREADS = 1
+    POLL_INTERVAL = 1.0  # seconds, how often waiting clients check that the worker is alive
+
+    # Request records: [client, obs...]. Response records: [ndim, is_integer, size, action..., weight]
+    RESPONSE_HEADER_SIZE = 3
+    STOP = -1  # client of the request that stops the worker
+    ERROR = -1  # ndim of the response to a failed inference
+
+    def __init__(
+        self,
+        model_type: type[Model],
+        policy_name: str,
+        obs_size: int,
+        action_space_size: int,
+        num_threads: int = DEFAULT_NUM_THREADS,
+    ) -> None:
+        """
+        Args:
+            model_type (type[Model]): The Model class, used by the worker to load the Policy.
+            num_threads (int, optional): The number of threads torch uses in the worker process.
+        """
+        self.policy = None
+        self.participants = 0
+        self.requests = 0
+
+        request_size, response_size = _record_sizes(obs_size, action_space_size)
+        layout = _layout(request_size, response_size)
+        self.__shm = SharedMemory(create=True, size=layout[-1][0])
+
+        ctx = mp.get_context("spawn")
+        semaphores = [ctx.Semaphore(0) for _ in range(self.MAX_CLIENTS + 1)]
+        self.__requests, *self.__responses = [
+            ShmRingBuffer(self.__shm.buf, offset, size, capacity, semaphore)
+            for (offset, size, capacity), semaphore in zip(layout, semaphores)
+        ]
+
+        self.__request = np.zeros(request_size, np.float32)
+        self.__request_lock = th.Lock()
+        self.__client_buffers: list[npt.NDArray[np.float32]] = list()
+        self.__client_locks: list[th.Lock] = list()
+        self.__lock = th.Lock()
+
+        self.process = ctx.Process(
+            target=_serve,
+            args=(
+                model_type,
+                policy_name,
+                obs_size,
+                action_space_size,
+                num_threads,
+                self.__shm.name,
+                semaphores,
+            ),
+            name=f"ModelHost-{policy_name}",
+            daemon=True,
+        )
+        self.process.start()
+        logger.info(f"Started model host for {policy_name} (pid {self.process.pid})")
+
+    def register(self) -> int:
+        """Registers a new client, returning its id"""
+        with self.__lock:
+            if self.participants >= self.MAX_CLIENTS:
+                raise RuntimeError(
+                    f"A model host can serve at most {self.MAX_CLIENTS} models"
+                )
+            client = self.participants
+            self.participants += 1
+
+            self.__client_buffers.append(
+                np.zeros(self.__responses[client].record_size, np.float32)
+            )
+            self.__client_locks.append(th.Lock())
+            return client
+
+    def infer(self, obs: Any, client: int = 0) -> tuple[Any, Any]:
+        """Returns the deterministic action of the policy for the observation, with its weight"""
+        response = self.__client_buffers[client]
+
+        with self.__client_locks[client]:
+            with self.__request_lock:
+                self.__request[0] = client
+                self.__request[1:] = np.asarray(obs, np.float32).reshape(-1)
+                self.__requests.put(self.__request)
+                self.requests += 1
+
+            while not self.__responses[client].get(response, timeout=self.POLL_INTERVAL):
+                if not self.process.is_alive():
+                    raise RuntimeError(
+                        f"Model host process exited with code {self.process.exitcode}"
+                    )
+
+            return ModelHost.__parse_response(response)
+
+    @staticmethod
+    def __parse_response(response: npt.NDArray[np.float32]) -> tuple[Any, Any]:
+        ndim, is_integer, size = response[: ModelHost.RESPONSE_HEADER_SIZE].astype(int)
+        if ndim == ModelHost.ERROR:
+            raise RuntimeError("Inference failed in the model host process")
+
+        values = response[ModelHost.RESPONSE_HEADER_SIZE :][:size]
+        action = values.astype(np.int64) if is_integer else values.copy()
+        if ndim == 0:
+            action = action[0]
+        return action, response[-1]
+
+    def close(self) -> None:
+        """Stops the worker process and releases the shared memory"""
+        if self.process.is_alive():
+            with self.__request_lock:
+                self.__request[0] = ModelHost.STOP
+                self.__requests.put(self.__request)
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.kill()
+
+        self.__shm.close()
+        self.__shm.unlink()
+
+
+def _serve(
+    model_type: type[Model],
+    policy_name: str,
+    obs_size: int,
+    action_space_size: int,
+    num_threads: int,
+    shm_name: str,
+    semaphores: list[Semaphore],
+) -> None:
+    """Entry point of the ModelHost worker process"""
+    import torch
+
+    torch.set_num_threads(num_threads)
+    policy = model_type._load_policy(policy_name, obs_size, action_space_size)
+
+    request_size, response_size = _record_sizes(obs_size, action_space_size)
+    layout = _layout(request_size, response_size)
+
+    shm = SharedMemory(name=shm_name)
+    requests, *responses = [
+        ShmRingBuffer(shm.buf, offset, size, capacity, semaphore)
+        for (offset, size, capacity), semaphore in zip(layout, semaphores)
+    ]
+
+    batch = np.zeros((requests.capacity, request_size), np.float32)
+    response = np.zeros(response_size, np.float32)
+
+    parent = mp.parent_process()
+    running = True
+    while running:
+        # Waits for the first request, then takes all the ones already queued
+        n = 0
+        while requests.get(batch[n], block=n == 0, timeout=ModelHost.POLL_INTERVAL):
+            n += 1
+            if n == len(batch):
+                break
+
+        if n == 0:
+            running = parent is None or parent.is_alive()
+            continue
+
+        requested = batch[:n][batch[:n, 0] != ModelHost.STOP]
+        running = len(requested) == n
+        if len(requested) == 0:
+            continue
+        clients = requested[:, 0].astype(int)
+
+        try:
+            obs = torch.as_tensor(requested[:, 1:], device=policy.device)
+            with torch.no_grad():
+                actions, weights = policy.get_deterministic_actions(obs)
+            actions = np.asarray(actions)
+            weights = np.asarray(weights)
+        except Exception:
+            logger.exception(f"Inference failed in the model host for {policy_name}")
+            response[0] = ModelHost.ERROR
+            for client in clients:
+                responses[client].put(response)
+            continue
+
+        for i, client in enumerate(clients):
+            action = actions[i]
+            response[0] = action.ndim
+            response[1] = np.issubdtype(action.dtype, np.integer)
+            response[2] = action.size
+            response[ModelHost.RESPONSE_HEADER_SIZE :][: action.size] = action.reshape(-1)
+            response[-1] = weights[i]
+            responses[client].put(response)
+
+    shm.close()
+
+
+def _record_sizes(obs_size: int, action_space_size: int) -> tuple[int, int]:
+    return 1 + obs_size, ModelHost.RESPONSE_HEADER_SIZE + action_space_size + 1
+
+
+def _layout(request_size: int, response_size: int) -> list[tuple[int, int, int]]:
+    """(offset, record size, capacity) of the request ring and of the response rings, followed by the total size"""
+    rings = [(request_size, ModelHost.MAX_CLIENTS + 1)]  # one more slot for STOP
+    rings += [(response_size, 1)] * ModelHost.MAX_CLIENTS
+
+    layout = list()
+    offset = 0
+    for size, capacity in rings:
+        layout.append((offset, size, capacity))
+        offset += ShmRingBuffer.nbytes(size, capacity)
+    layout.append((offset, 0, 0))
+    return layout
@@ -1,5 +1,8 @@
+from __future__ import annotations
+
 import os
-from typing import Any
+import threading as th
+from typing import Any, Optional
 
 import numpy as np
 import numpy.typing as npt
@@ -11,13 +14,7 @@ from .model import AbstractModel
 
 class NextoModel(AbstractModel):
     def __init__(self, managed_actions: list[int] | None = None) -> None:
-        cur_dir = os.path.dirname(os.path.realpath(__file__))
-
-        with open(os.path.join(cur_dir, "policies/nexto-model.pt"), "rb") as f:
-            self.actor = torch.jit.load(f)
-
-        torch.set_num_threads(1)
-        self._lookup_table = self.make_lookup_table()
+        self.service = NextoInferenceService()
         self.state = None
 
         if managed_actions is not None:
@@ -59,6 +56,71 @@ class NextoModel(AbstractModel):
 
     def act(self, state: Any) -> tuple[npt.NDArray[np.float32], float]:
         self.state = state
+        return self.service.infer(state)[self.managed_actions], 1.0
+
+
+class NextoInferenceService:
+    """
+    NextoInferenceService runs the Nexto network on behalf of all the NextoModels, each keeping only the
+    actions it manages.
+
+    The TorchScript module is loaded once. The results of the latest tick are memoized: the copilots of the same
+    player receive the same base observation arrays from the ObsCache, so the network runs once per tick per player
+    (as long as their previous actions, which are part of the query, are the same).
+
+    It implements a Singleton pattern.
+    """
+
+    _instance: Optional[NextoInferenceService] = None
+
+    def __new__(cls) -> NextoInferenceService:
+        if cls._instance is None:
+            cls._instance = super(NextoInferenceService, cls).__new__(cls)
+            cls._instance._load()
+        return cls._instance
+
+    def _load(self) -> None:
+        cur_dir = os.path.dirname(os.path.realpath(__file__))
+
+        with open(os.path.join(cur_dir, "policies/nexto-model.pt"), "rb") as f:
+            self.actor = torch.jit.load(f)
+
+        torch.set_num_threads(1)
+        self._lookup_table = NextoModel.make_lookup_table()
+
+        self.requests = 0
+        self.forward_passes = 0
+
+        self.__base_obs: tuple[Any, Any] | None = None
+        self.__results: dict[bytes, npt.NDArray[np.float32]] = dict()
+        self.__lock = th.Lock()
+
+    def infer(self, state: Any) -> npt.NDArray[np.float32]:
+        """Returns the lookup table row (all the 8 actions) chosen for the given observation"""
+        q, kv, m = state
+
+        with self.__lock:
+            self.requests += 1
+
+            # A new base observation means a new tick (or player): older results can't be reused
+            if (
+                self.__base_obs is None
+                or self.__base_obs[0] is not kv
+                or self.__base_obs[1] is not m
+            ):
+                self.__base_obs = (kv, m)
+                self.__results.clear()
+
+            key = q.tobytes()
+            result = self.__results.get(key, None)
+            if result is None:
+                result = self.__forward(state)
+                self.__results[key] = result
+                self.forward_passes += 1
+
+        return result
+
+    def __forward(self, state: Any) -> npt.NDArray[np.float32]:
         state = tuple(torch.from_numpy(s).float() for s in state)
 
         with torch.no_grad():
@@ -81,6 +143,4 @@ class NextoModel(AbstractModel):
         )
 
         actions = np.argmax(logits, axis=-1)
-        parsed = self._lookup_table[actions.numpy().item()]
-
-        return parsed[self.managed_actions], 1.0
+        return self._lookup_table[actions.numpy().item()]
@@ -17,3 +17,12 @@ class Policy(ABC, nn.Module):
         :return: An action and its probability.
         """
         pass
+
+    @abstractmethod
+    def get_deterministic_actions(self, obs: Any):
+        """
+        Function to get the deterministic actions for a batch of observations, along with their weights.
+        :param obs: Batch of observations, one per row.
+        :return: The actions and their weights, one per row.
+        """
+        pass
@@ -1,5 +1,6 @@
 from .advanced_obs_builder import AdvancedObsBuilder
 from .nexto_obs_builder import NextoObsBuilder
 from .obs_builder import ObsBuilder
+from .obs_cache import ObsCache
 
-__all__ = ["AdvancedObsBuilder", "NextoObsBuilder", "ObsBuilder"]
+__all__ = ["AdvancedObsBuilder", "NextoObsBuilder", "ObsBuilder", "ObsCache"]
@@ -15,13 +15,12 @@ class AdvancedObsBuilder(ObsBuilder):
     )
     ANG_STD = math.pi
 
-    def build_obs(
-        self,
-        player_state: PlayerData,
-        game_state: RLGameState,
-        non_managed_inputs: npt.NDArray[np.float32],
-        previous_action: npt.NDArray[np.float32],
-    ) -> Any:
+    # Position of the previous action in the observation
+    PREVIOUS_ACTION = slice(9, 9 + common_values.NUM_ACTIONS)
+
+    def build_base_obs(
+        self, player_state: PlayerData, game_state: RLGameState
+    ) -> npt.NDArray[np.float32]:
 
         if player_state.team_num == common_values.ORANGE_TEAM:
             inverted = True
@@ -36,7 +35,7 @@ class AdvancedObsBuilder(ObsBuilder):
             ball.position / self.POS_STD,
             ball.linear_velocity / self.POS_STD,
             ball.angular_velocity / self.ANG_STD,
-            previous_action,
+            np.zeros(common_values.NUM_ACTIONS),  # Previous action, see add_actions
             pads,
         ]
 
@@ -67,10 +66,19 @@ class AdvancedObsBuilder(ObsBuilder):
 
         obs.extend(allies)
         obs.extend(enemies)
-        obs.append(non_managed_inputs)
 
         return np.concatenate(obs)
 
+    def add_actions(
+        self,
+        base_obs: npt.NDArray[np.float32],
+        non_managed_inputs: npt.NDArray[np.float32],
+        previous_action: npt.NDArray[np.float32],
+    ) -> npt.NDArray[np.float32]:
+        obs = np.concatenate((base_obs, non_managed_inputs))
+        obs[self.PREVIOUS_ACTION] = previous_action
+        return obs
+
     def _add_player_to_obs(
         self, obs: List, player: PlayerData, ball: PhysicsObject, inverted: bool
     ):
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Hashable
 
 import numpy as np
 import numpy.typing as npt
@@ -105,22 +105,39 @@ class NextoObsBuilder(ObsBuilder):
         self._boost_locations = np.array(common_values.BOOST_LOCATIONS)
         self._boost_types = self._boost_locations[:, 2] > 72
 
-    def build_obs(
-        self,
-        player_state: PlayerData,
-        game_state: RLGameState,
-        player_input: npt.NDArray[np.float32],
-        previous_action: npt.NDArray[np.float32],
-    ) -> Any:
+    def build_base_obs(
+        self, player_state: PlayerData, game_state: RLGameState
+    ) -> tuple[
+        npt.NDArray[np.float32], npt.NDArray[np.float32], npt.NDArray[np.float32]
+    ]:
         current_obs = self.batched_build_obs(
             np.expand_dims(encode_gamestate(game_state), axis=0)
         )
 
         for i, p in enumerate(game_state.players):
             if p == player_state:
-                self.add_actions(current_obs, previous_action, i)
                 return current_obs[i]
 
+        raise ValueError(f"Player {player_state.car_id} is not in the game state")
+
+    def add_actions(
+        self,
+        base_obs: tuple[
+            npt.NDArray[np.float32], npt.NDArray[np.float32], npt.NDArray[np.float32]
+        ],
+        player_input: npt.NDArray[np.float32],
+        previous_action: npt.NDArray[np.float32],
+    ) -> tuple[
+        npt.NDArray[np.float32], npt.NDArray[np.float32], npt.NDArray[np.float32]
+    ]:
+        q, kv, m = base_obs
+        q = q.copy()  # Keys, values and mask are shared, only the query contains the actions
+        q[:, 0, ACTIONS] = previous_action
+        return q, kv, m
+
+    def cache_key(self) -> Hashable:
+        return type(self), self.n_players
+
     @staticmethod
     def _quats_to_rot_mtx(quats: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
         # From rlgym.utils.math.quat_to_rot_mtx
@@ -257,9 +274,3 @@ class NextoObsBuilder(ObsBuilder):
         m[:, :, n_players:lim_players] = 1
 
         return [(q[i], kv[i], m[i]) for i in range(n_players)]
-
-    def add_actions(
-        self, obs: Any, previous_actions: npt.NDArray[np.float32], player_index: int
-    ) -> None:
-        q, _, _ = obs[player_index]
-        q[:, 0, ACTIONS] = previous_actions
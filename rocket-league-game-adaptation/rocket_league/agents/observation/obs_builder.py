@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Hashable
 
 import numpy as np
 import numpy.typing as npt
@@ -8,7 +8,13 @@ from ...mod import PlayerData, RLGameState
 
 
 class ObsBuilder(ABC):
-    @abstractmethod
+    """
+    ObsBuilder builds the observations given to the models.
+
+    An observation is made of a base part, which only depends on the game state and can be shared by all the
+    copilots using the same kind of builder (see ObsCache), and of the copilot actions, added afterwards.
+    """
+
     def build_obs(
         self,
         player_state: PlayerData,
@@ -16,4 +22,25 @@ class ObsBuilder(ABC):
         player_input: npt.NDArray[np.float32],
         previous_action: npt.NDArray[np.float32],
     ) -> Any:
+        return self.add_actions(
+            self.build_base_obs(player_state, game_state), player_input, previous_action
+        )
+
+    @abstractmethod
+    def build_base_obs(self, player_state: PlayerData, game_state: RLGameState) -> Any:
+        """Returns the part of the observation that only depends on the game state"""
         pass
+
+    @abstractmethod
+    def add_actions(
+        self,
+        base_obs: Any,
+        player_input: npt.NDArray[np.float32],
+        previous_action: npt.NDArray[np.float32],
+    ) -> Any:
+        """Returns the complete observation. The base observation must not be modified, as it may be shared"""
+        pass
+
+    def cache_key(self) -> Hashable:
+        """Builders with the same key produce the same base observations"""
+        return type(self)
@@ -0,0 +1,62 @@
+import threading as th
+from typing import Any, Hashable
+
+import numpy as np
+import numpy.typing as npt
+from gamepals.utils.logging import Loggable
+
+from ...mod import PlayerData, RLGameState
+from .obs_builder import ObsBuilder
+
+
+class ObsCache(Loggable):
+    """
+    ObsCache shares the base observations among the copilots during a game tick.
+
+    Base observations are cached by (obs builder cache key, game state tick, player), so copilots using the same
+    kind of builder only build them once per tick. Each copilot then adds its own actions to the cached base.
+    Only the entries of the current tick are kept.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+        self.__tick: tuple[int, int] | None = None
+        self.__entries: dict[tuple[Hashable, int], Any] = dict()
+        self.__lock = th.Lock()
+
+    def build_obs(
+        self,
+        obs_builder: ObsBuilder,
+        player_state: PlayerData,
+        game_state: RLGameState,
+        player_input: npt.NDArray[np.float32],
+        previous_action: npt.NDArray[np.float32],
+    ) -> Any:
+        """Same as ObsBuilder.build_obs, reusing the base observation if it was already built in this tick"""
+        tick = (id(game_state), game_state.tick_id)
+        key = (obs_builder.cache_key(), player_state.car_id)
+
+        with self.__lock:
+            if tick != self.__tick:
+                self.__entries.clear()
+                self.__tick = tick
+
+            base_obs = self.__entries.get(key, None)
+            if base_obs is None:
+                self.misses += 1
+                base_obs = obs_builder.build_base_obs(player_state, game_state)
+                self.__entries[key] = base_obs
+            else:
+                self.hits += 1
+
+        return obs_builder.add_actions(base_obs, player_input, previous_action)
+
+    def get_json(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+        }
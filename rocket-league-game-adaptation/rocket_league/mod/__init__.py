@@ -1,5 +1,6 @@
 from .game_state import GameStateType, PhysicsObject, PlayerData, RLGameState
 from .game_state_listener import RLGameStateListener
+from .packet_codec import BinaryGamePacket, WireFormat
 
 __all__ = [
     "RLGameState",
@@ -7,4 +8,6 @@ __all__ = [
     "PlayerData",
     "PhysicsObject",
     "RLGameStateListener",
+    "BinaryGamePacket",
+    "WireFormat",
 ]
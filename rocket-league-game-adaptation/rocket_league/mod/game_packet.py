@@ -61,6 +61,22 @@ class Physics:
             ),
         )
 
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "location": {"X": self.location.x, "Y": self.location.y, "Z": self.location.z},
+            "rotation": {
+                "Pitch": self.rotation.pitch,
+                "Yaw": self.rotation.yaw,
+                "Roll": self.rotation.roll,
+            },
+            "velocity": {"X": self.velocity.x, "Y": self.velocity.y, "Z": self.velocity.z},
+            "angular_velocity": {
+                "X": self.angular_velocity.x,
+                "Y": self.angular_velocity.y,
+                "Z": self.angular_velocity.z,
+            },
+        }
+
 
 @dataclass
 class PlayerInfo:
@@ -86,6 +102,18 @@ class PlayerInfo:
             boost=json_dict["boost"],
         )
 
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "physics": self.physics.to_json(),
+            "is_demolished": self.is_demolished,
+            "has_wheel_contact": self.has_wheel_contact,
+            "is_bot": self.is_bot,
+            "jumped": self.jumped,
+            "double_jumped": self.double_jumped,
+            "team": self.team,
+            "boost": self.boost,
+        }
+
 
 @dataclass
 class BallInfo:
@@ -95,6 +123,9 @@ class BallInfo:
     def from_json(json_dict: dict[str, Any]) -> "BallInfo":
         return BallInfo(physics=Physics.from_json(json_dict["physics"]))
 
+    def to_json(self) -> dict[str, Any]:
+        return {"physics": self.physics.to_json()}
+
 
 @dataclass
 class BoostPadState:
@@ -104,6 +135,9 @@ class BoostPadState:
     def from_json(json_dict: dict[str, Any]) -> "BoostPadState":
         return BoostPadState(is_active=json_dict["is_active"])
 
+    def to_json(self) -> dict[str, Any]:
+        return {"is_active": self.is_active}
+
 
 @dataclass
 class TeamInfo:
@@ -114,6 +148,9 @@ class TeamInfo:
     def from_json(json_dict: dict[str, Any]) -> "TeamInfo":
         return TeamInfo(team_index=json_dict["team_index"], score=json_dict["score"])
 
+    def to_json(self) -> dict[str, Any]:
+        return {"team_index": self.team_index, "score": self.score}
+
 
 @dataclass
 class GameInfo:
@@ -123,6 +160,9 @@ class GameInfo:
     def from_json(json_dict: dict[str, Any]) -> "GameInfo":
         return GameInfo(seconds_elapsed=json_dict["seconds_elapsed"])
 
+    def to_json(self) -> dict[str, Any]:
+        return {"seconds_elapsed": self.seconds_elapsed}
+
 
 class Focus(StrEnum):
     GAME = "game"
@@ -159,3 +199,21 @@ class GamePacket:
             teams=[TeamInfo.from_json(team) for team in json_dict["teams"]],
             game_info=GameInfo.from_json(json_dict["game_info"]),
         )
+
+    @property
+    def seconds_elapsed(self) -> float:
+        return self.game_info.seconds_elapsed
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "focus": self.focus.value,
+            "local_car_index": self.local_car_index,
+            "num_cars": self.num_cars,
+            "num_boost": self.num_boost,
+            "num_teams": self.num_teams,
+            "game_cars": [car.to_json() for car in self.game_cars],
+            "game_boosts": [boost.to_json() for boost in self.game_boosts],
+            "game_ball": self.game_ball.to_json(),
+            "teams": [team.to_json() for team in self.teams],
+            "game_info": self.game_info.to_json(),
+        }
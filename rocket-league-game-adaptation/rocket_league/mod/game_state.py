@@ -7,54 +7,203 @@ import numpy.typing as npt
 from gamepals.sources.game import GameState
 
 from .. import common_values
-from .game_packet import (Focus, GamePacket, Physics, PlayerInfo, Rotator,
-                          Vector3)
+from . import packet_codec
+from .game_packet import Focus, GamePacket, Physics, Vector3
+from .packet_codec import BinaryGamePacket
 
+INVERT_VEC = np.asarray([-1, -1, 1])
+INVERT_PYR = np.asarray([0, math.pi, 0], dtype=np.float32)
+
+
+class PhysicsArrays:
+    """
+    Struct of arrays holding the physics of several objects, one row per object.
+    PhysicsObjects are views over a single row.
+    """
 
-class PhysicsObject:
     def __init__(
         self,
-        position: npt.NDArray[np.float32] | None = None,
-        euler_angles: npt.NDArray[np.float32] | None = None,
-        linear_velocity: npt.NDArray[np.float32] | None = None,
-        angular_velocity: npt.NDArray[np.float32] | None = None,
+        size: int,
+        parent: "PhysicsArrays | None" = None,
+        offset: int = 0,
+        step: int = 1,
     ) -> None:
-        self.position = position if position else np.zeros(3, dtype=np.float32)
-
-        # ones by default to prevent mathematical errors when converting quat to rot matrix on empty physics state
-        self.quaternion = np.ones(4, dtype=np.float32)
-
-        self.linear_velocity = (
-            linear_velocity if linear_velocity else np.zeros(3, dtype=np.float32)
+        """
+        Args:
+            size (int): The number of objects.
+            parent (PhysicsArrays, optional): If given, the arrays are views over size parent rows, starting at offset.
+            offset (int, optional): The first parent row.
+            step (int, optional): The step between the parent rows.
+        """
+        self.size = size
+
+        if parent is None:
+            self.position = np.zeros((size, 3))
+            self.euler_angles = np.zeros((size, 3))  # pitch, yaw, roll
+            self.linear_velocity = np.zeros((size, 3))
+            self.angular_velocity = np.zeros((size, 3))
+
+            self.rotation_mtx = np.zeros((size, 3, 3))
+            self.has_rotation_mtx = np.zeros(size, dtype=bool)
+        else:
+            rows = slice(offset, offset + size * step, step)
+            self.position = parent.position[rows]
+            self.euler_angles = parent.euler_angles[rows]
+            self.linear_velocity = parent.linear_velocity[rows]
+            self.angular_velocity = parent.angular_velocity[rows]
+
+            self.rotation_mtx = parent.rotation_mtx[rows]
+            self.has_rotation_mtx = parent.has_rotation_mtx[rows]
+
+        # Scratch buffers of compute_rotation_mtx, allocated on first use
+        self._trigonometry: npt.NDArray[np.float64] | None = None
+        self._scratch: npt.NDArray[np.float64] | None = None
+
+    def rows(self, start: int, stop: int, step: int = 1) -> "PhysicsArrays":
+        """Returns the PhysicsArrays viewing the rows from start to stop (excluded) with the given step"""
+        return PhysicsArrays(len(range(start, stop, step)), self, start, step)
+
+    def copy_from(self, other: "PhysicsArrays") -> None:
+        """Copies the physics of the other objects, which must be as many as these"""
+        np.copyto(self.position, other.position)
+        np.copyto(self.euler_angles, other.euler_angles)
+        np.copyto(self.linear_velocity, other.linear_velocity)
+        np.copyto(self.angular_velocity, other.angular_velocity)
+        np.copyto(self.rotation_mtx, other.rotation_mtx)
+        np.copyto(self.has_rotation_mtx, other.has_rotation_mtx)
+
+    def decode_physics_arrays(
+        self, physics: npt.NDArray[np.float32], count: int
+    ) -> None:
+        """Decodes the physics of the first count objects from a (count, 12) array (see packet_codec.PHYSICS_DTYPE)"""
+        np.copyto(self.position[:count], physics[:, packet_codec.LOCATION])
+        np.copyto(self.euler_angles[:count], physics[:, packet_codec.ROTATION])
+        np.copyto(self.linear_velocity[:count], physics[:, packet_codec.VELOCITY])
+        np.copyto(
+            self.angular_velocity[:count], physics[:, packet_codec.ANGULAR_VELOCITY]
         )
-        self.angular_velocity = (
-            angular_velocity if angular_velocity else np.zeros(3, dtype=np.float32)
+        self.has_rotation_mtx[:count] = False
+
+    def invert(self, other: "PhysicsArrays", count: int) -> None:
+        """Stores in the first count rows the physics of the other objects, mirrored to the other side of the field"""
+        np.multiply(other.position[:count], INVERT_VEC, out=self.position[:count])
+        np.add(other.euler_angles[:count], INVERT_PYR, out=self.euler_angles[:count])
+        np.multiply(
+            other.linear_velocity[:count], INVERT_VEC, out=self.linear_velocity[:count]
         )
-        self._euler_angles = (
-            euler_angles if euler_angles else np.zeros(3, dtype=np.float32)
+        np.multiply(
+            other.angular_velocity[:count],
+            INVERT_VEC,
+            out=self.angular_velocity[:count],
         )
-        self._rotation_mtx = np.zeros((3, 3), dtype=np.float32)
-        self._has_computed_rot_mtx = False
+        self.has_rotation_mtx[:count] = False
+
+    def compute_rotation_mtx(self, count: int) -> None:
+        """Computes the rotation matrices of the first count objects at once. See PhysicsObject._euler_to_rotation"""
+        if self._trigonometry is None:
+            self._trigonometry = np.empty((2, self.size, 3))
+            self._scratch = np.empty((2, self.size))
+
+        cos = self._trigonometry[0, :count]
+        sin = self._trigonometry[1, :count]
+        np.cos(self.euler_angles[:count], out=cos)
+        np.sin(self.euler_angles[:count], out=sin)
+        CP, CY, CR = cos.T
+        SP, SY, SR = sin.T
+
+        a = self._scratch[0, :count]
+        b = self._scratch[1, :count]
+        theta = self.rotation_mtx[:count]
+
+        # front direction
+        np.multiply(CP, CY, out=theta[:, 0, 0])
+        np.multiply(CP, SY, out=theta[:, 1, 0])
+        np.copyto(theta[:, 2, 0], SP)
+
+        # left direction
+        np.multiply(CY, SP, out=a)
+        np.multiply(a, SR, out=a)
+        np.multiply(CR, SY, out=b)
+        np.subtract(a, b, out=theta[:, 0, 1])
+
+        np.multiply(SY, SP, out=a)
+        np.multiply(a, SR, out=a)
+        np.multiply(CR, CY, out=b)
+        np.add(a, b, out=theta[:, 1, 1])
+
+        np.multiply(CP, SR, out=a)
+        np.negative(a, out=theta[:, 2, 1])
+
+        # up direction
+        np.multiply(CR, CY, out=a)
+        np.multiply(a, SP, out=a)
+        np.multiply(SR, SY, out=b)
+        np.add(a, b, out=a)
+        np.negative(a, out=theta[:, 0, 2])
+
+        np.multiply(CR, SY, out=a)
+        np.multiply(a, SP, out=a)
+        np.multiply(SR, CY, out=b)
+        np.subtract(b, a, out=theta[:, 1, 2])
+
+        np.multiply(CP, CR, out=theta[:, 2, 2])
 
-        self._invert_vec = np.asarray([-1, -1, 1])
-        self._invert_pyr = np.asarray([0, math.pi, 0], dtype=np.float32)
+        self.has_rotation_mtx[:count] = True
+
+
+class PhysicsObject:
+    def __init__(self, arrays: PhysicsArrays | None = None, index: int = 0) -> None:
+        """
+        Args:
+            arrays (PhysicsArrays, optional): The arrays this object is a view of. If None, the object owns its data.
+            index (int, optional): The row of the arrays this object is a view of.
+        """
+        if arrays is None:
+            arrays = PhysicsArrays(1)
+            index = 0
+
+        # Views over the arrays rows: they are updated in place every time the arrays are decoded
+        self.position = arrays.position[index]
+        self.linear_velocity = arrays.linear_velocity[index]
+        self.angular_velocity = arrays.angular_velocity[index]
+        self._euler_angles = arrays.euler_angles[index]
+        self._rotation_mtx = arrays.rotation_mtx[index]
+        self._has_computed_rot_mtx = arrays.has_rotation_mtx[index : index + 1]
+
+        # ones by default to prevent mathematical errors when converting quat to rot matrix on empty physics state
+        self.quaternion = np.ones(4, dtype=np.float32)
 
     def decode_car_data(self, car_data: Physics) -> None:
-        self.position = self._vector_to_numpy(car_data.location)
-        self._euler_angles = self._rotator_to_numpy(car_data.rotation)
-        self.linear_velocity = self._vector_to_numpy(car_data.velocity)
-        self.angular_velocity = self._vector_to_numpy(car_data.angular_velocity)
+        self._copy_vector(car_data.location, self.position)
+        self._euler_angles[0] = car_data.rotation.pitch
+        self._euler_angles[1] = car_data.rotation.yaw
+        self._euler_angles[2] = car_data.rotation.roll
+        self._copy_vector(car_data.velocity, self.linear_velocity)
+        self._copy_vector(car_data.angular_velocity, self.angular_velocity)
+        self._has_computed_rot_mtx[0] = False
 
     def decode_ball_data(self, ball_data: Physics) -> None:
-        self.position = self._vector_to_numpy(ball_data.location)
-        self.linear_velocity = self._vector_to_numpy(ball_data.velocity)
-        self.angular_velocity = self._vector_to_numpy(ball_data.angular_velocity)
+        self._copy_vector(ball_data.location, self.position)
+        self._copy_vector(ball_data.velocity, self.linear_velocity)
+        self._copy_vector(ball_data.angular_velocity, self.angular_velocity)
+
+    def decode_physics_array(
+        self, physics: npt.NDArray[np.float32], with_rotation: bool = True
+    ) -> None:
+        """Decodes the physics of a binary packet (see packet_codec.PHYSICS_DTYPE)"""
+        np.copyto(self.position, physics[packet_codec.LOCATION])
+        if with_rotation:
+            np.copyto(self._euler_angles, physics[packet_codec.ROTATION])
+            self._has_computed_rot_mtx[0] = False
+        np.copyto(self.linear_velocity, physics[packet_codec.VELOCITY])
+        np.copyto(self.angular_velocity, physics[packet_codec.ANGULAR_VELOCITY])
 
     def invert(self, other: "PhysicsObject") -> None:
-        self.position = other.position * self._invert_vec
-        self._euler_angles = other.euler_angles() + self._invert_pyr
-        self.linear_velocity = other.linear_velocity * self._invert_vec
-        self.angular_velocity = other.angular_velocity * self._invert_vec
+        np.multiply(other.position, INVERT_VEC, out=self.position)
+        np.add(other.euler_angles(), INVERT_PYR, out=self._euler_angles)
+        np.multiply(other.linear_velocity, INVERT_VEC, out=self.linear_velocity)
+        np.multiply(other.angular_velocity, INVERT_VEC, out=self.angular_velocity)
+        self._has_computed_rot_mtx[0] = False
 
     # pitch, yaw, roll
     def euler_angles(self) -> npt.NDArray[np.float32]:
@@ -70,9 +219,9 @@ class PhysicsObject:
         return self._euler_angles[2]
 
     def rotation_mtx(self) -> npt.NDArray[np.float32]:
-        if not self._has_computed_rot_mtx:
-            self._rotation_mtx = self._euler_to_rotation(self._euler_angles)
-            self._has_computed_rot_mtx = True
+        if not self._has_computed_rot_mtx[0]:
+            self._euler_to_rotation(self._euler_angles, self._rotation_mtx)
+            self._has_computed_rot_mtx[0] = True
 
         return self._rotation_mtx
 
@@ -88,15 +237,15 @@ class PhysicsObject:
     def up(self) -> npt.NDArray[np.float32]:
         return self.rotation_mtx()[:, 2]
 
-    def _vector_to_numpy(self, vector: Vector3) -> npt.NDArray[np.float32]:
-        return np.asarray([vector.x, vector.y, vector.z])
-
-    def _rotator_to_numpy(self, rotator: Rotator) -> npt.NDArray[np.float32]:
-        return np.asarray([rotator.pitch, rotator.yaw, rotator.roll])
+    @staticmethod
+    def _copy_vector(vector: Vector3, out: npt.NDArray[np.float64]) -> None:
+        out[0] = vector.x
+        out[1] = vector.y
+        out[2] = vector.z
 
     def _euler_to_rotation(
-        self, pyr: npt.NDArray[np.float32]
-    ) -> npt.NDArray[np.float32]:
+        self, pyr: npt.NDArray[np.float32], theta: npt.NDArray[np.float32]
+    ) -> None:
         CP = math.cos(pyr[0])
         SP = math.sin(pyr[0])
         CY = math.cos(pyr[1])
@@ -104,8 +253,6 @@ class PhysicsObject:
         CR = math.cos(pyr[2])
         SR = math.sin(pyr[2])
 
-        theta = np.empty((3, 3))
-
         # front direction
         theta[0, 0] = CP * CY
         theta[1, 0] = CP * SY
@@ -121,21 +268,131 @@ class PhysicsObject:
         theta[1, 2] = -CR * SY * SP + SR * CY
         theta[2, 2] = CP * CR
 
-        return theta
+
+class PlayerArrays:
+    """Struct of arrays holding the state of several players, one row per player. PlayerData are views over a single row"""
+
+    def __init__(
+        self,
+        size: int,
+        car_data: PhysicsArrays | None = None,
+        inverted_car_data: PhysicsArrays | None = None,
+    ) -> None:
+        self.size = size
+
+        self.car_id = np.full(size, -1, dtype=np.int64)
+        self.team_num = np.full(size, -1, dtype=np.int64)
+        self.is_demoed = np.zeros(size, dtype=bool)
+        self.on_ground = np.zeros(size, dtype=bool)
+        self.ball_touched = np.zeros(size, dtype=bool)
+        self.has_jump = np.zeros(size, dtype=bool)
+        self.has_flip = np.zeros(size, dtype=bool)
+        self.boost_amount = np.full(size, -1, dtype=np.float64)
+
+        self.has_wheel_contact = np.zeros(size, dtype=bool)
+        self.on_ground_ticks = np.zeros(size)
+
+        self.car_data = car_data if car_data is not None else PhysicsArrays(size)
+        self.inverted_car_data = (
+            inverted_car_data if inverted_car_data is not None else PhysicsArrays(size)
+        )
+
+    def copy_from(self, other: "PlayerArrays") -> None:
+        """Copies the state of the other players, which must be as many as these. The physics are not copied"""
+        np.copyto(self.car_id, other.car_id)
+        np.copyto(self.team_num, other.team_num)
+        np.copyto(self.is_demoed, other.is_demoed)
+        np.copyto(self.on_ground, other.on_ground)
+        np.copyto(self.ball_touched, other.ball_touched)
+        np.copyto(self.has_jump, other.has_jump)
+        np.copyto(self.has_flip, other.has_flip)
+        np.copyto(self.boost_amount, other.boost_amount)
+        np.copyto(self.has_wheel_contact, other.has_wheel_contact)
+        np.copyto(self.on_ground_ticks, other.on_ground_ticks)
 
 
 class PlayerData(object):
-    def __init__(self) -> None:
-        self.car_id: int = -1
-        self.team_num: int = -1
-        self.is_demoed: bool = False
-        self.on_ground: bool = False
-        self.ball_touched: bool = False
-        self.has_jump: bool = False
-        self.has_flip: bool = False
-        self.boost_amount: float = -1
-        self.car_data: PhysicsObject = PhysicsObject()
-        self.inverted_car_data: PhysicsObject = PhysicsObject()
+    def __init__(self, arrays: PlayerArrays | None = None, index: int = 0) -> None:
+        """
+        Args:
+            arrays (PlayerArrays, optional): The arrays this player is a view of. If None, the player owns its data.
+            index (int, optional): The row of the arrays this player is a view of.
+        """
+        if arrays is None:
+            arrays = PlayerArrays(1)
+            index = 0
+
+        self._arrays = arrays
+        self._index = index
+
+        self.car_data: PhysicsObject = PhysicsObject(arrays.car_data, index)
+        self.inverted_car_data: PhysicsObject = PhysicsObject(
+            arrays.inverted_car_data, index
+        )
+
+    @property
+    def car_id(self) -> int:
+        return int(self._arrays.car_id[self._index])
+
+    @car_id.setter
+    def car_id(self, value: int) -> None:
+        self._arrays.car_id[self._index] = value
+
+    @property
+    def team_num(self) -> int:
+        return int(self._arrays.team_num[self._index])
+
+    @team_num.setter
+    def team_num(self, value: int) -> None:
+        self._arrays.team_num[self._index] = value
+
+    @property
+    def is_demoed(self) -> bool:
+        return bool(self._arrays.is_demoed[self._index])
+
+    @is_demoed.setter
+    def is_demoed(self, value: bool) -> None:
+        self._arrays.is_demoed[self._index] = value
+
+    @property
+    def on_ground(self) -> bool:
+        return bool(self._arrays.on_ground[self._index])
+
+    @on_ground.setter
+    def on_ground(self, value: bool) -> None:
+        self._arrays.on_ground[self._index] = value
+
+    @property
+    def ball_touched(self) -> bool:
+        return bool(self._arrays.ball_touched[self._index])
+
+    @ball_touched.setter
+    def ball_touched(self, value: bool) -> None:
+        self._arrays.ball_touched[self._index] = value
+
+    @property
+    def has_jump(self) -> bool:
+        return bool(self._arrays.has_jump[self._index])
+
+    @has_jump.setter
+    def has_jump(self, value: bool) -> None:
+        self._arrays.has_jump[self._index] = value
+
+    @property
+    def has_flip(self) -> bool:
+        return bool(self._arrays.has_flip[self._index])
+
+    @has_flip.setter
+    def has_flip(self, value: bool) -> None:
+        self._arrays.has_flip[self._index] = value
+
+    @property
+    def boost_amount(self) -> float:
+        return float(self._arrays.boost_amount[self._index])
+
+    @boost_amount.setter
+    def boost_amount(self, value: float) -> None:
+        self._arrays.boost_amount[self._index] = value
 
 
 class GameStateType(Enum):
@@ -157,15 +414,38 @@ focus_to_state = {
 
 
 class RLGameState(GameState):
+    MAX_CARS = packet_codec.MAX_CARS
+
     def __init__(self) -> None:
         self.type = GameStateType.WAIT_TO_START
         self.blue_score = 0
         self.orange_score = 0
+
+        # The physics of the ball and of the cars share the same arrays, each object followed by its inverted copy,
+        # so that the objects in use are inverted and get their rotation matrices with a single vectorized pass
+        # over the first rows: | ball | inverted ball | car 0 | inverted car 0 | car 1 | ...
+        self._physics = PhysicsArrays(2 * (self.MAX_CARS + 1))
+        self._normal_physics = self._physics.rows(0, self._physics.size, 2)
+        self._inverted_physics = self._physics.rows(1, self._physics.size, 2)
+
+        # Players are decoded in place into preallocated arrays: the PlayerData are views over their rows
+        self._player_arrays = PlayerArrays(
+            self.MAX_CARS,
+            self._normal_physics.rows(1, self.MAX_CARS + 1),
+            self._inverted_physics.rows(1, self.MAX_CARS + 1),
+        )
+        self._player_arrays.car_id[:] = np.arange(self.MAX_CARS)
+        self._player_views = [
+            PlayerData(self._player_arrays, i) for i in range(self.MAX_CARS)
+        ]
         self.players: List[PlayerData] = list()
-        self._on_ground_ticks = np.zeros(64)
+        self._no_player = PlayerData()  # The local player when there is none
+
+        # Scratch buffer for the flags of the binary packets
+        self._flags = np.zeros(self.MAX_CARS, dtype=np.uint8)
 
-        self.ball: PhysicsObject = PhysicsObject()
-        self.inverted_ball: PhysicsObject = PhysicsObject()
+        self.ball: PhysicsObject = PhysicsObject(self._normal_physics, 0)
+        self.inverted_ball: PhysicsObject = PhysicsObject(self._inverted_physics, 0)
 
         # List of "booleans" (1 or 0)
         self.boost_pads = np.zeros(len(common_values.BOOST_LOCATIONS), dtype=np.float32)
@@ -176,21 +456,63 @@ class RLGameState(GameState):
         self.local_player_index = -1
         self.focus = Focus.OTHER
 
+        # Incremented on every decode, identifies the current state
+        self.tick_id = 0
+        # time.perf_counter() of when the packet of the current state was received, and of when it was decoded
+        self.received_at = 0.0
+        self.decoded_at = 0.0
+
+    def copy_from(self, other: "RLGameState") -> None:
+        """Makes this state a copy of the other one, without allocating memory"""
+        self.type = other.type
+        self.blue_score = other.blue_score
+        self.orange_score = other.orange_score
+        self.local_player_index = other.local_player_index
+        self.focus = other.focus
+        self.tick_id = other.tick_id
+        self.received_at = other.received_at
+        self.decoded_at = other.decoded_at
+
+        self._physics.copy_from(other._physics)
+        self._player_arrays.copy_from(other._player_arrays)
+        np.copyto(self.boost_pads, other.boost_pads)
+        np.copyto(self.inverted_boost_pads, other.inverted_boost_pads)
+
+        if len(self.players) != len(other.players):
+            self.players = self._player_views[: len(other.players)]
+
     @property
     def local_player(self) -> PlayerData:
-        return (
-            0 <= self.local_player_index < len(self.players)
-            and self.players[self.local_player_index]
-        ) or PlayerData()
+        if 0 <= self.local_player_index < len(self.players):
+            return self.players[self.local_player_index]
+        return self._no_player
 
-    def decode(self, packet: GamePacket, ticks_elapsed: int = 1) -> None:
+    def decode(
+        self, packet: GamePacket | BinaryGamePacket, ticks_elapsed: int = 1
+    ) -> None:
         if self.focus != Focus.OTHER and packet.focus == Focus.OTHER:
             self.type = GameStateType.RESET
         else:
             self.type = GameStateType.from_focus(packet.focus)
 
         self.focus = packet.focus
+        self.tick_id += 1
+
+        if isinstance(packet, BinaryGamePacket):
+            self._decode_binary(packet)
+        else:
+            self._decode_json(packet)
+
+        self._decode_derived_player_data(packet.num_cars, ticks_elapsed)
+
+        # Inverted copies and rotation matrices of the ball and of all the cars
+        self._inverted_physics.invert(self._normal_physics, packet.num_cars + 1)
+        self._physics.compute_rotation_mtx(2 * (packet.num_cars + 1))
 
+        if len(self.players) != packet.num_cars:
+            self.players = self._player_views[: packet.num_cars]
+
+    def _decode_json(self, packet: GamePacket) -> None:
         self.blue_score = packet.teams[0].score
         self.orange_score = packet.teams[1].score
 
@@ -201,38 +523,69 @@ class RLGameState(GameState):
         self.inverted_boost_pads[:] = self.boost_pads[::-1]
 
         self.ball.decode_ball_data(packet.game_ball.physics)
-        self.inverted_ball.invert(self.ball)
 
-        self.players = []
+        players = self._player_arrays
         for i in range(packet.num_cars):
-            player = self._decode_player(packet.game_cars[i], i, ticks_elapsed)
-            self.players.append(player)
-
-            if player.ball_touched:
-                self.last_touch = player.car_id
+            player_info = packet.game_cars[i]
+            self._player_views[i].car_data.decode_car_data(player_info.physics)
 
-    def _decode_player(
-        self, player_info: PlayerInfo, index: int, ticks_elapsed: int
-    ) -> PlayerData:
-        player_data = PlayerData()
+            players.team_num[i] = player_info.team
+            players.is_demoed[i] = player_info.is_demolished
+            players.has_wheel_contact[i] = player_info.has_wheel_contact
+            players.has_jump[i] = not player_info.jumped
+            players.has_flip[i] = not player_info.double_jumped
+            players.boost_amount[i] = player_info.boost / 100
 
-        player_data.car_data.decode_car_data(player_info.physics)
-        player_data.inverted_car_data.invert(player_data.car_data)
+    def _decode_binary(self, packet: BinaryGamePacket) -> None:
+        self.blue_score = int(packet.scores[0])
+        self.orange_score = int(packet.scores[1])
 
-        if player_info.has_wheel_contact:
-            self._on_ground_ticks[index] = 0
-        else:
-            self._on_ground_ticks[index] += ticks_elapsed
+        self.local_player_index = packet.local_car_index
 
-        player_data.car_id = index
-        player_data.team_num = player_info.team
-        player_data.is_demoed = player_info.is_demolished
-        player_data.on_ground = (
-            player_info.has_wheel_contact or self._on_ground_ticks[index] <= 6
+        self.boost_pads[: packet.num_boost] = np.unpackbits(
+            packet.packed_boost_pads, count=packet.num_boost, bitorder="little"
         )
-        player_data.ball_touched = False
-        player_data.has_jump = not player_info.jumped
-        player_data.has_flip = not player_info.double_jumped
-        player_data.boost_amount = player_info.boost / 100
+        self.inverted_boost_pads[:] = self.boost_pads[::-1]
+
+        self.ball.decode_physics_array(packet.ball_physics, with_rotation=False)
 
-        return player_data
+        n = packet.num_cars
+        cars = packet.cars
+        players = self._player_arrays
+
+        players.car_data.decode_physics_arrays(cars["physics"], n)
+        np.copyto(players.team_num[:n], cars["team"])
+        np.divide(cars["boost"], 100, out=players.boost_amount[:n])
+
+        flags = cars["flags"]
+        self._decode_flag(flags, packet_codec.FLAG_IS_DEMOLISHED, players.is_demoed[:n])
+        self._decode_flag(
+            flags, packet_codec.FLAG_HAS_WHEEL_CONTACT, players.has_wheel_contact[:n]
+        )
+        # has_jump and has_flip are the negation of the flags
+        self._decode_flag(flags, packet_codec.FLAG_JUMPED, players.has_jump[:n])
+        self._decode_flag(flags, packet_codec.FLAG_DOUBLE_JUMPED, players.has_flip[:n])
+        np.logical_not(players.has_jump[:n], out=players.has_jump[:n])
+        np.logical_not(players.has_flip[:n], out=players.has_flip[:n])
+
+    def _decode_flag(
+        self, flags: npt.NDArray[np.uint8], flag: int, out: npt.NDArray[np.bool_]
+    ) -> None:
+        scratch = self._flags[: len(flags)]
+        np.bitwise_and(flags, flag, out=scratch)
+        np.not_equal(scratch, 0, out=out)
+
+    def _decode_derived_player_data(self, count: int, ticks_elapsed: int) -> None:
+        """Updates the player data that doesn't come directly from the packet, for the first count players"""
+        players = self._player_arrays
+        has_wheel_contact = players.has_wheel_contact[:count]
+        on_ground_ticks = players.on_ground_ticks[:count]
+
+        on_ground_ticks += ticks_elapsed
+        np.copyto(on_ground_ticks, 0, where=has_wheel_contact)
+
+        np.less_equal(on_ground_ticks, 6, out=players.on_ground[:count])
+        np.logical_or(
+            players.on_ground[:count], has_wheel_contact, out=players.on_ground[:count]
+        )
+        players.ball_touched[:count] = False
@@ -1,26 +1,42 @@
-import json
 import logging
 import socket
-import struct
 import threading as th
 import time
+from collections import deque
 from typing import Any
 
+import numpy as np
+
+from gamepals.command_arbitrators import SessionRecorder
 from gamepals.sources.game import GameStateListener
+from gamepals.utils.logging import Telemetry, TelemetryColumn
 
 from .game_packet import Focus, GamePacket
 from .game_state import RLGameState
+from .game_state_mailbox import GameStateMailbox
+from .packet_codec import (LENGTH_STRUCT, BinaryGamePacket, WireFormat,
+                           decode_payload, encode_hello)
 
 logger = logging.getLogger(__name__)
 
 
 class RLGameStateListener(GameStateListener):
+    """
+    RLGameStateListener receives the game state packets sent by the mod and notifies its listeners.
+
+    The summary of the game it logs (focus, score, team) is published to the Logger when it changes (see Loggable).
+    """
+
+    PUBLISHES_CHANGES = True
     DEFAULT_HOST = "localhost"
     DEFAULT_PORT = 3000
     DEFAULT_TARGET_FPS = 120
     DEFAULT_TICK_SKIP = 8
     MAX_ATTEMPTS = 20
     RETRAY_DELAY = 10
+    DEFAULT_WIRE_FORMAT = WireFormat.BINARY
+    INITIAL_BUFFER_SIZE = 4096  # bytes, enough for a JSON packet with a few cars
+    LATENCY_WINDOW = 1000  # number of notified ticks the latency metrics are computed on
 
     def __init__(
         self,
@@ -30,7 +46,17 @@ class RLGameStateListener(GameStateListener):
         tick_skip: int = DEFAULT_TICK_SKIP,
         max_attempts: int = MAX_ATTEMPTS,
         retry_delay: int = RETRAY_DELAY,
+        wire_format: WireFormat = DEFAULT_WIRE_FORMAT,
+        async_notify: bool = True,
+        recorder: SessionRecorder | None = None,
+        telemetry: Telemetry | None = None,
     ) -> None:
+        """
+        Args:
+            recorder (SessionRecorder | None, optional): Records the payload of every packet received from the game.
+            telemetry (Telemetry | None, optional): Records every tick received from the game, and whether it was
+                published to the listeners.
+        """
         super().__init__()
 
         self.host = host
@@ -42,10 +68,44 @@ class RLGameStateListener(GameStateListener):
         self.target_fps = target_fps
         self.tick_skip = tick_skip
 
+        # Format requested to the mod. Mods that don't support it fall back to JSON
+        self.wire_format = WireFormat(wire_format)
+
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
-        self.receive_thread: th.Thread | None = None
+        # Frames are received into preallocated buffers, which are only replaced when a bigger frame arrives.
+        # In the steady state no memory is allocated to receive a packet
+        self.__header_buffer = memoryview(bytearray(LENGTH_STRUCT.size))
+        self.__buffer = memoryview(bytearray(self.INITIAL_BUFFER_SIZE))
+        self.buffer_allocations = 1
+
+        # With async_notify the socket thread only decodes packets and publishes them to a mailbox, while the
+        # listeners (and so the copilots' inference) are notified on a separate thread. If the listeners are
+        # slower than the game, the ticks in between are dropped instead of queueing up in the socket
+        self.async_notify = async_notify
+        self.mailbox = GameStateMailbox()
+        self.notify_latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.recorder = recorder
+
         self.game_state = RLGameState()
+        self.__summary = self.__game_summary()
+
+        self.__focus_codes = {focus: i for i, focus in enumerate(Focus)}
+        self.__telemetry = None
+        if telemetry is not None:
+            self.__telemetry = telemetry.channel(
+                "game_ticks",
+                [
+                    TelemetryColumn("time", "d"),
+                    TelemetryColumn("seconds_elapsed", "d"),
+                    TelemetryColumn("ticks_elapsed", "H"),
+                    TelemetryColumn("focus", "B", [focus.value for focus in Focus]),
+                    TelemetryColumn("published", "B"),
+                ],
+            )
+
+        self.receive_thread: th.Thread | None = None
+        self.notify_thread: th.Thread | None = None
         self.__prev_time = 0.0
         self.__ticks = 0
         self._running = False
@@ -63,6 +123,7 @@ class RLGameStateListener(GameStateListener):
         self.game_state = RLGameState()
         self.__prev_time = 0.0
         self.__ticks = 0
+        self.mailbox.reopen()
 
         for attemp in range(self.max_attempts):
             try:
@@ -70,12 +131,19 @@ class RLGameStateListener(GameStateListener):
                     f"Connecting to game at {self.host}:{self.port} with target FPS {self.target_fps} and tick skip {self.tick_skip}..."
                 )
                 self.client_socket.connect((self.host, self.port))
-                logger.info(f"Connected to game.")
+                self.client_socket.sendall(encode_hello(self.wire_format))
+                logger.info(f"Connected to game. Requested {self.wire_format.name} packets.")
 
                 self.receive_thread = th.Thread(
                     target=self.__listen_to_messages, daemon=True
                 )
                 self.receive_thread.start()
+
+                if self.async_notify:
+                    self.notify_thread = th.Thread(
+                        target=self.__notify_game_states, daemon=True
+                    )
+                    self.notify_thread.start()
                 break
 
             except socket.error as e:
@@ -98,10 +166,11 @@ class RLGameStateListener(GameStateListener):
 
         logger.info("Stopping listening to game state updates")
         self.client_socket.close()
+        self.mailbox.close()
 
-        if self.receive_thread is not None:
-            self.receive_thread.join()
-            self.receive_thread = None
+        for thread in (self.receive_thread, self.notify_thread):
+            if thread is not None and thread is not th.current_thread():
+                thread.join()
 
     def __listen_to_messages(self) -> None:
         try:
@@ -110,10 +179,11 @@ class RLGameStateListener(GameStateListener):
                 if packet is None:
                     continue
 
+                ticks_elapsed = 0
                 if (
                     packet.focus == Focus.GAME
                 ):  # GAME packets are transmitted every tick_skip ticks
-                    cur_time = packet.game_info.seconds_elapsed
+                    cur_time = packet.seconds_elapsed
                     delta = cur_time - self.__prev_time
                     self.__prev_time = cur_time
                     ticks_elapsed = round(delta * self.target_fps)
@@ -125,41 +195,82 @@ class RLGameStateListener(GameStateListener):
                     self.__ticks = (
                         self.tick_skip
                     )  # Non-GAME packets are immediately transmitted
+                self.game_state.decoded_at = time.perf_counter()
 
-                if self.__ticks < self.tick_skip:
+                self.__publish_summary()
+
+                published = self.__ticks >= self.tick_skip
+                if self.__telemetry is not None:
+                    self.__telemetry.append(
+                        time.time(),
+                        packet.seconds_elapsed,
+                        max(0, min(ticks_elapsed, 0xFFFF)),
+                        self.__focus_codes[packet.focus],
+                        published,
+                    )
+
+                if not published:
                     continue
                 self.__ticks = 0
 
-                self.notify_all(self.game_state)
+                if self.async_notify:
+                    self.mailbox.publish(self.game_state)
+                else:
+                    self.__notify(self.game_state)
 
         except socket.error as e:
             logger.error(f"Error reading game state: {e}")
         finally:
             self.stop_listening()
 
-    def __read_packet(self) -> GamePacket | None:
-        data_length_bytes = self.client_socket.recv(4)
-        if not data_length_bytes:
-            return None
+    def __notify_game_states(self) -> None:
+        while self._running:
+            game_state = self.mailbox.take(timeout=0.5)
+            if game_state is not None:
+                self.__notify(game_state)
+
+    def __notify(self, game_state: RLGameState) -> None:
+        self.notify_all(game_state)
+        self.notify_latencies.append(time.perf_counter() - game_state.received_at)
 
-        data_length = struct.unpack("!I", data_length_bytes)[0]
+    def __read_packet(self) -> GamePacket | BinaryGamePacket | None:
+        self.__receive_into(self.__header_buffer)
+        data_length = LENGTH_STRUCT.unpack_from(self.__header_buffer)[0]
 
-        msg_bytes_buffer = b""
-        while len(msg_bytes_buffer) < data_length:
-            packet = self.client_socket.recv(data_length - len(msg_bytes_buffer))
-            if not packet:
-                return None
-            msg_bytes_buffer += packet
+        if data_length > len(self.__buffer):
+            self.__grow_buffer(data_length)
 
-        msg = msg_bytes_buffer.decode("utf-8")
+        payload = self.__buffer[:data_length]
+        self.__receive_into(payload)
+        self.game_state.received_at = time.perf_counter()
+        if self.recorder is not None:
+            self.recorder.record_game_packet(payload)
 
         try:
-            return GamePacket.from_json(json.loads(msg))
-        except json.JSONDecodeError as e:
+            return decode_payload(payload)
+        except ValueError as e:
             logger.error(f"Error decoding game state packet: {e}")
             return None
 
-    def get_json(self) -> dict[str, Any]:
+    def __receive_into(self, view: memoryview) -> None:
+        """Fills the whole view with data read from the socket"""
+        received = 0
+        while received < len(view):
+            n = self.client_socket.recv_into(view[received:])
+            if n == 0:
+                raise ConnectionError("Connection closed by the game")
+            received += n
+
+    def __grow_buffer(self, min_size: int) -> None:
+        size = len(self.__buffer)
+        while size < min_size:
+            size *= 2
+
+        logger.debug(f"Growing receive buffer to {size} bytes")
+        self.__buffer = memoryview(bytearray(size))
+        self.buffer_allocations += 1
+
+    def __game_summary(self) -> dict[str, Any]:
         # TODO: Aggiungere:
         # - Se la macchina è in area
         # - Distanza dalla palla
@@ -175,3 +286,33 @@ class RLGameStateListener(GameStateListener):
             "orange_score": int(self.game_state.orange_score),
             "local_player_team": int(self.game_state.local_player.team_num),
         }
+
+    def __publish_summary(self) -> None:
+        """Refreshes the summary, publishing the values that changed since the last packet"""
+        summary = self.__game_summary()
+        for key, value in summary.items():
+            if self.__summary[key] != value:
+                self.publish_change((key,), value)
+        self.__summary = summary
+
+    def get_json(self) -> dict[str, Any]:
+        return {**self.__summary, **self.get_counters()}
+
+    def get_counters(self) -> dict[str, Any]:
+        return {
+            "dropped_ticks": self.mailbox.dropped,
+            **self.__latency_json(),
+        }
+
+    def __latency_json(self) -> dict[str, float]:
+        """Time from the reception of a packet to the end of the listeners' notification, in milliseconds"""
+        notify_latencies = self.notify_latencies.copy()  # Appended by the notifying thread
+        if len(notify_latencies) == 0:
+            return {}
+
+        latencies = np.array(notify_latencies) * 1e3
+        return {
+            "notify_latency_p50_ms": float(np.percentile(latencies, 50)),
+            "notify_latency_p99_ms": float(np.percentile(latencies, 99)),
+            "notify_latency_max_ms": float(latencies.max()),
+        }
@@ -0,0 +1,61 @@
+import threading as th
+
+from .game_state import RLGameState
+
+
+class GameStateMailbox:
+    """
+    GameStateMailbox hands game states from the socket thread to a consumer thread, latest value wins.
+
+    Publishing never blocks: the state is copied into a back buffer, which then becomes the latest one. If the
+    consumer didn't take the previous latest state, that state is dropped. The consumer owns the state it took
+    until it takes the next one. The three buffers are preallocated, so no memory is allocated per state.
+    """
+
+    def __init__(self) -> None:
+        self.__back = RLGameState()
+        self.__latest = RLGameState()
+        self.__front = RLGameState()
+        self.__fresh = False
+        self.__closed = False
+        self.__condition = th.Condition()
+
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, game_state: RLGameState) -> None:
+        """Publishes a copy of the game state"""
+        self.__back.copy_from(game_state)
+
+        with self.__condition:
+            self.__back, self.__latest = self.__latest, self.__back
+            if self.__fresh:
+                self.dropped += 1
+            self.__fresh = True
+            self.published += 1
+            self.__condition.notify()
+
+    def take(self, timeout: float | None = None) -> RLGameState | None:
+        """Returns the latest game state, waiting for a new one. Returns None on timeout or if the mailbox is closed"""
+        with self.__condition:
+            if not self.__condition.wait_for(
+                lambda: self.__fresh or self.__closed, timeout
+            ):
+                return None
+            if self.__closed:
+                return None
+
+            self.__front, self.__latest = self.__latest, self.__front
+            self.__fresh = False
+            return self.__front
+
+    def close(self) -> None:
+        """Wakes up the consumer, making it return None"""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+    def reopen(self) -> None:
+        with self.__condition:
+            self.__closed = False
+            self.__fresh = False
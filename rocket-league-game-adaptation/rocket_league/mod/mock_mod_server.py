@@ -0,0 +1,220 @@
+import argparse
+import logging
+import math
+import socket
+import threading as th
+import time
+
+from .. import common_values
+from .game_packet import (BallInfo, BoostPadState, Focus, GameInfo, GamePacket,
+                          Physics, PlayerInfo, Rotator, TeamInfo, Vector3)
+from .packet_codec import (HELLO_STRUCT, WireFormat, decode_hello,
+                           encode_binary, encode_frame, encode_json)
+
+logger = logging.getLogger(__name__)
+
+
+class MockModServer:
+    """
+    MockModServer is a local stand-in for the Rocket League mod.
+
+    It broadcasts synthetic game packets at a fixed rate to every connected client, using the wire format
+    each client requested in its hello. It can be used to run the game adaptation (or to measure the decoding
+    throughput of the two formats) without launching the game.
+    """
+
+    DEFAULT_HOST = "localhost"
+    DEFAULT_PORT = 3000
+    DEFAULT_FPS = 120
+    HELLO_TIMEOUT = 0.5  # seconds
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        fps: int = DEFAULT_FPS,
+        num_cars: int = 2,
+        legacy: bool = False,
+    ) -> None:
+        """
+        Args:
+            legacy (bool, optional): If True, client hellos are ignored and only JSON is sent, like older mods do.
+        """
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.num_cars = num_cars
+        self.legacy = legacy
+
+        self.server_socket: socket.socket | None = None
+        self.clients: list[tuple[socket.socket, WireFormat]] = list()
+        self.__clients_lock = th.Lock()
+
+        self._running = False
+        self.accept_thread: th.Thread | None = None
+        self.broadcast_thread: th.Thread | None = None
+
+    def start(self) -> None:
+        if self._running:
+            return
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen()
+        self._running = True
+
+        self.accept_thread = th.Thread(target=self.__accept_clients, daemon=True)
+        self.broadcast_thread = th.Thread(target=self.__broadcast_loop, daemon=True)
+        self.accept_thread.start()
+        self.broadcast_thread.start()
+
+        logger.info(f"Mock mod server listening on {self.host}:{self.port}")
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+
+        if self.server_socket is not None:
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)  # Wakes up the accept thread
+            except OSError:
+                pass
+            self.server_socket.close()
+
+        for thread in (self.accept_thread, self.broadcast_thread):
+            if thread is not None:
+                thread.join()
+
+        with self.__clients_lock:
+            for client, _ in self.clients:
+                client.close()
+            self.clients.clear()
+
+    def __accept_clients(self) -> None:
+        assert self.server_socket is not None
+
+        while self._running:
+            try:
+                client, address = self.server_socket.accept()
+            except OSError:
+                break
+
+            wire_format = WireFormat.JSON if self.legacy else self.__read_hello(client)
+            logger.info(f"Client {address} connected, sending {wire_format.name} packets")
+
+            with self.__clients_lock:
+                self.clients.append((client, wire_format))
+
+    def __read_hello(self, client: socket.socket) -> WireFormat:
+        client.settimeout(self.HELLO_TIMEOUT)
+        try:
+            hello = client.recv(HELLO_STRUCT.size, socket.MSG_WAITALL)
+        except socket.timeout:
+            hello = b""
+        finally:
+            client.settimeout(None)
+
+        return decode_hello(hello) or WireFormat.JSON
+
+    def __broadcast_loop(self) -> None:
+        tick = 0
+        period = 1 / self.fps
+        next_time = time.perf_counter()
+
+        while self._running:
+            packet = self.make_packet(tick)
+            frames: dict[WireFormat, bytes] = dict()
+
+            with self.__clients_lock:
+                for client, wire_format in list(self.clients):
+                    if wire_format not in frames:
+                        frames[wire_format] = encode_frame(
+                            encode_binary(packet)
+                            if wire_format == WireFormat.BINARY
+                            else encode_json(packet)
+                        )
+
+                    try:
+                        client.sendall(frames[wire_format])
+                    except OSError:
+                        client.close()
+                        self.clients.remove((client, wire_format))
+
+            tick += 1
+            next_time += period
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def make_packet(self, tick: int) -> GamePacket:
+        """Returns a synthetic in-game packet, with the ball and the cars moving in circles"""
+        t = tick / self.fps
+
+        def physics(phase: float, radius: float) -> Physics:
+            angle = t + phase
+            return Physics(
+                location=Vector3(
+                    radius * math.cos(angle), radius * math.sin(angle), 17.0
+                ),
+                rotation=Rotator(0.0, math.remainder(angle + math.pi / 2, 2 * math.pi), 0.0),
+                velocity=Vector3(
+                    -radius * math.sin(angle), radius * math.cos(angle), 0.0
+                ),
+                angular_velocity=Vector3(0.0, 0.0, 1.0),
+            )
+
+        return GamePacket(
+            focus=Focus.GAME,
+            game_cars=[
+                PlayerInfo(
+                    physics=physics(2 * math.pi * i / self.num_cars, 2000.0),
+                    is_demolished=False,
+                    has_wheel_contact=(tick // 60 + i) % 2 == 0,
+                    is_bot=i != 0,
+                    jumped=False,
+                    double_jumped=False,
+                    team=i % 2,
+                    boost=(tick + 10 * i) % 101,
+                )
+                for i in range(self.num_cars)
+            ],
+            num_cars=self.num_cars,
+            local_car_index=0,
+            game_boosts=[
+                BoostPadState(is_active=(tick // 120 + i) % 3 != 0)
+                for i in range(len(common_values.BOOST_LOCATIONS))
+            ],
+            num_boost=len(common_values.BOOST_LOCATIONS),
+            game_ball=BallInfo(physics=physics(0.0, 500.0)),
+            teams=[TeamInfo(team_index=0, score=0), TeamInfo(team_index=1, score=0)],
+            num_teams=2,
+            game_info=GameInfo(seconds_elapsed=t),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stand-in for the Rocket League mod, broadcasting synthetic game packets"
+    )
+    parser.add_argument("--host", type=str, default=MockModServer.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=MockModServer.DEFAULT_PORT)
+    parser.add_argument("--fps", type=int, default=MockModServer.DEFAULT_FPS)
+    parser.add_argument("--cars", type=int, default=2)
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Ignore client hellos and only send JSON packets, like older mod versions",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    server = MockModServer(args.host, args.port, args.fps, args.cars, args.legacy)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
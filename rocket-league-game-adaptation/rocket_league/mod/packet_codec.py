@@ -0,0 +1,252 @@
+import json
+import struct
+from enum import IntEnum
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .game_packet import Focus, GamePacket, Physics
+
+# This file contains the codec for the frames exchanged with the game mod through the socket.
+#
+# Every frame is a 4-byte big-endian length header followed by the payload. The payload is either:
+# * a UTF-8 JSON document (always starting with '{'), the legacy format every mod version speaks;
+# * a compact little-endian binary record, starting with BINARY_MAGIC. Its layout is:
+#   header (HEADER_STRUCT), team scores (int32 each), ball physics (12 float32),
+#   cars (CAR_DTYPE records) and finally the boost pads, packed as a bitfield.
+#
+# The binary format is negotiated: right after connecting, the client sends a hello (HELLO_STRUCT) with the
+# format it would like to receive. Mods that don't know about the hello just ignore it and keep sending JSON,
+# so the format is always detected per frame from the first payload byte.
+
+
+class WireFormat(IntEnum):
+    JSON = 0
+    BINARY = 1
+
+
+HELLO_MAGIC = b"GPRL"
+HELLO_STRUCT = struct.Struct("<4sBB")  # magic, wire format, binary version
+
+LENGTH_STRUCT = struct.Struct("!I")
+
+BINARY_MAGIC = 0xB1
+BINARY_VERSION = 1
+
+# magic, version, focus, local_car_index, num_cars, num_boost, num_teams, (padding), seconds_elapsed
+HEADER_STRUCT = struct.Struct("<BBBbBBBxf")
+SCORE_DTYPE = np.dtype("<i4")
+
+# location (x, y, z), rotation (pitch, yaw, roll), velocity (x, y, z), angular_velocity (x, y, z)
+PHYSICS_LENGTH = 12
+PHYSICS_DTYPE = np.dtype(("<f4", (PHYSICS_LENGTH,)))
+LOCATION = slice(0, 3)
+ROTATION = slice(3, 6)
+VELOCITY = slice(6, 9)
+ANGULAR_VELOCITY = slice(9, 12)
+
+CAR_DTYPE = np.dtype(
+    [
+        ("physics", "<f4", (PHYSICS_LENGTH,)),
+        ("team", "u1"),
+        ("flags", "u1"),
+        ("boost", "u1"),
+        ("padding", "u1"),
+    ]
+)
+
+# Bits of the CAR_DTYPE flags field
+FLAG_IS_DEMOLISHED = 1 << 0
+FLAG_HAS_WHEEL_CONTACT = 1 << 1
+FLAG_IS_BOT = 1 << 2
+FLAG_JUMPED = 1 << 3
+FLAG_DOUBLE_JUMPED = 1 << 4
+
+# Most cars a packet can have, as many as the game state has room for
+MAX_CARS = 64
+
+# Same order as the FocusedWindow enum of the mod
+FOCUS_CODES: tuple[Focus, ...] = (Focus.GAME, Focus.PAUSE, Focus.OTHER)
+FOCUS_TO_CODE: dict[Focus, int] = {focus: code for code, focus in enumerate(FOCUS_CODES)}
+
+
+class BinaryGamePacket:
+    """
+    A read-only view over a binary frame.
+
+    The arrays it exposes are not copied: they reference the buffer the frame was read into,
+    so they are only valid until that buffer is reused for the next frame.
+    """
+
+    def __init__(self, buffer: Any) -> None:
+        if len(buffer) < HEADER_STRUCT.size:
+            raise ValueError(f"Binary packet too short: {len(buffer)} bytes")
+
+        (
+            magic,
+            version,
+            focus,
+            self.local_car_index,
+            self.num_cars,
+            self.num_boost,
+            self.num_teams,
+            self.seconds_elapsed,
+        ) = HEADER_STRUCT.unpack_from(buffer, 0)
+
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(
+                f"Unsupported binary packet (magic {magic:#x}, version {version})"
+            )
+
+        if len(buffer) != binary_packet_size(self.num_cars, self.num_boost, self.num_teams):
+            raise ValueError(f"Malformed binary packet of {len(buffer)} bytes")
+
+        if focus >= len(FOCUS_CODES):
+            raise ValueError(f"Unknown focus code {focus} in binary packet")
+        self.focus = FOCUS_CODES[focus]
+
+        offset = HEADER_STRUCT.size
+        self.scores: npt.NDArray[np.int32] = np.frombuffer(
+            buffer, dtype=SCORE_DTYPE, count=self.num_teams, offset=offset
+        )
+        offset += self.num_teams * SCORE_DTYPE.itemsize
+
+        self.ball_physics: npt.NDArray[np.float32] = np.frombuffer(
+            buffer, dtype=PHYSICS_DTYPE, count=1, offset=offset
+        )[0]
+        offset += PHYSICS_DTYPE.itemsize
+
+        self.cars: npt.NDArray[Any] = np.frombuffer(
+            buffer, dtype=CAR_DTYPE, count=self.num_cars, offset=offset
+        )
+        offset += self.num_cars * CAR_DTYPE.itemsize
+
+        self.packed_boost_pads: npt.NDArray[np.uint8] = np.frombuffer(
+            buffer, dtype=np.uint8, count=_bitfield_size(self.num_boost), offset=offset
+        )
+
+
+def _bitfield_size(bits: int) -> int:
+    return (bits + 7) // 8
+
+
+def binary_packet_size(num_cars: int, num_boost: int, num_teams: int) -> int:
+    """Returns the size in bytes of a binary payload with the given entities"""
+    return (
+        HEADER_STRUCT.size
+        + num_teams * SCORE_DTYPE.itemsize
+        + PHYSICS_DTYPE.itemsize
+        + num_cars * CAR_DTYPE.itemsize
+        + _bitfield_size(num_boost)
+    )
+
+
+def decode_payload(payload: Any) -> GamePacket | BinaryGamePacket:
+    """
+    Decodes a frame payload, detecting its format from the first byte.
+    Raises ValueError if the payload can't be decoded, or has more than MAX_CARS cars.
+    """
+    packet: GamePacket | BinaryGamePacket
+    if len(payload) > 0 and payload[0] == BINARY_MAGIC:
+        packet = BinaryGamePacket(payload)
+    else:
+        packet = GamePacket.from_json(json.loads(str(payload, "utf-8")))
+
+    if packet.num_cars > MAX_CARS:
+        raise ValueError(f"Packet with {packet.num_cars} cars, at most {MAX_CARS} are supported")
+    return packet
+
+
+def encode_hello(wire_format: WireFormat) -> bytes:
+    return HELLO_STRUCT.pack(HELLO_MAGIC, wire_format, BINARY_VERSION)
+
+
+def decode_hello(data: bytes) -> WireFormat | None:
+    """Returns the format requested by a client hello, or None if the hello is not valid"""
+    if len(data) != HELLO_STRUCT.size:
+        return None
+
+    magic, wire_format, version = HELLO_STRUCT.unpack(data)
+    if magic != HELLO_MAGIC or version != BINARY_VERSION:
+        return None
+
+    try:
+        return WireFormat(wire_format)
+    except ValueError:
+        return None
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return LENGTH_STRUCT.pack(len(payload)) + payload
+
+
+def encode_json(packet: GamePacket) -> bytes:
+    return json.dumps(packet.to_json()).encode("utf-8")
+
+
+def encode_binary(packet: GamePacket) -> bytes:
+    buffer = bytearray(
+        binary_packet_size(packet.num_cars, packet.num_boost, packet.num_teams)
+    )
+
+    HEADER_STRUCT.pack_into(
+        buffer,
+        0,
+        BINARY_MAGIC,
+        BINARY_VERSION,
+        FOCUS_TO_CODE[packet.focus],
+        packet.local_car_index,
+        packet.num_cars,
+        packet.num_boost,
+        packet.num_teams,
+        packet.seconds_elapsed,
+    )
+    offset = HEADER_STRUCT.size
+
+    scores = np.frombuffer(buffer, dtype=SCORE_DTYPE, count=packet.num_teams, offset=offset)
+    scores[:] = [team.score for team in packet.teams[: packet.num_teams]]
+    offset += scores.nbytes
+
+    ball = np.frombuffer(buffer, dtype=PHYSICS_DTYPE, count=1, offset=offset)
+    ball[0] = _physics_to_list(packet.game_ball.physics)
+    offset += ball.nbytes
+
+    cars = np.frombuffer(buffer, dtype=CAR_DTYPE, count=packet.num_cars, offset=offset)
+    for i, car in enumerate(packet.game_cars[: packet.num_cars]):
+        cars["physics"][i] = _physics_to_list(car.physics)
+        cars["team"][i] = car.team
+        cars["boost"][i] = car.boost
+        cars["flags"][i] = (
+            (FLAG_IS_DEMOLISHED if car.is_demolished else 0)
+            | (FLAG_HAS_WHEEL_CONTACT if car.has_wheel_contact else 0)
+            | (FLAG_IS_BOT if car.is_bot else 0)
+            | (FLAG_JUMPED if car.jumped else 0)
+            | (FLAG_DOUBLE_JUMPED if car.double_jumped else 0)
+        )
+    offset += cars.nbytes
+
+    boost_pads = np.asarray(
+        [boost.is_active for boost in packet.game_boosts[: packet.num_boost]],
+        dtype=np.uint8,
+    )
+    buffer[offset:] = np.packbits(boost_pads, bitorder="little").tobytes()
+
+    return bytes(buffer)
+
+
+def _physics_to_list(physics: Physics) -> list[float]:
+    return [
+        physics.location.x,
+        physics.location.y,
+        physics.location.z,
+        physics.rotation.pitch,
+        physics.rotation.yaw,
+        physics.rotation.roll,
+        physics.velocity.x,
+        physics.velocity.y,
+        physics.velocity.z,
+        physics.angular_velocity.x,
+        physics.angular_velocity.y,
+        physics.angular_velocity.z,
+    ]
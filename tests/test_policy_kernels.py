@@ -0,0 +1,176 @@
+"""
+Checks that the vectorized kernels of the policies (Policy.merge_arrays, see kernels) and the FrameMerger return the
+same values as merge_input_entries, bit for bit.
+"""
+
+import math
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from hypothesis import assume, given, settings
+from hypothesis import strategies as st
+from hypothesis.extra import numpy as hnp
+
+from gamepals.agents import ActorID
+from gamepals.agents.actions import GameAction
+from gamepals.command_arbitrators.policies import (
+    ActionInputRecord,
+    InputEntry,
+    Policy,
+    PolicyName,
+    PolicyRole,
+)
+from gamepals.command_arbitrators.policies.frame_merger import FrameMerger
+from gamepals.command_arbitrators.policies.policy_manager import CompiledPolicy
+
+
+class PolicyLastPilot(Policy):
+    """A policy without a vectorized kernel: the value of the last pilot, 0.0 if there is none"""
+
+    @staticmethod
+    def merge_input_entries(entries: list[InputEntry]) -> float:
+        pilots = [entry for entry in entries if entry.actor_role == PolicyRole.PILOT]
+        return pilots[-1].input_details.val if pilots else 0.0
+
+
+POLICIES: list[type[Policy]] = [policy.value for policy in PolicyName] + [PolicyLastPilot]
+MAX_ACTORS = 4
+
+
+class SampleAction(GameAction):
+    A = "A"
+    B = "B"
+    C = "C"
+    D = "D"
+    E = "E"
+    F = "F"
+
+
+def neighbours(x: float) -> list[float]:
+    return [math.nextafter(x, -math.inf), x, math.nextafter(x, math.inf)]
+
+
+# The tolerances of the policies (math.isclose with abs_tol 1e-1 and 1e-2), signed zeros and non-finite values
+EDGE_VALUES = [
+    0.0,
+    -0.0,
+    math.nan,
+    math.inf,
+    -math.inf,
+    1.0,
+    -1.0,
+    *neighbours(0.1),
+    *neighbours(-0.1),
+    *neighbours(0.01),
+    *neighbours(-0.01),
+]
+# Equal confidences, and the thresholds of the slope policy for a pilot confidence of 0.5 (0.5 ** 3, 0.5 ** (1/3))
+EDGE_CONFIDENCES = [0.0, 1.0, *neighbours(0.5), *neighbours(0.5**3), *neighbours(0.5 ** (1 / 3))]
+
+values_st = st.one_of(st.sampled_from(EDGE_VALUES), st.floats(-1.0, 1.0), st.floats())
+confidences_st = st.one_of(st.sampled_from(EDGE_CONFIDENCES), st.floats(0.0, 1.0))
+timestamps_st = st.integers(0, 3).map(float)  # Few distinct values, to have ties
+roles_st = st.sampled_from([role.value for role in PolicyRole])
+
+
+def same_bits(a: float, b: float) -> bool:
+    return (math.isnan(a) and math.isnan(b)) or struct.pack("<d", a) == struct.pack("<d", b)
+
+
+def merge_scalar(policy: type[Policy], values, confidences, roles, timestamps) -> float:
+    """Merges a list of entries (the rows of the arrays) with merge_input_entries"""
+    entries = [
+        InputEntry(ActorID(str(i)), PolicyRole(role), ActionInputRecord(val, confidence, timestamp))
+        for i, (val, confidence, role, timestamp) in enumerate(
+            zip(values.tolist(), confidences.tolist(), roles.tolist(), timestamps.tolist())
+        )
+    ]
+    return float(policy.merge_input_entries(entries))
+
+
+@pytest.mark.parametrize("policy", POLICIES, ids=lambda policy: policy.__name__)
+@settings(max_examples=300, deadline=None)
+@given(data=st.data())
+def test_merge_arrays_matches_merge_input_entries(policy: type[Policy], data: st.DataObject) -> None:
+    n_actors = data.draw(st.integers(0, min(policy.get_max_actors(), MAX_ACTORS)), label="actors")
+    try:
+        policy.merge_input_entries([])
+    except IndexError:  # Policies that can't merge no entries are never given none
+        assume(n_actors > 0)
+
+    batch_shape = tuple(data.draw(st.lists(st.integers(1, 3), max_size=2), label="batch"))
+    shape = batch_shape + (n_actors,)
+    values = data.draw(hnp.arrays(np.float64, shape, elements=values_st), label="values")
+    confidences = data.draw(hnp.arrays(np.float64, shape, elements=confidences_st), label="confidences")
+    timestamps = data.draw(hnp.arrays(np.float64, shape, elements=timestamps_st), label="timestamps")
+    # The roles are the same for every list of entries, as in a FrameMerger, or vary along the batch axes
+    roles_shape = data.draw(st.sampled_from([shape, (n_actors,)]), label="roles shape")
+    roles = data.draw(hnp.arrays(np.str_, roles_shape, elements=roles_st), label="roles")
+
+    with np.errstate(all="ignore"):
+        merged = policy.merge_arrays(values, confidences, roles, timestamps)
+
+    assert merged.shape == batch_shape
+    roles = np.broadcast_to(roles, shape)
+    for index in np.ndindex(batch_shape):
+        expected = merge_scalar(policy, values[index], confidences[index], roles[index], timestamps[index])
+        assert same_bits(float(merged[index]), expected), index
+
+
+def make_compiled_policies(data: st.DataObject) -> dict[GameAction, CompiledPolicy]:
+    compiled_policies: dict[GameAction, CompiledPolicy] = dict()
+    for action in SampleAction:
+        policy = data.draw(st.sampled_from(POLICIES), label=f"{action} policy")
+        n_actors = data.draw(st.integers(0, min(policy.get_max_actors(), MAX_ACTORS)), label=f"{action} actors")
+        roles = [PolicyRole(data.draw(roles_st)) for _ in range(n_actors)]
+        records = [ActionInputRecord(0.0, 0.0, 0.0) for _ in range(n_actors)]
+        actor_ids = [ActorID(f"{action}{i}") for i in range(n_actors)]
+        compiled_policies[action] = CompiledPolicy(
+            policy_type=policy,
+            actor_slots={actor_id: i for i, actor_id in enumerate(actor_ids)},
+            roles=roles,
+            records=records,
+            entries=[InputEntry(*entry) for entry in zip(actor_ids, roles, records)],
+        )
+    return compiled_policies
+
+
+def update_records(data: st.DataObject, compiled_policies: dict[GameAction, CompiledPolicy]) -> None:
+    for compiled in compiled_policies.values():
+        for record in compiled.records:
+            record.val = data.draw(values_st)
+            record.confidence = data.draw(confidences_st)
+            record.timestamp = data.draw(timestamps_st)
+
+
+@settings(max_examples=200, deadline=None)
+@given(data=st.data())
+def test_frame_merger_matches_compiled_policies(data: st.DataObject) -> None:
+    compiled_policies = make_compiled_policies(data)
+    merger = FrameMerger(compiled_policies)
+    assert set(merger.actions) == {action for action, compiled in compiled_policies.items() if compiled.entries}
+
+    frames, expected_frames = list(), list()
+    for _ in range(data.draw(st.integers(1, 3), label="frames")):
+        update_records(data, compiled_policies)
+        expected = [compiled_policies[action].merge() for action in merger.actions]
+
+        with np.errstate(all="ignore"):
+            merged = merger.merge_frame()
+        assert list(merged.keys()) == merger.actions
+        for action, value in zip(merger.actions, expected):
+            assert same_bits(merged[action], float(value)), action
+
+        frames.append(merger.read_frame())
+        expected_frames.append(expected)
+
+    # The frames stacked along a leading axis are merged together
+    with np.errstate(all="ignore"):
+        stacked = merger.merge(*(np.stack(arrays) for arrays in zip(*frames)))
+    assert stacked.shape == (len(frames), len(merger.actions))
+    for merged_frame, expected in zip(stacked.tolist(), expected_frames):
+        for action, value, expected_value in zip(merger.actions, merged_frame, expected):
+            assert same_bits(value, float(expected_value)), action